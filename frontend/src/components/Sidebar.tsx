@@ -315,15 +315,17 @@ const SettingsPanel: React.FC = () => {
             value={settings.result_store}
             disabled={loading || saving}
             onChange={(e) => {
-              const value = e.target.value as 'memory' | 'parquet';
+              const value = e.target.value as 'memory' | 'parquet' | 'arrow' | 'sqlite';
               void persist({ result_store: value });
             }}
           >
             <option value="memory">Memory (fast, volatile)</option>
             <option value="parquet">Parquet cache (persistent)</option>
+            <option value="arrow">Arrow cache (shared across workers)</option>
+            <option value="sqlite">SQLite file (single-file cache)</option>
           </select>
           <span className="settings-help">
-            Memory keeps step outputs in RAM only. Parquet writes outputs to disk cache and survives process memory eviction.
+            Memory keeps step outputs in RAM only. Parquet writes outputs to disk cache and survives process memory eviction. Arrow does the same with memory-mapped files any worker can read.
           </span>
         </label>
 
@@ -128,7 +128,7 @@ export async function runStep(
     isPreview: boolean = false,
     formula?: string,
     sessionId?: string,
-    resultStore?: 'memory' | 'parquet'
+    resultStore?: 'memory' | 'parquet' | 'arrow' | 'sqlite'
 ): Promise<StepRunResponse> {
   
   const payload = {
@@ -497,7 +497,7 @@ export async function installPacks(): Promise<{ success: boolean; issues: string
 
 export interface SimpleStepsSettings {
     eval_mode: boolean;
-    result_store: 'memory' | 'parquet';
+    result_store: 'memory' | 'parquet' | 'arrow' | 'sqlite';
 }
 
 /** Fetch current runtime settings. */
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+bench_dict_expansion.py
+=======================
+Compares the two ways of turning per-row dict results of a map op into
+columns:
+
+  apply    — ``Series.apply(pd.Series)``, one Series per row (the old path)
+  records  — ``orchestrators.records_frame``, columns built once from the
+             list of dicts (``from_records``, or ``json_normalize`` when
+             flattening)
+
+Run from the repo root:
+    python scripts/bench_dict_expansion.py
+    python scripts/bench_dict_expansion.py --rows 10000 100000 --flatten 1
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+from SIMPLE_STEPS.orchestrators import records_frame  # noqa: E402
+
+
+def make_results(n: int) -> pd.Series:
+    """Metadata-extraction style results: mostly shared keys, a few optional and nested ones."""
+    rows = []
+    for i in range(n):
+        row = {"title": f"Video {i}", "views": i * 7, "author": f"user{i % 97}"}
+        if i % 3 == 0:
+            row["duration"] = i % 600
+        if i % 5 == 0:
+            row["stats"] = {"likes": i % 1000, "ratio": {"up": 0.9, "down": 0.1}}
+        rows.append(row)
+    return pd.Series(rows, dtype=object)
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--flatten", type=int, default=0,
+                        help="also flatten nested dicts this many levels (records path only)")
+    args = parser.parse_args()
+
+    print(f"{'rows':>10}  {'apply(pd.Series)':>17}  {'records_frame':>14}  {'speedup':>8}")
+    for n in args.rows:
+        results = make_results(n)
+        t_apply = timed(lambda: results.apply(pd.Series))
+        t_records = timed(lambda: records_frame(results.tolist(), args.flatten))
+        print(f"{n:>10}  {t_apply:>16.2f}s  {t_records:>13.2f}s  {t_apply / t_records:>7.0f}×")
+
+
+if __name__ == "__main__":
+    main()
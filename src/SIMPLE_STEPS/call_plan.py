@@ -0,0 +1,86 @@
+"""
+Precomputed call plans for registered operations.
+
+Dispatching a step needs the same facts about the op every time: its
+parameter names, which parameter receives the DataFrame, which one gets
+the row value when mapping, whether it takes ``**kwargs``, whether it is
+a coroutine function. ``inspect.signature`` and ``get_type_hints`` are
+slow enough to show up when they run on every step and every call, so
+``register_operation`` / ``simple_step`` build a ``CallPlan`` once,
+store it on the registry entry (``"plan"``) and on the function
+(``func._call_plan``). The engine, the orchestrators, ``ss_*`` ops,
+contract wrappers and formula validation all read it through
+``call_plan(func)``. Functions that were never registered get a plan
+built, and cached on them, on first use.
+"""
+import inspect
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, FrozenSet, Optional, Tuple, get_type_hints
+
+import pandas as pd
+
+DF_PARAM_NAMES = ("df", "data")
+
+
+@dataclass(frozen=True, eq=False)
+class CallPlan:
+    func: Callable
+    signature: Optional[inspect.Signature]
+    params: Tuple[str, ...]               # every parameter, in order
+    param_set: FrozenSet[str]
+    main_arg: Optional[str]               # receives the row value when mapped
+    df_param: Optional[str]               # receives the input DataFrame
+    accepts_var_kwargs: bool
+    is_async: bool
+    hints: Dict[str, Any] = field(default_factory=dict)
+
+    def accepts(self, name: str) -> bool:
+        return self.accepts_var_kwargs or name in self.param_set
+
+
+def build_plan(func: Callable) -> CallPlan:
+    """Introspect *func* once."""
+    try:
+        sig = inspect.signature(func)
+    except (TypeError, ValueError):
+        sig = None   # builtins / C functions
+    try:
+        hints = get_type_hints(func)
+    except Exception:
+        hints = {}
+
+    parameters = sig.parameters if sig is not None else {}
+    params = tuple(parameters)
+    df_param = None
+    for name, p in parameters.items():
+        if name in DF_PARAM_NAMES or hints.get(name, p.annotation) is pd.DataFrame:
+            df_param = name
+            break
+
+    return CallPlan(
+        func=func,
+        signature=sig,
+        params=params,
+        param_set=frozenset(params),
+        main_arg=params[0] if params else None,
+        df_param=df_param,
+        accepts_var_kwargs=any(p.kind is inspect.Parameter.VAR_KEYWORD for p in parameters.values()),
+        is_async=(inspect.iscoroutinefunction(func)
+                  or inspect.iscoroutinefunction(inspect.unwrap(func))),
+        hints=hints,
+    )
+
+
+def call_plan(func: Callable) -> CallPlan:
+    """The plan stored on *func* at registration, or a freshly built (and cached) one."""
+    plan = getattr(func, "_call_plan", None)
+    # functools.wraps copies __dict__, so a wrapper can carry the plan of
+    # the function it wraps — only trust a plan built for this object.
+    if plan is not None and plan.func is func:
+        return plan
+    plan = build_plan(func)
+    try:
+        func._call_plan = plan
+    except (AttributeError, TypeError):
+        pass  # builtins / C functions can't carry attributes
+    return plan
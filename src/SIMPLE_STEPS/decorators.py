@@ -1,7 +1,10 @@
 import functools
 import inspect
 import pandas as pd
-from typing import Callable, Any, get_type_hints, Dict, List, Optional
+from typing import Callable, Any, Dict, List, Optional, Tuple, Union
+
+from .call_plan import call_plan
+from .exec_options import build_exec_options, running_op
 from .models import OperationParam, OperationDefinition
 
 # Global registry for operations
@@ -9,6 +12,11 @@ from .models import OperationParam, OperationDefinition
 OPERATION_REGISTRY: Dict[str, OperationDefinition] = {}
 DEFINITIONS_LIST: List[OperationDefinition] = []
 
+# Bumped whenever ops are registered; keys the broadcast wrapper cache.
+_REGISTRY_VERSION = 0
+_BROADCASTS: Dict[str, Callable] = {}
+_BROADCASTS_KEY: Optional[Tuple[int, int]] = None
+
 
 def _resolve_list_input(args, kwargs):
     """Resolve list input from first positional arg or a single list kwarg."""
@@ -43,13 +51,23 @@ def _apply_list_mode(func: Callable, args, kwargs, mode: str, strict: bool = Fal
         call_kwargs[kw_key] = item
         return func(*args, **call_kwargs)
 
+    from .row_executor import is_async_op, resolve_concurrency, run_rows
+    if is_async_op(func):
+        # Gather the coroutines instead of returning a list of them.
+        values, _ = run_rows(lambda i: _call_with_item(items[i]), len(items),
+                             resolve_concurrency(func), label=func.__name__,
+                             is_async=True, capture_errors=False)
+    else:
+        values = None
+
     if mode == "map":
+        if values is not None:
+            return values
         return [_call_with_item(item) for item in items]
 
     if mode == "flatmap":
         flattened = []
-        for item in items:
-            value = _call_with_item(item)
+        for value in (values if values is not None else map(_call_with_item, items)):
             if isinstance(value, list):
                 flattened.extend(value)
             else:
@@ -69,10 +87,11 @@ def _normalize_mode(mode):
     return aliases.get(mode, mode)
 
 
-def _auto_broadcast(func: Callable, operation_type: str = "map") -> Callable:
+def _auto_broadcast(func: Callable, operation_type: str = "map", op_id: Optional[str] = None) -> Callable:
     """
     Wraps a @simple_step function so that StepProxy / ColumnProxy arguments
-    are handled automatically depending on the operation type.
+    are handled automatically depending on the operation type. *op_id*
+    names the registry entry whose execution options apply to the calls.
 
     Broadcast syntax options:
     - `fn(x)` → best-effort default behavior.
@@ -93,13 +112,14 @@ def _auto_broadcast(func: Callable, operation_type: str = "map") -> Callable:
         The function receives the whole column/table at once.
 
     If no proxy args are present, the function is called as-is regardless
-    of operation_type (plain scalar call).
+    of operation_type (plain scalar call) — for an ``async def`` op that
+    returns the coroutine, so ``await fn(x)`` works. Mapped and proxy calls
+    of async ops are run to completion on an event loop.
 
     Returns a StepProxy wrapping the resulting DataFrame, so steps can
     be chained:  step2 = op_b(text=op_a(url=step1.url).output)
     """
-    @functools.wraps(func)
-    def wrapper(*args, **kwargs):
+    def broadcast(*args, **kwargs):
         from .step_proxy import ColumnProxy, StepProxy, step as make_step
 
         explicit_mode = _normalize_mode(kwargs.pop("__mode", None))
@@ -157,7 +177,8 @@ def _auto_broadcast(func: Callable, operation_type: str = "map") -> Callable:
         if op != "map":
             unwrapped_args = [_unwrap(a) for a in args]
             unwrapped_kwargs = {k: _unwrap(v) for k, v in kwargs.items()}
-            result = func(*unwrapped_args, **unwrapped_kwargs)
+            from .row_executor import resolve_awaitable
+            result = resolve_awaitable(func(*unwrapped_args, **unwrapped_kwargs))
             if isinstance(result, pd.DataFrame):
                 return make_step(result, label=func.__name__)
             if isinstance(result, pd.Series):
@@ -165,62 +186,97 @@ def _auto_broadcast(func: Callable, operation_type: str = "map") -> Callable:
             return result
 
         # ── MAP mode: broadcast row-wise ─────────────────────────────────
-        col_proxies = {}
+        # Each bound column is pulled out of its Series once, as a list;
+        # rows are then plain list lookups instead of Series.iloc calls.
+        col_kwargs = []
         scalar_kwargs = {}
         for k, v in kwargs.items():
             if isinstance(v, ColumnProxy):
-                col_proxies[k] = v
+                col_kwargs.append((k, v._series.tolist()))
             elif isinstance(v, StepProxy):
                 scalar_kwargs[k] = object.__getattribute__(v, "_df")
             else:
                 scalar_kwargs[k] = v
 
+        # Positional args keep their positions: (index, column values).
+        arg_template = []
         col_args = []
-        scalar_args = []
-        for a in args:
+        for pos, a in enumerate(args):
             if isinstance(a, ColumnProxy):
-                col_args.append(a)
+                arg_template.append(None)
+                col_args.append((pos, a._series.tolist()))
             elif isinstance(a, StepProxy):
-                scalar_args.append(object.__getattribute__(a, "_df"))
+                arg_template.append(object.__getattribute__(a, "_df"))
             else:
-                scalar_args.append(a)
+                arg_template.append(a)
 
-        n_rows = len(next(iter(col_proxies.values()))) if col_proxies else (
-            len(col_args[0]) if col_args else 0
-        )
+        bound = col_kwargs[0][1] if col_kwargs else (col_args[0][1] if col_args else [])
+        n_rows = len(bound)
 
         input_df = object.__getattribute__(source_step, "_df") if source_step else None
+        from .row_policy import apply_policy
+        guarded = apply_policy(func)
+
+        if col_args:
+            def call_row(i):
+                row_args = list(arg_template)
+                for pos, values in col_args:
+                    row_args[pos] = values[i]
+                row_kwargs = dict(scalar_kwargs)
+                for k, values in col_kwargs:
+                    row_kwargs[k] = values[i]
+                return guarded(*row_args, **row_kwargs)
+        else:
+            def call_row(i):
+                row_kwargs = dict(scalar_kwargs)
+                for k, values in col_kwargs:
+                    row_kwargs[k] = values[i]
+                return guarded(*arg_template, **row_kwargs)
+
+        from .row_executor import (
+            ERROR_COLUMN, continues_on_error, is_async_op, resolve_concurrency, resolve_flatten, run_rows,
+        )
+        row_results, errors = run_rows(call_row, n_rows, resolve_concurrency(func), label=func.__name__,
+                                       is_async=is_async_op(func),
+                                       continue_on_error=continues_on_error(func))
 
-        results = []
-        for i in range(n_rows):
-            row_kwargs = dict(scalar_kwargs)
-            for k, cp in col_proxies.items():
-                row_kwargs[k] = cp._series.iloc[i]
-            row_args = list(scalar_args)
-            for cp in col_args:
-                row_args.append(cp._series.iloc[i])
-
-            row_result = func(*row_args, **row_kwargs)
-            if isinstance(row_result, dict):
-                results.append(row_result)
-            else:
-                results.append({f"{func.__name__}_output": row_result})
-
-        if not results:
+        if not row_results:
             return make_step(pd.DataFrame(), label=func.__name__)
 
-        new_cols_df = pd.DataFrame(results)
-
-        # Merge new columns with the input DataFrame (preserving existing data)
-        if input_df is not None and len(input_df) == len(new_cols_df):
-            result_df = input_df.copy().reset_index(drop=True)
-            for col in new_cols_df.columns:
-                result_df[col] = new_cols_df[col].values
+        # Output columns: one buffer for scalar results, or the columns of
+        # the dict results built in one pass.
+        output_col = f"{func.__name__}_output"
+        if any(isinstance(r, dict) for r in row_results):
+            from .orchestrators import records_frame
+            records = [
+                r if isinstance(r, dict) else ({} if e is not None else {output_col: r})
+                for r, e in zip(row_results, errors)
+            ]
+            new_cols_df = records_frame(records, resolve_flatten(func))
+            buffers = [(col, new_cols_df[col].values) for col in new_cols_df.columns]
+        else:
+            buffers = [(output_col, row_results)]
+        if any(errors):
+            buffers.append((ERROR_COLUMN, errors))
+
+        # Attach to the source frame: a shallow copy shares the input
+        # columns, only the new ones are allocated.
+        if input_df is not None and len(input_df) == n_rows:
+            result_df = input_df.copy(deep=False)
+            result_df.index = pd.RangeIndex(n_rows)
+            for col, values in buffers:
+                result_df[col] = values
         else:
-            result_df = new_cols_df
+            result_df = pd.DataFrame(dict(buffers))
 
         return make_step(result_df, label=func.__name__)
 
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        # Options of this op id, even if another id registered func too.
+        with running_op(op_id):
+            return broadcast(*args, **kwargs)
+
     # Stash metadata so the engine / eval can inspect it
     wrapper._raw_func = func
     wrapper._operation_type = operation_type
@@ -238,6 +294,42 @@ def _auto_broadcast(func: Callable, operation_type: str = "map") -> Callable:
     return wrapper
 
 
+def bump_registry_version() -> None:
+    """Mark the registry as changed so cached broadcast wrappers are rebuilt."""
+    global _REGISTRY_VERSION
+    _REGISTRY_VERSION += 1
+
+
+def registry_version() -> Tuple[int, int]:
+    """Changes whenever ops are registered or removed — a key for data derived from the registry."""
+    return (_REGISTRY_VERSION, len(OPERATION_REGISTRY))
+
+
+def broadcast_callables() -> Dict[str, Callable]:
+    """
+    ``op_id → _auto_broadcast(func)`` for every registered op — the
+    callables the eval namespace and safe formulas call.
+
+    Built once per registry version (and registry size, so deleted ops
+    drop out) instead of on every evaluation; wrappers of ops that didn't
+    change are carried over. Treat the returned dict as read-only.
+    """
+    global _BROADCASTS, _BROADCASTS_KEY
+    key = registry_version()
+    if _BROADCASTS_KEY != key:
+        previous = _BROADCASTS
+        fresh: Dict[str, Callable] = {}
+        for op_id, entry in OPERATION_REGISTRY.items():
+            func = entry["func"]
+            op_type = entry.get("type", "map")
+            wrapped = previous.get(op_id)
+            if wrapped is None or wrapped._raw_func is not func or wrapped._operation_type != op_type:
+                wrapped = _auto_broadcast(func, operation_type=op_type, op_id=op_id)
+            fresh[op_id] = wrapped
+        _BROADCASTS, _BROADCASTS_KEY = fresh, key
+    return _BROADCASTS
+
+
 def _unwrap(obj):
     """Convert proxy objects to their pandas equivalents for pass-through calls."""
     from .step_proxy import ColumnProxy, StepProxy
@@ -247,7 +339,24 @@ def _unwrap(obj):
         return object.__getattribute__(obj, "_df")
     return obj
 
-def simple_step(name: str = None, category: str = "General", operation_type: str = "map", id: str = None, apply: str = None):
+def simple_step(
+    name: str = None,
+    category: str = "General",
+    operation_type: str = "map",
+    id: str = None,
+    apply: str = None,
+    deterministic: bool = True,
+    vectorized: Union[bool, str, Callable, None] = None,
+    concurrency: Optional[int] = None,
+    executor: Optional[str] = None,
+    flatten: Optional[int] = None,
+    cache: Optional[str] = None,
+    rate_limit: Union[int, float, str, None] = None,
+    retries: int = 0,
+    retry_on: Union[type, Tuple[type, ...], None] = None,
+    backoff: Optional[float] = None,
+    on_error: Optional[str] = None,
+):
     """
     Decorator to transform a vanilla Python function into a SimpleSteps operation.
     
@@ -258,6 +367,42 @@ def simple_step(name: str = None, category: str = "General", operation_type: str
         id: Optional explicit ID. If None, uses function name.
         apply: Optional implicit list behavior for non-proxy calls ("map" or
             "flatmap"). Can be overridden per call with __mode.
+        deterministic: Set False for ops whose output can change for the
+            same inputs (clock, randomness, live APIs) so the step result
+            cache never serves them.
+        vectorized: Whole-column fast path for the map orchestrator.
+            True — the function itself accepts a pd.Series for its first
+            argument; a callable — a Series-in / Series-out implementation
+            with the same parameters; "auto" — probe once per column dtype
+            by calling the function with the Series and keep the fast path
+            if the result lines up with the rows. None (default) always
+            maps row by row.
+        concurrency: Run up to N row calls at once on a thread pool when
+            the op is mapped (map orchestrator, ss_map, formula-bar
+            broadcast). Meant for I/O-bound ops; a step can override it
+            with the ``_concurrency`` config key. Failing rows are reported
+            in an ``_error`` column instead of aborting the step. For an
+            ``async def`` op this bounds the coroutines in flight on the
+            event loop instead (default 32).
+        executor: "process" runs mapped row calls in worker processes
+            (one per core by default) for CPU-bound ops; None / "thread"
+            keeps them in the server process. Override per step with the
+            ``_executor`` config key.
+        flatten: When a mapped op returns nested dicts, flatten this many
+            levels into ``parent_child`` columns (0 / None keeps nested
+            dicts as values). Override per step with ``_flatten``.
+        cache: "disk" memoizes mapped row calls in a local SQLite file,
+            keyed on the op id, its source code and the row's arguments,
+            so re-runs only call the op for new rows. See ``row_cache``.
+        rate_limit: Cap mapped calls at this many per second (a number) or
+            per unit (``"10/s"``, ``"600/min"``); extra calls wait.
+        retries: Re-run a failing row call up to this many times, waiting
+            ``backoff * 2**attempt`` seconds (default backoff 0.5) between
+            tries. ``retry_on`` limits retries to these exception types.
+        on_error: "continue" records rows that still fail in the
+            ``_error`` column instead of aborting the step, even when
+            mapping serially; "raise" (default) aborts. Override per step
+            with ``_on_error``. See ``row_policy``.
 
     Broadcast table (current):
     - Default: `fn(x)`
@@ -269,11 +414,14 @@ def simple_step(name: str = None, category: str = "General", operation_type: str
         # 1. Register Metadata
         op_name = name or func.__name__.replace("_", " ").title()
         op_id = id or func.__name__
+        options = build_exec_options(op_id, vectorized, concurrency, executor, flatten, cache,
+                                     rate_limit, retries, retry_on, backoff, on_error)
 
         
         # Infer parameters from type hints
-        sig = inspect.signature(func)
-        type_hints = get_type_hints(func)
+        plan = call_plan(func)
+        sig = plan.signature
+        type_hints = plan.hints
         params = []
         for param_name, param in sig.parameters.items():
             if param_name == 'return': continue
@@ -314,15 +462,19 @@ def simple_step(name: str = None, category: str = "General", operation_type: str
             "definition": definition,
             "func": func,  # The raw, unwrapped function
             "category": category,
-            "type": operation_type
+            "type": operation_type,
+            "deterministic": deterministic,
+            "options": options,
+            "plan": plan,
         }
         DEFINITIONS_LIST.append(definition)
+        bump_registry_version()
         
         # Return the auto-broadcasting wrapper so that direct Python calls
         # (and eval-mode formula bar calls) get automatic row-wise mapping
         # when ColumnProxy arguments are passed.  The raw function is still
         # accessible via wrapper._raw_func and through the registry.
-        wrapped = _auto_broadcast(func, operation_type=operation_type)
+        wrapped = _auto_broadcast(func, operation_type=operation_type, op_id=op_id)
         wrapped._apply = apply
         return wrapped
 
@@ -337,6 +489,17 @@ def register_operation(
     operation_type: str = "dataframe",
     params: Optional[list] = None,
     description: Optional[str] = None,
+    deterministic: bool = True,
+    vectorized: Union[bool, str, Callable, None] = None,
+    concurrency: Optional[int] = None,
+    executor: Optional[str] = None,
+    flatten: Optional[int] = None,
+    cache: Optional[str] = None,
+    rate_limit: Union[int, float, str, None] = None,
+    retries: int = 0,
+    retry_on: Union[type, Tuple[type, ...], None] = None,
+    backoff: Optional[float] = None,
+    on_error: Optional[str] = None,
 ):
     """
     Register a plain Python function into the operation registry without
@@ -352,11 +515,24 @@ def register_operation(
     params         : explicit param list (dicts with name/type/default keys).
                      If None, inferred from the function's type annotations.
     description    : override docstring shown in the UI.
+    deterministic  : False excludes the op from the step result cache.
+    vectorized     : whole-column fast path for map (see simple_step).
+    concurrency    : max concurrent row calls when mapped (see simple_step).
+    executor       : "process" to map rows in worker processes (see simple_step).
+    flatten        : levels of nested dict results to flatten (see simple_step).
+    cache          : "disk" to memoize row calls across runs (see simple_step).
+    rate_limit     : max mapped calls per second, or "N/s" / "N/min" (see simple_step).
+    retries        : retries of a failing row call, with exponential backoff.
+    retry_on       : exception type(s) worth retrying (default: any Exception).
+    backoff        : base seconds between retries (default 0.5).
+    on_error       : "continue" records failing rows in _error (see simple_step).
 
     Usage (at the bottom of any .py file in the scanned src/ folders):
 
         register_operation(my_func, "my_op", "My Operation", "MyCategory", "map")
     """
+    options = build_exec_options(op_id, vectorized, concurrency, executor, flatten, cache,
+                                 rate_limit, retries, retry_on, backoff, on_error)
     if params is None:
         params = _infer_params(func)
 
@@ -374,22 +550,22 @@ def register_operation(
         "func":       func,
         "category":   category,
         "type":       operation_type,
+        "deterministic": deterministic,
+        "options": options,
+        "plan": call_plan(func),
     }
     DEFINITIONS_LIST.append(definition)
+    bump_registry_version()
     return func   # safe to use as a decorator if desired
 
 
 def _infer_params(func) -> list:
     """Infer OperationParam objects from a function's signature and type annotations."""
-    sig = inspect.signature(func)
-    type_hints = {}
-    try:
-        type_hints = get_type_hints(func)
-    except Exception:
-        pass
+    plan = call_plan(func)
+    type_hints = plan.hints
 
     params = []
-    for pname, p in sig.parameters.items():
+    for pname, p in (plan.signature.parameters.items() if plan.signature else ()):
         if pname == "return":
             continue
         if p.kind in (inspect.Parameter.VAR_POSITIONAL, inspect.Parameter.VAR_KEYWORD):
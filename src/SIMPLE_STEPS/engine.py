@@ -1,19 +1,50 @@
 import pandas as pd
 import uuid
-from typing import Dict, Optional, Any
+from collections import Counter, OrderedDict
+from typing import Dict, Optional, Any, Iterable, Tuple
 from .decorators import OPERATION_REGISTRY
+from . import step_cache
+from .references import CELL, EXCEL, STEP, parse_reference, logger as _ref_logger
+from .progress import track_progress
+from .streaming import discard_partial, get_partial, stream_results
+from .call_plan import call_plan
+from .exec_options import running_op
+from .row_executor import step_options
+from .result_store import DURABLE_BACKENDS, MemoryResultStore, ResultStore, WriteBehindQueue, durable_store
 import re
 import os
+import atexit
+import logging
 import hashlib
+import threading
+import time
 
 # --- The "Reference Passing" Store ---
 # In production, this might be Redis, Parquet files on disk, or a Database.
 # For now, it's a simple Dictionary in RAM.
 DEFAULT_SESSION_ID = "default"
 DATA_STORE: Dict[str, Dict[str, pd.DataFrame]] = {}
-RESULT_STORE_MODES = {"memory", "parquet"}
+# Hot tier over DATA_STORE; durable backends live in result_store.py.
+MEMORY_STORE = MemoryResultStore(DATA_STORE)
+RESULT_STORE_MODES = {"memory", *DURABLE_BACKENDS}
 RESULT_CACHE_DIR = os.environ.get("SIMPLE_STEPS_RESULT_CACHE_DIR", ".simple_steps_cache")
 
+# --- Memory budget / LRU bookkeeping ---
+# Every DataFrame held in DATA_STORE is tracked here in least-recently-used
+# order, keyed by (session_token, ref_id) → size in bytes. When the total
+# exceeds the configured budget the oldest unpinned refs are spilled to
+# parquet and dropped from RAM; get_dataframe() reloads them on demand.
+_LRU: "OrderedDict[Tuple[str, str], int]" = OrderedDict()
+_STORE_BYTES = 0
+# Refs that in-flight operations are reading — never evicted. Counted per
+# session, since parallel steps of one session pin overlapping refs.
+_PINNED: Dict[str, Counter] = {}
+# Refs known to have an up-to-date parquet / Arrow copy on disk.
+_PERSISTED: set = set()
+_STORE_LOCK = threading.RLock()
+# session_token → time of the last save/read, used by the TTL reaper.
+_LAST_SEEN: Dict[str, float] = {}
+
 
 def _normalize_session_id(session_id: Optional[str]) -> str:
     sid = (session_id or DEFAULT_SESSION_ID).strip()
@@ -52,26 +83,290 @@ def _resolve_store_mode(store_mode: Optional[str]) -> str:
     return "memory"
 
 
-def _parquet_path_for_ref(ref_id: str, session_token: Optional[str] = None) -> str:
-    token = session_token or _extract_session_token_from_ref(ref_id) or _session_token(DEFAULT_SESSION_ID)
-    return os.path.join(RESULT_CACHE_DIR, token, f"{ref_id}.parquet")
+def get_result_store(store_mode: Optional[str] = None) -> ResultStore:
+    """
+    Return the backend for *store_mode* (defaults to settings.result_store).
 
+    ``memory`` returns the in-process hot tier; any other mode returns the
+    durable backend rooted at RESULT_CACHE_DIR.
+    """
+    mode = _resolve_store_mode(store_mode)
+    if mode == "memory":
+        return MEMORY_STORE
+    return durable_store(mode, RESULT_CACHE_DIR)
 
-def _save_parquet_cache(df: pd.DataFrame, ref_id: str, session_token: str) -> None:
-    path = _parquet_path_for_ref(ref_id, session_token)
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    df.to_parquet(path, index=False)
 
+def _save_disk_cache(df: pd.DataFrame, ref_id: str, session_token: str, mode: str) -> None:
+    durable_store(mode, RESULT_CACHE_DIR).put(session_token, ref_id, df)
+    _PERSISTED.add(ref_id)
 
-def _load_parquet_cache(ref_id: str, preferred_session_token: Optional[str] = None) -> Optional[pd.DataFrame]:
-    path = _parquet_path_for_ref(ref_id, preferred_session_token)
-    if not os.path.exists(path):
-        return None
+
+# --- Write-behind persistence ---
+# Durable copies are written by a background thread so /api/run doesn't
+# wait on to_parquet(). Until a write lands, the frame stays reachable via
+# _WRITER.pending() even if the LRU has already dropped it from RAM.
+_WRITER: Optional[WriteBehindQueue] = None
+
+
+def _write_behind_enabled() -> bool:
     try:
-        return pd.read_parquet(path)
-    except Exception as e:
-        print(f"  ⚠ Failed to read parquet cache for '{ref_id}': {e}")
+        from .settings import get_settings
+        return bool(get_settings().result_store_write_behind)
+    except Exception:
+        return True
+
+
+def _get_writer() -> WriteBehindQueue:
+    global _WRITER
+    with _STORE_LOCK:
+        if _WRITER is None:
+            try:
+                from .settings import get_settings
+                maxsize = int(get_settings().result_store_write_queue)
+            except Exception:
+                maxsize = 64
+            _WRITER = WriteBehindQueue(maxsize=maxsize)
+        return _WRITER
+
+
+def _on_write_done(token: str, ref_id: str, df: pd.DataFrame, error: Optional[Exception]) -> None:
+    if error is None:
+        _PERSISTED.add(ref_id)
+        return
+    print(f"  ⚠ Failed to persist result for '{ref_id}': {error}")
+    # The durable copy is gone — make sure the frame is back in RAM.
+    with _STORE_LOCK:
+        if MEMORY_STORE.get(token, ref_id) is None:
+            MEMORY_STORE.put(token, ref_id, df)
+            _track(token, ref_id, df)
+
+
+def flush_result_writes() -> None:
+    """Block until every queued result write has been persisted."""
+    if _WRITER is not None:
+        _WRITER.flush()
+
+
+def write_queue_stats() -> Dict[str, Any]:
+    return _WRITER.stats() if _WRITER is not None else WriteBehindQueue().stats()
+
+
+atexit.register(flush_result_writes)
+
+
+def _load_disk_cache(ref_id: str, preferred_session_token: Optional[str] = None) -> Optional[pd.DataFrame]:
+    """Read a ref from the configured durable backend, then from the others."""
+    token = preferred_session_token or _extract_session_token_from_ref(ref_id) or _session_token(DEFAULT_SESSION_ID)
+    configured = _resolve_store_mode(None)
+    modes = [configured] if configured in DURABLE_BACKENDS else []
+    modes += [m for m in DURABLE_BACKENDS if m not in modes]
+    for mode in modes:
+        df = durable_store(mode, RESULT_CACHE_DIR).get(token, ref_id)
+        if df is not None:
+            return df
+    return None
+
+
+def _resolve_max_bytes() -> Optional[int]:
+    """Return the RAM budget for DATA_STORE in bytes, or None for unbounded."""
+    budget = None
+    try:
+        from .settings import get_settings
+        budget = getattr(get_settings(), "result_store_max_bytes", None)
+    except Exception:
+        budget = None
+    if budget is None:
+        raw = os.environ.get("SIMPLE_STEPS_RESULT_STORE_MAX_BYTES", "").strip()
+        if raw:
+            try:
+                budget = int(raw)
+            except ValueError:
+                budget = None
+    if budget is None or budget <= 0:
         return None
+    return int(budget)
+
+
+def _frame_nbytes(df: pd.DataFrame) -> int:
+    try:
+        return int(df.memory_usage(deep=True).sum())
+    except Exception:
+        return 0
+
+
+def _track(token: str, ref_id: str, df: pd.DataFrame) -> None:
+    """Record (or refresh) a ref in the LRU and enforce the memory budget."""
+    global _STORE_BYTES
+    with _STORE_LOCK:
+        key = (token, ref_id)
+        if key in _LRU:
+            _LRU.move_to_end(key)
+        else:
+            size = _frame_nbytes(df)
+            _LRU[key] = size
+            _STORE_BYTES += size
+        _enforce_budget()
+
+
+def _touch(token: str, ref_id: str) -> None:
+    with _STORE_LOCK:
+        key = (token, ref_id)
+        if key in _LRU:
+            _LRU.move_to_end(key)
+
+
+def _forget(token: str, ref_id: str) -> None:
+    """Drop a ref's LRU entry (the caller removes it from DATA_STORE)."""
+    global _STORE_BYTES
+    with _STORE_LOCK:
+        size = _LRU.pop((token, ref_id), None)
+        if size is not None:
+            _STORE_BYTES -= size
+
+
+def _is_pinned(token: str, ref_id: str) -> bool:
+    return ref_id in _PINNED.get(token, ())
+
+
+def _enforce_budget() -> None:
+    """
+    Evict least-recently-used, unpinned refs until under budget.
+
+    The most recently used ref is always kept so a result that alone
+    exceeds the budget is still served from RAM to its first reader.
+    """
+    budget = _resolve_max_bytes()
+    if budget is None:
+        return
+    with _STORE_LOCK:
+        for token, ref_id in list(_LRU.keys())[:-1]:
+            if _STORE_BYTES <= budget:
+                return
+            if _is_pinned(token, ref_id):
+                continue
+            _evict(token, ref_id)
+
+
+def _evict(token: str, ref_id: str) -> None:
+    """Spill a ref to disk (if not already there) and drop it from RAM."""
+    df = MEMORY_STORE.get(token, ref_id)
+    pending = _WRITER is not None and _WRITER.is_pending(ref_id)
+    if df is not None and ref_id not in _PERSISTED and not pending:
+        configured = _resolve_store_mode(None)
+        mode = configured if configured in DURABLE_BACKENDS else "parquet"
+        try:
+            _save_disk_cache(df, ref_id, token, mode)
+        except Exception as e:
+            print(f"  ⚠ Failed to spill '{ref_id}' to {mode} on eviction: {e}")
+    MEMORY_STORE.delete(token, ref_id)
+    _forget(token, ref_id)
+
+
+def pin_refs(ref_ids: Iterable[str], session_id: Optional[str] = None) -> None:
+    """
+    Pin refs an operation is about to read; pair with ``unpin_refs``.
+
+    Pinned refs are never evicted from RAM. Pins are counted, so a ref
+    stays pinned until every operation that pinned it has released it.
+    """
+    token = _session_token(session_id)
+    with _STORE_LOCK:
+        _PINNED.setdefault(token, Counter()).update(r for r in ref_ids if r)
+
+
+def unpin_refs(ref_ids: Iterable[str], session_id: Optional[str] = None) -> None:
+    """Release pins taken by ``pin_refs``; refs nobody pins become evictable again."""
+    token = _session_token(session_id)
+    with _STORE_LOCK:
+        pins = _PINNED.get(token)
+        if pins is None:
+            return  # session deleted while the operation ran
+        pins.subtract(r for r in ref_ids if r)
+        for ref_id in [r for r, n in pins.items() if n <= 0]:
+            del pins[ref_id]
+        if not pins:
+            del _PINNED[token]
+        _enforce_budget()
+
+
+def store_stats() -> Dict[str, Any]:
+    """Return a snapshot of DATA_STORE memory usage for diagnostics."""
+    with _STORE_LOCK:
+        return {
+            "bytes": _STORE_BYTES,
+            "max_bytes": _resolve_max_bytes(),
+            "refs": len(_LRU),
+            "pinned": sum(len(p) for p in _PINNED.values()),
+            "sessions": len(DATA_STORE),
+            "backend": get_result_store().stats(),
+            "write_queue": write_queue_stats(),
+        }
+
+
+def _mark_seen(token: str) -> None:
+    _LAST_SEEN[token] = time.time()
+
+
+def session_usage() -> Dict[str, Dict[str, Any]]:
+    """
+    Per-session footprint across RAM and every durable backend.
+
+    Returns ``token → {ram_refs, ram_bytes, disk_refs, disk_bytes, last_seen}``.
+    ``last_seen`` falls back to the newest file on disk for sessions that
+    haven't been touched since the process started.
+    """
+    usage: Dict[str, Dict[str, Any]] = {}
+
+    def entry(token: str) -> Dict[str, Any]:
+        return usage.setdefault(token, {
+            "ram_refs": 0, "ram_bytes": 0, "disk_refs": 0, "disk_bytes": 0,
+            "last_seen": _LAST_SEEN.get(token),
+        })
+
+    with _STORE_LOCK:
+        for (token, _ref_id), size in _LRU.items():
+            e = entry(token)
+            e["ram_refs"] += 1
+            e["ram_bytes"] += size
+
+    for mode in DURABLE_BACKENDS:
+        store = durable_store(mode, RESULT_CACHE_DIR)
+        for token, counts in store.list_sessions().items():
+            e = entry(token)
+            e["disk_refs"] += counts["refs"]
+            e["disk_bytes"] += counts["bytes"]
+            if token not in _LAST_SEEN:
+                mtime = store.session_mtime(token)
+                if mtime is not None:
+                    e["last_seen"] = max(e["last_seen"] or 0, mtime)
+    return usage
+
+
+def drop_session(session_token: str) -> Dict[str, int]:
+    """
+    Free every result of a session: RAM, pins and all durable copies.
+
+    Pending write-behind writes are flushed first so they can't recreate
+    files after the delete.
+    """
+    flush_result_writes()
+    with _STORE_LOCK:
+        ram_refs = MEMORY_STORE.list_session(session_token)
+        for ref_id in ram_refs:
+            MEMORY_STORE.delete(session_token, ref_id)
+            _forget(session_token, ref_id)
+        _PINNED.pop(session_token, None)
+        _LAST_SEEN.pop(session_token, None)
+
+    disk_refs = 0
+    for mode in DURABLE_BACKENDS:
+        store = durable_store(mode, RESULT_CACHE_DIR)
+        for ref_id in store.list_session(session_token):
+            _PERSISTED.discard(ref_id)
+        disk_refs += store.delete_session(session_token)
+    for ref_id in ram_refs:
+        _PERSISTED.discard(ref_id)
+    return {"ram_refs": len(ram_refs), "disk_refs": disk_refs}
 
 
 def get_dataframe(ref_id: str, session_id: Optional[str] = None) -> Optional[pd.DataFrame]:
@@ -87,37 +382,99 @@ def get_dataframe(ref_id: str, session_id: Optional[str] = None) -> Optional[pd.
     elif ref_session_token:
         candidate_tokens.append(ref_session_token)
     else:
-        candidate_tokens.extend(DATA_STORE.keys())
+        located = MEMORY_STORE.locate(ref_id)
+        if located is not None:
+            candidate_tokens.append(located)
 
     for token in candidate_tokens:
-        bucket = DATA_STORE.get(token)
-        if not bucket:
-            continue
-        df = bucket.get(ref_id)
+        df = MEMORY_STORE.get(token, ref_id)
         if df is not None:
+            _touch(token, ref_id)
+            _mark_seen(token)
             return df
 
-    # Fallback to parquet cache if memory cache is empty/evicted.
-    df_cached = _load_parquet_cache(ref_id, explicit_session_token or ref_session_token)
+    # Output of a streaming step that is still running: the chunks so far.
+    partial = get_partial(ref_id)
+    if partial is not None:
+        return partial.frame()
+
+    # Written by save_dataframe but still queued for persistence.
+    if _WRITER is not None:
+        df_pending = _WRITER.pending(ref_id)
+        if df_pending is not None:
+            return df_pending
+
+    # Fallback to the Arrow / parquet cache if memory cache is empty/evicted
+    # or the ref was produced by another worker process.
+    df_cached = _load_disk_cache(ref_id, explicit_session_token or ref_session_token)
     if df_cached is not None:
         token = explicit_session_token or ref_session_token or _session_token(DEFAULT_SESSION_ID)
-        DATA_STORE.setdefault(token, {})[ref_id] = df_cached
+        with _STORE_LOCK:
+            MEMORY_STORE.put(token, ref_id, df_cached)
+            _PERSISTED.add(ref_id)
+            _mark_seen(token)
+            _track(token, ref_id, df_cached)
     return df_cached
 
+def _ref_token(ref_id: str) -> str:
+    return (
+        _extract_session_token_from_ref(ref_id)
+        or MEMORY_STORE.locate(ref_id)
+        or _session_token(DEFAULT_SESSION_ID)
+    )
+
+
+def has_dataframe(ref_id: str) -> bool:
+    """Whether *ref_id* can still be served, checked without loading it."""
+    token = _ref_token(ref_id)
+    if MEMORY_STORE.exists(token, ref_id):
+        return True
+    if _WRITER is not None and _WRITER.is_pending(ref_id):
+        return True
+    return any(durable_store(mode, RESULT_CACHE_DIR).exists(token, ref_id) for mode in DURABLE_BACKENDS)
+
+
+def _peek_dataframe(ref_id: str) -> Optional[pd.DataFrame]:
+    """Like get_dataframe, but a ref read back from disk is not put in RAM."""
+    token = _ref_token(ref_id)
+    df = MEMORY_STORE.get(token, ref_id)
+    if df is not None:
+        _touch(token, ref_id)
+    elif _WRITER is not None:
+        df = _WRITER.pending(ref_id)
+    if df is None:
+        df = _load_disk_cache(ref_id, token)
+    return df
+
+def new_ref_id(session_id: Optional[str] = None) -> str:
+    return f"{_session_token(session_id)}__{uuid.uuid4().hex}"
+
+
 def save_dataframe(
     df: pd.DataFrame,
     session_id: Optional[str] = None,
     store_mode: Optional[str] = None,
+    ref_id: Optional[str] = None,
 ) -> str:
+    """Store *df* and return its ref. *ref_id* reuses a ref allocated up front (streaming steps)."""
     token = _session_token(session_id)
-    ref_id = f"{token}__{uuid.uuid4().hex}"
-    DATA_STORE.setdefault(token, {})[ref_id] = df
-
-    if _resolve_store_mode(store_mode) == "parquet":
+    ref_id = ref_id or new_ref_id(session_id)
+
+    mode = _resolve_store_mode(store_mode)
+    # Arrow files are how other worker processes see this ref, so they are
+    # written before the ref is handed out rather than on the writer thread.
+    if mode in DURABLE_BACKENDS and mode != "arrow" and _write_behind_enabled():
+        _get_writer().submit(durable_store(mode, RESULT_CACHE_DIR), token, ref_id, df, on_done=_on_write_done)
+    elif mode in DURABLE_BACKENDS:
         try:
-            _save_parquet_cache(df, ref_id, token)
+            _save_disk_cache(df, ref_id, token, mode)
         except Exception as e:
-            print(f"  ⚠ Failed to persist parquet cache for '{ref_id}': {e}")
+            print(f"  ⚠ Failed to persist {mode} cache for '{ref_id}': {e}")
+
+    with _STORE_LOCK:
+        MEMORY_STORE.put(token, ref_id, df)
+        _track(token, ref_id, df)
+        _mark_seen(token)
 
     return ref_id
 
@@ -137,59 +494,40 @@ def resolve_reference(value: Any, step_map: Dict[str, str], session_id: Optional
     if not isinstance(value, str):
         return value
 
-    # ── Excel-style syntax: =Step Name!ColumnName ────────────────────────
-    # Strips the leading '=' and splits on '!' to get step label and column.
-    excel_match = re.match(r'^=(.+?)!(\w+)$', value)
-    if excel_match:
-        step_key = excel_match.group(1).strip()
-        col_name = excel_match.group(2)
-        ref_id = step_map.get(step_key)
-        if ref_id:
-            df = get_dataframe(ref_id, session_id=session_id)
-            if df is not None and col_name in df.columns:
-                print(f"  ↳ Resolved '{value}' → column '{col_name}' from step '{step_key}' (Excel syntax)")
-                return df[col_name]
-        print(f"  ⚠ Could not resolve Excel reference '{value}' (step_map keys: {list(step_map.keys())})")
-        return value
+    ref = parse_reference(value)
+    debug = _ref_logger.isEnabledFor(logging.DEBUG)
 
-    # ── dot syntax: stepId.columnName ────────────────────────────────────
-    dot_match = re.match(r'^([\w-]+)\.(\w+)$', value)
-    if dot_match:
-        step_key = dot_match.group(1)
-        col_name = dot_match.group(2)
-        ref_id = step_map.get(step_key)
-        if ref_id:
+    if ref.kind == STEP:
+        # ── bare step ID: stepId ─────────────────────────────────────────
+        ref_id = step_map.get(value)
+        if ref_id is not None:
             df = get_dataframe(ref_id, session_id=session_id)
-            if df is not None and col_name in df.columns:
-                print(f"  ↳ Resolved '{value}' → column '{col_name}' from step '{step_key}'")
-                return df[col_name]
-        print(f"  ⚠ Could not resolve column reference '{value}' (step_map keys: {list(step_map.keys())})")
+            if df is not None:
+                if debug:
+                    _ref_logger.debug("↳ Resolved '%s' → full DataFrame (%d rows)", value, len(df))
+                return df
         return value
 
-    # ── bracket syntax: stepId[row=R, col=C] ────────────────────────────
-    bracket_match = re.match(r'^([\w-]+)\[row=(\d+),\s*col=(\w+)\]$', value)
-    if bracket_match:
-        step_key = bracket_match.group(1)
-        row_idx = int(bracket_match.group(2))
-        col_name = bracket_match.group(3)
-        ref_id = step_map.get(step_key)
-        if ref_id:
-            df = get_dataframe(ref_id, session_id=session_id)
-            if df is not None and col_name in df.columns and row_idx < len(df):
-                cell_val = df.iloc[row_idx][col_name]
-                print(f"  ↳ Resolved '{value}' → cell [{row_idx},{col_name}] = {cell_val!r}")
-                return cell_val
-        print(f"  ⚠ Could not resolve cell reference '{value}'")
+    ref_id = step_map.get(ref.step_key)
+    df = get_dataframe(ref_id, session_id=session_id) if ref_id else None
+
+    if ref.kind == CELL:
+        # ── bracket syntax: stepId[row=R, col=C] ────────────────────────
+        if df is not None and ref.column in df.columns and ref.row < len(df):
+            cell_val = df.iloc[ref.row][ref.column]
+            if debug:
+                _ref_logger.debug("↳ Resolved '%s' → cell [%d,%s] = %r", value, ref.row, ref.column, cell_val)
+            return cell_val
+        _ref_logger.warning("⚠ Could not resolve cell reference '%s'", value)
         return value
 
-    # ── bare step ID: stepId ─────────────────────────────────────────────
-    if value in step_map:
-        ref_id = step_map[value]
-        df = get_dataframe(ref_id, session_id=session_id)
-        if df is not None:
-            print(f"  ↳ Resolved '{value}' → full DataFrame ({len(df)} rows)")
-            return df
-
+    # ── column syntax: stepId.columnName  /  =Step Name!ColumnName ──────
+    if df is not None and ref.column in df.columns:
+        if debug:
+            _ref_logger.debug("↳ Resolved '%s' → column '%s' from step '%s'", value, ref.column, ref.step_key)
+        return df[ref.column]
+    label = "Excel reference" if ref.kind == EXCEL else "column reference"
+    _ref_logger.warning("⚠ Could not resolve %s '%s' (step_map keys: %s)", label, value, list(step_map.keys()))
     return value
 
 
@@ -221,9 +559,9 @@ def _passthrough(
         if resolved != ref_token:          # scalar — not the same string back
             # Extract a sensible column name from the reference
             col_label = "value"
-            bracket_m = re.match(r'^[\w-]+\[.*col=(\w+).*\]$', ref_token)
-            if bracket_m:
-                col_label = bracket_m.group(1)
+            parsed = parse_reference(ref_token)
+            if parsed.column:
+                col_label = parsed.column
             elif '.' in ref_token:
                 col_label = ref_token.split('.')[-1]
             return pd.DataFrame([{col_label: resolved}])
@@ -254,23 +592,13 @@ def _eval_ref_via_ast(
     """
     try:
         from . import safe_formula
-        from .step_proxy import StepProxy, ColumnProxy
+        from .step_proxy import StepProxy, ColumnProxy, LazyStepEnv
     except Exception:
         return None
 
-    # Resolve every step in the map to its DataFrame so the AST env has
-    # everything it might reference. Skip ones whose data is unavailable.
-    env: Dict[str, pd.DataFrame] = {}
-    seen_refs: set = set()
-    for key, rid in step_map.items():
-        if rid in seen_refs:
-            # Same ref under multiple aliases (e.g. step1 / step_table / label)
-            # — re-resolve so each alias maps to its DF.
-            pass
-        seen_refs.add(rid)
-        df = get_dataframe(rid, session_id=session_id)
-        if df is not None:
-            env[key] = df
+    # Steps are loaded only when the expression looks them up; aliases of
+    # the same ref (step1 / label) share one load.
+    env = LazyStepEnv(step_map, lambda rid: get_dataframe(rid, session_id=session_id))
 
     try:
         result = safe_formula.run_formula(ref_token, steps=env)
@@ -303,6 +631,21 @@ def _infer_scalar_column_label(ref_token: str) -> str:
     return "value"
 
 
+def _stream_chunk_rows(config: Dict[str, Any]) -> Optional[int]:
+    """Chunk size for streaming execution: the step's ``_chunk_rows`` or the setting."""
+    value = config.get('_chunk_rows')
+    if value in (None, ""):
+        from .settings import get_settings
+        value = get_settings().stream_chunk_rows
+    if value in (None, "", 0):
+        return None
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"_chunk_rows must be an integer, got {value!r}")
+    return value if value > 0 else None
+
+
 def run_operation(
     op_id: str, 
     config: Any, 
@@ -317,7 +660,27 @@ def run_operation(
     """
     Orchestrates the running of a single step with dynamic wrappers.
     """
-    
+    # Refs the step reads must survive eviction until it's done with them.
+    pinned = list((step_label_map or {}).values()) + [input_ref_id]
+    pin_refs(pinned, session_id=session_id)
+    try:
+        return _run_operation(op_id, config, input_ref_id, step_label_map, is_preview,
+                              formula, step_id, session_id, result_store)
+    finally:
+        unpin_refs(pinned, session_id=session_id)
+
+
+def _run_operation(
+    op_id: str,
+    config: Any,
+    input_ref_id: Optional[str],
+    step_label_map: Optional[Dict[str, str]],
+    is_preview: bool,
+    formula: Optional[str],
+    step_id: Optional[str],
+    session_id: Optional[str],
+    result_store: Optional[str],
+) -> tuple[str, dict]:
     step_map = step_label_map or {}
 
     # 1. Resolve Input
@@ -399,12 +762,7 @@ def run_operation(
     # (e.g., 'df' or 'data'). This handles cases like config: {"data": "step1"}
     # where resolve_reference returned a DataFrame object.
     # Use the raw function signature to decide how to treat DataFrame/Series
-    try:
-        import inspect as _inspect
-        sig = _inspect.signature(func)
-        func_params = set(sig.parameters.keys())
-    except Exception:
-        func_params = set()
+    func_params = call_plan(func).param_set
 
     for key, val in list(resolved_config.items()):
         try:
@@ -430,12 +788,41 @@ def run_operation(
                 if '_input_df' not in resolved_config:
                     resolved_config['_input_df'] = val
     
+    # 4b. Step result cache (opt-in): same op + source + resolved config +
+    #     input data → reuse the previous output instead of re-running.
+    cache_key = None
+    if op_def.get('deterministic', True) and step_cache.is_enabled():
+        cache_key = step_cache.make_key(op_id, func, orchestrator_type, resolved_config, config)
+    if cache_key:
+        token = _session_token(session_id)
+        cached_ref, cached_df = step_cache.lookup(cache_key, token)
+        if cached_ref is not None:
+            # Only the shape is needed; a spilled output stays on disk.
+            cached_df = _peek_dataframe(cached_ref)
+            if cached_df is not None:
+                print(f"Step cache hit for '{op_id}' → {cached_ref}")
+                return cached_ref, {"rows": len(cached_df), "columns": list(cached_df.columns), "cached": True}
+            # Evicted between lookup and load — run the step normally.
+        elif cached_df is not None:
+            print(f"Step cache hit for '{op_id}' (restored from disk)")
+            out_ref = save_dataframe(cached_df, session_id=session_id, store_mode=result_store)
+            step_cache.record(cache_key, token, out_ref, cached_df)
+            return out_ref, {"rows": len(cached_df), "columns": list(cached_df.columns), "cached": True}
+
     executable_func = func if not wrapper else wrapper(func)
+
+    # Streaming (chunked) execution publishes finished chunks under the
+    # output ref while the step is still running.
+    chunk_rows = _stream_chunk_rows(config)
+    stream_ref = new_ref_id(session_id) if chunk_rows else None
     
     # 5. Execute
     print(f"Running '{op_id}' with orchestrator '{orchestrator_type}'")
     try:
-        result_df = executable_func(**resolved_config)
+        with step_options(concurrency=config.get('_concurrency'), executor=config.get('_executor'),
+                          flatten=config.get('_flatten'), on_error=config.get('_on_error')), \
+                running_op(op_id), track_progress(step_id), stream_results(stream_ref, chunk_rows):
+            result_df = executable_func(**resolved_config)
         
         if not isinstance(result_df, pd.DataFrame):
              print(f"Warning: Operation {op_id} returned {type(result_df)}, expected DataFrame")
@@ -449,6 +836,8 @@ def run_operation(
                  result_df = pd.DataFrame([result_df])
                  
     except Exception as e:
+        if stream_ref:
+            discard_partial(stream_ref)
         # Keep normal runs clean (CLI/library demos), but allow opt-in
         # traceback printing for local debugging.
         if os.environ.get("SIMPLE_STEPS_DEBUG_TRACEBACKS", "").strip().lower() in {"1", "true", "yes"}:
@@ -457,6 +846,12 @@ def run_operation(
         raise ValueError(f"Error executing step {op_id}: {str(e)}") from e
 
     # 6. Save Result
-    out_ref = save_dataframe(result_df, session_id=session_id, store_mode=result_store)
+    try:
+        out_ref = save_dataframe(result_df, session_id=session_id, store_mode=result_store, ref_id=stream_ref)
+    finally:
+        if stream_ref:
+            discard_partial(stream_ref)
+    if cache_key:
+        step_cache.record(cache_key, _session_token(session_id), out_ref, result_df)
     
     return out_ref, {"rows": len(result_df), "columns": list(result_df.columns)}
@@ -34,7 +34,9 @@ import numpy as np
 from typing import Optional, Dict, Any
 
 from .engine import get_dataframe
-from .step_proxy import StepProxy, ColumnProxy, step as make_step, unwrap_step, RawValue, raw as make_raw
+from .step_proxy import (
+    StepProxy, ColumnProxy, LazyStepEnv, step as make_step, unwrap_step, RawValue, raw as make_raw,
+)
 
 
 def run_eval(
@@ -84,11 +86,11 @@ def _build_namespace(
     Build the execution namespace — this is what makes the formula bar
     feel like an interactive Python session.
     """
-    from .decorators import OPERATION_REGISTRY, _auto_broadcast
+    from .decorators import broadcast_callables
     from .helpers import map_each, apply_to, filter_by, expand_each, val, col
     import re
 
-    ns: Dict[str, Any] = {
+    ns = _LazyNamespace({
         "__builtins__": __builtins__,
         "pd": pd,
         "np": np,
@@ -102,17 +104,15 @@ def _build_namespace(
         "expand_each": expand_each,
         "val": val,
         "col": col,
-    }
+    })
 
-    # ── Populate step variables: step1, step2, … + label-based names ─────
-    for key, ref_id in step_map.items():
-        df = get_dataframe(ref_id, session_id=session_id)
-        if df is None:
-            continue
-        proxy = StepProxy(df, label=key, ref_id=ref_id)
-
-        # Always add under the exact key
-        ns[key] = proxy
+    # ── Step variables: step1, step2, … + label-based names ──────────────
+    # Registered lazily — a step's data is loaded the first time the code
+    # looks its name up, not for every step in the map.
+    steps = LazyStepEnv(step_map, lambda rid: get_dataframe(rid, session_id=session_id))
+    for key in list(steps):
+        # The exact key shadows the convenience names above.
+        ns.pop(key, None)
 
         # Also add a Python-safe identifier version (spaces → underscores,
         # strip non-alphanum) so "Step 0" becomes "Step_0"
@@ -120,19 +120,35 @@ def _build_namespace(
         if safe_key and safe_key[0].isdigit():
             safe_key = f"_{safe_key}"
         if safe_key and safe_key not in ns:
-            ns[safe_key] = proxy
+            steps.add_alias(safe_key, key)
+    ns.steps = steps
 
     # ── Populate all registered operations as callable functions ──────────
-    # Wrap each raw function with _auto_broadcast so they auto-map
-    # when called with ColumnProxy args.
-    for op_id, entry in OPERATION_REGISTRY.items():
-        func = entry["func"]
-        op_type = entry.get("type", "map")
-        ns[op_id] = _auto_broadcast(func, operation_type=op_type)
+    # Each raw function wrapped with _auto_broadcast so they auto-map
+    # when called with ColumnProxy args (wrappers cached per registry version).
+    ns.update(broadcast_callables())
 
     return ns
 
 
+class _LazyNamespace(dict):
+    """
+    Globals dict for eval/exec that resolves step names on first lookup.
+
+    Names already in the dict (helpers, registered ops) win; anything
+    missing is looked up in ``steps`` and memoized.
+    """
+
+    steps: Optional[LazyStepEnv] = None
+
+    def __missing__(self, key: str) -> Any:
+        if self.steps is not None and key in self.steps:
+            proxy = self.steps[key]
+            self[key] = proxy
+            return proxy
+        raise KeyError(key)
+
+
 def _normalize_result(result: Any, df_in: Optional[pd.DataFrame]) -> pd.DataFrame:
     """Convert whatever the eval produced into a DataFrame."""
     if result is None:
@@ -0,0 +1,124 @@
+"""
+Execution options declared by an operation.
+
+``@simple_step`` / ``register_operation`` / ``pack.step`` validate the
+execution keywords (``vectorized``, ``concurrency``, ``executor``,
+``flatten``, ``cache``, ``rate_limit``, ``retries``, ``retry_on``,
+``backoff``, ``on_error``) into one frozen ``ExecOptions`` stored on the
+registry entry (``"options"``). That entry is the only place they live.
+
+The orchestrators are handed the raw function, so ``exec_options(func)``
+finds its entry: the op the current step is running (``running_op``, set
+by ``engine.run_operation``, the ``ss_*`` ops and the broadcast wrappers)
+when it was registered with *func*, otherwise the op registered with
+*func* most recently. One function registered under two ids therefore
+runs with each id's own options. Per-step overrides (``_concurrency`` …)
+are layered on top in ``row_executor``.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator, Optional, Tuple, Type, Union
+
+
+@dataclass(frozen=True)
+class ExecOptions:
+    op_id: Optional[str] = None
+    vectorized: Union[bool, str, Callable, None] = None
+    concurrency: Optional[int] = None
+    executor: Optional[str] = None
+    flatten: Optional[int] = None
+    cache: Optional[str] = None
+    rate_limit: Optional[float] = None    # calls per second
+    retries: int = 0
+    retry_on: Optional[Tuple[Type[BaseException], ...]] = None
+    backoff: Optional[float] = None
+    on_error: Optional[str] = None
+
+
+DEFAULT_OPTIONS = ExecOptions()
+
+_ACTIVE_OP: ContextVar[Optional[str]] = ContextVar("simple_steps_active_op", default=None)
+
+
+def build_exec_options(
+    op_id: Optional[str] = None,
+    vectorized: Union[bool, str, Callable, None] = None,
+    concurrency: Optional[int] = None,
+    executor: Optional[str] = None,
+    flatten: Optional[int] = None,
+    cache: Optional[str] = None,
+    rate_limit: Union[int, float, str, None] = None,
+    retries: int = 0,
+    retry_on: Union[type, Tuple[type, ...], None] = None,
+    backoff: Optional[float] = None,
+    on_error: Optional[str] = None,
+) -> ExecOptions:
+    """Validate an op's execution keywords; raises ValueError on bad values."""
+    if vectorized not in (None, False, True, "auto") and not callable(vectorized):
+        raise ValueError("vectorized must be True, False, None, 'auto' or a callable")
+    if concurrency is not None and (not isinstance(concurrency, int) or concurrency < 1):
+        raise ValueError("concurrency must be a positive integer")
+    if executor not in (None, "thread", "process"):
+        raise ValueError("executor must be None, 'thread' or 'process'")
+    if flatten is not None and (not isinstance(flatten, int) or flatten < 0):
+        raise ValueError("flatten must be a non-negative integer")
+    if cache not in (None, "disk"):
+        raise ValueError("cache must be None or 'disk'")
+    from .row_policy import parse_rate_limit
+    rate = parse_rate_limit(rate_limit)
+    if not isinstance(retries, int) or retries < 0:
+        raise ValueError("retries must be a non-negative integer")
+    if isinstance(retry_on, type):
+        retry_on = (retry_on,)
+    if retry_on is not None and not all(
+        isinstance(t, type) and issubclass(t, BaseException) for t in retry_on
+    ):
+        raise ValueError("retry_on must be an exception type or a tuple of them")
+    if backoff is not None and (not isinstance(backoff, (int, float)) or backoff < 0):
+        raise ValueError("backoff must be a non-negative number of seconds")
+    if on_error not in (None, "raise", "continue"):
+        raise ValueError("on_error must be None, 'raise' or 'continue'")
+    return ExecOptions(
+        op_id=op_id,
+        vectorized=vectorized,
+        concurrency=concurrency,
+        executor=executor,
+        flatten=flatten,
+        cache=cache,
+        rate_limit=rate,
+        retries=retries,
+        retry_on=tuple(retry_on) if retry_on is not None else None,
+        backoff=backoff,
+        on_error=on_error,
+    )
+
+
+@contextmanager
+def running_op(op_id: Optional[str]) -> Iterator[None]:
+    """Mark *op_id* as the op whose options apply for the duration (None: leave as is)."""
+    if op_id is None:
+        yield
+        return
+    token = _ACTIVE_OP.set(op_id)
+    try:
+        yield
+    finally:
+        _ACTIVE_OP.reset(token)
+
+
+def exec_options(func: Callable) -> ExecOptions:
+    """The ``ExecOptions`` that apply to *func* (``DEFAULT_OPTIONS`` if unregistered)."""
+    from .decorators import OPERATION_REGISTRY
+
+    active = _ACTIVE_OP.get()
+    entry: Any = OPERATION_REGISTRY.get(active) if active is not None else None
+    if entry is None or entry.get("func") is not func:
+        entry = None
+        for candidate in reversed(list(OPERATION_REGISTRY.values())):
+            if candidate.get("func") is func:
+                entry = candidate
+                break
+    if entry is None:
+        return DEFAULT_OPTIONS
+    return entry.get("options") or DEFAULT_OPTIONS
@@ -1,4 +1,4 @@
-from fastapi import FastAPI, HTTPException, Body
+from fastapi import FastAPI, HTTPException, Body, Query
 from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
@@ -16,9 +16,12 @@ from .models import (
     DataViewRequest,
     ProjectInfo,
     PipelineFile,
+    PipelineRunRequest,
+    PipelineRunResponse,
+    PipelineStatusResponse,
 )
 from .operations import DEFINITIONS as OPERATIONS
-from .engine import run_operation, get_dataframe
+from .engine import run_operation, get_dataframe, flush_result_writes
 from . import orchestration_ops  # noqa: F401 — registers ss_map, ss_filter, ss_expand, ss_reduce
 from .operation_pack import PACK_REGISTRY
 from .pack_loader import PackLoader, OpTier, set_loader, get_loader
@@ -148,6 +151,27 @@ app = FastAPI(
     description="Orchestrates data operations defined by developers"
 )
 
+@app.on_event("startup")
+def _start_session_reaper():
+    """Expire idle sessions when settings.session_ttl_seconds is set."""
+    from .sessions import start_reaper
+    start_reaper()
+
+
+@app.on_event("shutdown")
+def _flush_pending_result_writes():
+    """Don't lose queued write-behind results when the server stops."""
+    from .sessions import stop_reaper
+    stop_reaper()
+    flush_result_writes()
+
+
+@app.on_event("shutdown")
+def _stop_process_pool():
+    """Stop worker processes started for executor="process" ops."""
+    from .process_executor import shutdown_process_pool
+    shutdown_process_pool()
+
 # --- Agent Router ---
 app.include_router(agent_router)
 
@@ -500,6 +524,67 @@ async def debug_registry():
     }
 
 
+@app.get("/api/debug/store")
+async def debug_store():
+    """
+    Returns memory usage of the step-result store: total bytes held in
+    RAM, the configured budget, and how many refs are tracked / pinned.
+    """
+    from .engine import store_stats
+    return store_stats()
+
+
+@app.get("/api/debug/step-cache")
+async def debug_step_cache():
+    """Hit / miss counters and disk usage of the step result cache."""
+    from .step_cache import stats
+    return stats()
+
+
+@app.delete("/api/debug/step-cache")
+async def clear_step_cache():
+    """Drop every memoized step result."""
+    from .step_cache import clear, stats
+    clear()
+    return stats()
+
+
+@app.get("/api/debug/row-cache")
+async def debug_row_cache():
+    """Hit / miss counters and disk usage of the cache="disk" row memo."""
+    from .row_cache import stats
+    return stats()
+
+
+@app.delete("/api/debug/row-cache")
+async def clear_row_cache():
+    """Drop every memoized row call."""
+    from .row_cache import clear, stats
+    clear()
+    return stats()
+
+
+# --- 1.1b Sessions ---
+@app.get("/api/sessions")
+async def api_list_sessions():
+    """
+    Lists every session holding results, with ref counts and byte sizes
+    in RAM and on disk, plus when it was last used.
+    """
+    from .sessions import list_sessions
+    return {"sessions": list_sessions()}
+
+
+@app.delete("/api/sessions/{session_id}")
+async def api_delete_session(session_id: str):
+    """Drops every result of a session, in RAM and on disk."""
+    from .sessions import delete_session
+    removed = delete_session(session_id)
+    if removed is None:
+        raise HTTPException(status_code=404, detail=f"Session '{session_id}' not found")
+    return {"session_id": session_id, "removed": removed}
+
+
 # --- 1.2 Operation Packs Health ---
 @app.get("/api/packs")
 async def list_packs():
@@ -720,7 +805,76 @@ async def execute_step(payload: StepRunRequest):
             }
         )
 
-# --- 2a. Step Progress SSE ---
+# --- 2a. Whole-Pipeline Execution ---
+@app.post("/api/pipelines/run", response_model=PipelineRunResponse)
+async def start_pipeline(payload: PipelineRunRequest):
+    """
+    Runs every step of a pipeline on the backend. Steps are ordered by the
+    step references in their expressions; independent steps run in
+    parallel. Poll GET /api/pipelines/runs/{run_id} for progress.
+    """
+    from .pipeline_runner import start_pipeline_run
+    run = start_pipeline_run(
+        payload.pipeline,
+        session_id=payload.session_id,
+        result_store=payload.result_store,
+        max_workers=payload.max_workers,
+        on_error=payload.on_error,
+    )
+    return PipelineRunResponse(run_id=run.run_id)
+
+
+@app.post("/api/pipelines/{pipeline_id}/run", response_model=PipelineRunResponse)
+async def rerun_pipeline(
+    pipeline_id: str,
+    payload: PipelineRunRequest,
+    from_step: Optional[str] = Query(None, alias="from"),
+):
+    """
+    Incremental re-run. Steps whose expression and upstream steps are
+    unchanged since this pipeline's last run (in the same session) return
+    their previous output refs immediately; only the dirty subgraph is
+    recomputed. ``?from=<step>`` also forces that step and everything
+    downstream of it to recompute.
+    """
+    from .pipeline_runner import start_pipeline_run
+    try:
+        run = start_pipeline_run(
+            payload.pipeline,
+            session_id=payload.session_id,
+            result_store=payload.result_store,
+            max_workers=payload.max_workers,
+            on_error=payload.on_error,
+            incremental=True,
+            from_step=from_step,
+            pipeline_id=pipeline_id,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return PipelineRunResponse(run_id=run.run_id)
+
+
+@app.get("/api/pipelines/runs/{run_id}", response_model=PipelineStatusResponse)
+async def pipeline_run_status(run_id: str):
+    """Per-step status and output refs of a pipeline run."""
+    from .pipeline_runner import get_run
+    run = get_run(run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="Pipeline run not found")
+    return run.status()
+
+
+@app.post("/api/pipelines/runs/{run_id}/stop", response_model=PipelineStatusResponse)
+async def stop_pipeline_run(run_id: str):
+    """Stop scheduling new steps; steps already running finish normally."""
+    from .pipeline_runner import get_run
+    run = get_run(run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="Pipeline run not found")
+    run.stop()
+    return run.status()
+
+# --- 2b. Step Progress SSE ---
 from .progress import get_progress
 from starlette.responses import StreamingResponse
 import asyncio, json as _json
@@ -759,7 +913,7 @@ async def stream_progress(step_id: str):
 
     return StreamingResponse(event_generator(), media_type="text/event-stream")
 
-# --- 2b. Settings (Runtime Configuration) ---
+# --- 2c. Settings (Runtime Configuration) ---
 from .settings import get_settings, update_settings
 
 @app.get("/api/settings")
@@ -790,12 +944,18 @@ async def get_data_view(
     Returns a slice of data for the Frontend Grid.
     This is lightweight and fast.
     """
-    df = get_dataframe(ref_id)
-    if df is None:
-        raise HTTPException(status_code=404, detail="Data reference expired")
-    
-    # Slice the dataframe safely
-    subset = df.iloc[offset : offset + limit]
+    from .streaming import get_partial
+    partial = get_partial(ref_id)
+    if partial is not None:
+        # Step still streaming — serve the rows of its finished chunks.
+        subset = partial.page(offset, limit)
+    else:
+        df = get_dataframe(ref_id)
+        if df is None:
+            raise HTTPException(status_code=404, detail="Data reference expired")
+
+        # Slice the dataframe safely
+        subset = df.iloc[offset : offset + limit]
     
     cells = []
     
@@ -844,7 +1004,13 @@ async def get_data_meta(ref_id: str):
     """
     Returns lightweight metadata for a result reference.
     Useful for UI orchestration barriers (e.g. waiting for row-count stability).
+    ``partial`` is true while a streaming step is still adding rows.
     """
+    from .streaming import get_partial
+    partial = get_partial(ref_id)
+    if partial is not None:
+        return {"rows": partial.rows, "columns": partial.columns, "partial": True}
+
     df = get_dataframe(ref_id)
     if df is None:
         raise HTTPException(status_code=404, detail="Data reference expired")
@@ -852,6 +1018,7 @@ async def get_data_meta(ref_id: str):
     return {
         "rows": int(len(df)),
         "columns": [str(c) for c in df.columns],
+        "partial": False,
     }
 
 # ── Serve bundled frontend (SPA) ────────────────────────────────────────────
@@ -233,7 +233,7 @@ class StepRunRequest(BaseModel):
     is_preview: bool = False
     formula: Optional[str] = None  # raw formula string for eval-mode fallback
     session_id: Optional[str] = None
-    result_store: Optional[Literal['memory', 'parquet']] = None
+    result_store: Optional[Literal['memory', 'parquet', 'arrow', 'sqlite']] = None
 
 class StepRunResponse(BaseModel):
     status: Literal['success', 'failed']
@@ -242,6 +242,14 @@ class StepRunResponse(BaseModel):
     error: Optional[str] = None
 
 # --- 5. Global Control Responses ---
+class PipelineRunRequest(BaseModel):
+    """Run a whole pipeline server-side (independent steps in parallel)."""
+    pipeline: PipelineFile
+    session_id: Optional[str] = None
+    result_store: Optional[Literal['memory', 'parquet', 'arrow', 'sqlite']] = None
+    max_workers: int = 4
+    on_error: Literal['stop', 'continue'] = 'stop'
+
 class PipelineRunResponse(BaseModel):
     run_id: str
 
@@ -250,6 +258,8 @@ class PipelineStatusResponse(BaseModel):
     status: Literal['running', 'completed', 'failed', 'stopped']
     current_step_index: int
     step_statuses: Dict[str, Literal['pending', 'running', 'completed', 'failed']]
+    step_refs: Dict[str, str] = Field(default_factory=dict)   # step id → output ref
+    errors: Dict[str, str] = Field(default_factory=dict)      # step id → message
 
 # --- 6. Data View ---
 class DataViewRequest(BaseModel):
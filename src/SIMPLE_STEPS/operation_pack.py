@@ -35,7 +35,6 @@ Usage:
 from __future__ import annotations
 
 import os
-import inspect
 import traceback
 from dataclasses import dataclass, field
 from typing import (
@@ -49,6 +48,7 @@ from typing import (
     Tuple,
 )
 
+from .call_plan import call_plan
 from .decorators import simple_step, register_operation, OPERATION_REGISTRY
 from .models import OperationDefinition
 
@@ -81,6 +81,17 @@ class _DeferredStep:
     params: Optional[list]        # explicit params or None → infer
     input_contract: Optional[Dict[str, str]]   # {col_name: expected_dtype}
     output_contract: Optional[Dict[str, str]]
+    deterministic: bool = True
+    vectorized: Any = None
+    concurrency: Optional[int] = None
+    executor: Optional[str] = None
+    flatten: Optional[int] = None
+    cache: Optional[str] = None
+    rate_limit: Any = None
+    retries: int = 0
+    retry_on: Any = None
+    backoff: Optional[float] = None
+    on_error: Optional[str] = None
 
 
 # ── Global pack registry (all packs that have been .register()'d) ───────────
@@ -138,6 +149,17 @@ class OperationPack:
         params: Optional[list] = None,
         input_contract: Optional[Dict[str, str]] = None,
         output_contract: Optional[Dict[str, str]] = None,
+        deterministic: bool = True,
+        vectorized: Any = None,
+        concurrency: Optional[int] = None,
+        executor: Optional[str] = None,
+        flatten: Optional[int] = None,
+        cache: Optional[str] = None,
+        rate_limit: Any = None,
+        retries: int = 0,
+        retry_on: Any = None,
+        backoff: Optional[float] = None,
+        on_error: Optional[str] = None,
     ):
         """
         Decorator that queues a function for registration when
@@ -163,6 +185,33 @@ class OperationPack:
             e.g. ``{"url": "str", "views": "int"}``.
         output_contract : dict, optional
             Promised output columns and their dtypes.
+        deterministic : bool
+            False for ops whose output can change for identical inputs;
+            excludes them from the step result cache.
+        vectorized : bool, "auto" or callable, optional
+            Whole-column fast path for the map orchestrator — see
+            ``simple_step``.
+        concurrency : int, optional
+            Max concurrent row calls when the op is mapped — see
+            ``simple_step``.
+        executor : str, optional
+            ``"process"`` maps rows in worker processes — see
+            ``simple_step``.
+        flatten : int, optional
+            Levels of nested dict results to flatten into columns — see
+            ``simple_step``.
+        cache : str, optional
+            ``"disk"`` memoizes row calls across runs — see
+            ``simple_step``.
+        rate_limit : float or str, optional
+            Max mapped calls per second, or ``"N/s"`` / ``"N/min"`` — see
+            ``simple_step``.
+        retries, retry_on, backoff : optional
+            Retry failing row calls (on these exception types) with
+            exponential backoff — see ``simple_step``.
+        on_error : str, optional
+            ``"continue"`` records failing rows in ``_error`` instead of
+            aborting the step — see ``simple_step``.
         """
         def decorator(func: Callable) -> Callable:
             self._deferred.append(_DeferredStep(
@@ -175,6 +224,17 @@ class OperationPack:
                 params=params,
                 input_contract=input_contract,
                 output_contract=output_contract,
+                deterministic=deterministic,
+                vectorized=vectorized,
+                concurrency=concurrency,
+                executor=executor,
+                flatten=flatten,
+                cache=cache,
+                rate_limit=rate_limit,
+                retries=retries,
+                retry_on=retry_on,
+                backoff=backoff,
+                on_error=on_error,
             ))
             return func   # return unmodified — same as @simple_step
         return decorator
@@ -233,6 +293,17 @@ class OperationPack:
                 operation_type=ds.operation_type,
                 params=ds.params,
                 description=ds.description or (ds.func.__doc__ if available else f"[UNAVAILABLE] {reason}"),
+                deterministic=ds.deterministic,
+                vectorized=ds.vectorized,
+                concurrency=ds.concurrency,
+                executor=ds.executor,
+                flatten=ds.flatten,
+                cache=ds.cache,
+                rate_limit=ds.rate_limit,
+                retries=ds.retries if available else 0,
+                retry_on=ds.retry_on,
+                backoff=ds.backoff,
+                on_error=ds.on_error,
             )
             self._registered_ops.append(ds.op_id)
         except Exception as e:
@@ -251,8 +322,8 @@ class OperationPack:
         func = ds.func
         input_contract = ds.input_contract
         output_contract = ds.output_contract
-        func_sig = inspect.signature(func)
-        func_params = set(func_sig.parameters.keys())
+        plan = call_plan(func)
+        func_params = plan.param_set
 
         def _validated(*args, **kwargs):
             # ── Map engine-injected _input_df to the function's DF param ──
@@ -264,18 +335,13 @@ class OperationPack:
                         kwargs[name] = df_arg
                         break
                 else:
-                    # If no conventional name, try the first DataFrame-annotated param
-                    for pname, p in func_sig.parameters.items():
-                        if p.annotation is pd.DataFrame:
-                            kwargs[pname] = df_arg
-                            break
+                    # If no conventional name, try the DataFrame-annotated param
+                    if plan.df_param:
+                        kwargs[plan.df_param] = df_arg
 
             # ── Filter kwargs to only what the function accepts ──────
             # (avoid "unexpected keyword argument" errors)
-            if not any(
-                p.kind == inspect.Parameter.VAR_KEYWORD
-                for p in func_sig.parameters.values()
-            ):
+            if not plan.accepts_var_kwargs:
                 kwargs = {k: v for k, v in kwargs.items() if k in func_params}
 
             # ── Validate input ──────────────────────────────────────
@@ -23,9 +23,19 @@ passed through to the target function.
 
 import inspect
 import pandas as pd
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, FrozenSet, Optional, Tuple
 
+from .call_plan import call_plan
 from .decorators import simple_step, OPERATION_REGISTRY
+from .exec_options import running_op
+from .orchestrators import fan_out, filter_rows, records_frame
+from .streaming import streamable
+from .row_cache import cached_rows, resolve_cache
+from .row_executor import (
+    ERROR_COLUMN, PROCESS, continues_on_error, is_async_op, resolve_awaitable, resolve_concurrency,
+    resolve_executor, resolve_flatten, run_row_kwargs, run_rows,
+)
+from .row_policy import apply_policy
 
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -51,23 +61,76 @@ def _bind_kwargs(func, df: pd.DataFrame, extra: Dict[str, Any]) -> Dict[str, Any
     replace it with that column's Series (for row-level ops) or leave as-is.
     Returns a dict of {param: value_or_column_name} suitable for per-row dispatch.
     """
-    sig = inspect.signature(func)
+    params = call_plan(func).param_set
     bound: Dict[str, Any] = {}
     for k, v in extra.items():
-        if k in sig.parameters:
+        if k in params:
             bound[k] = v
     return bound
 
 
-def _col_val(df: pd.DataFrame, row: pd.Series, v: Any) -> Any:
+def _bind_columns(
+    df: pd.DataFrame, kwargs: Dict[str, Any], valid_params: FrozenSet[str]
+) -> Tuple[Dict[str, Any], Dict[str, list]]:
+    """
+    Split kwargs into scalars and column bindings, once for the whole frame.
+
+    A kwarg whose value is a string naming a column in df is bound to that
+    column, pulled out as a plain list (native Python values, no per-row
+    Series); anything else is a literal passed to every call. Kwargs the
+    target function doesn't accept are dropped.
+    """
+    scalars: Dict[str, Any] = {}
+    columns: Dict[str, list] = {}
+    for k, v in kwargs.items():
+        if k not in valid_params:
+            continue
+        if isinstance(v, str) and v in df.columns:
+            columns[k] = df[v].tolist()
+        else:
+            scalars[k] = v
+    return scalars, columns
+
+
+def _run_bound_rows(func: Callable, df: pd.DataFrame, kwargs: Dict[str, Any],
+                    valid_params: FrozenSet[str], fn: str, capture_errors: bool = True):
     """
-    Resolve a value against a DataFrame row.
-    If v is a string matching a column name, return the row's value for it.
-    Otherwise return v as-is (scalar / literal).
+    Call *func* once per row with its bound kwargs, on the op's executor
+    (thread pool, event loop or worker processes), serving stored rows of
+    a ``cache="disk"`` op from the row cache. Returns ``run_rows``'s
+    ``(results, errors)``.
     """
-    if isinstance(v, str) and v in df.columns:
-        return row[v]
-    return v
+    # Options of the fn op itself, not of the ss_* op running it.
+    with running_op(fn):
+        scalars, columns = _bind_columns(df, kwargs, valid_params)
+        n = len(df)
+
+        if resolve_cache(func) or resolve_executor(func) == PROCESS:
+            keys = list(columns)
+            if keys:
+                row_kwargs = [dict(scalars, **dict(zip(keys, vals))) for vals in zip(*columns.values())]
+            else:
+                row_kwargs = [dict(scalars) for _ in range(n)]
+            if resolve_cache(func):
+                return cached_rows(
+                    func, row_kwargs,
+                    lambda rows: run_row_kwargs(func, rows, label=fn, capture_errors=capture_errors),
+                    label=fn,
+                )
+            return run_row_kwargs(func, row_kwargs, label=fn, capture_errors=capture_errors)
+
+        bindings = list(columns.items())
+        guarded = apply_policy(func)
+
+        def call_row(i: int):
+            row_kwargs = dict(scalars)
+            for k, col in bindings:
+                row_kwargs[k] = col[i]
+            return guarded(**row_kwargs)
+
+        return run_rows(call_row, n, resolve_concurrency(func), label=fn,
+                        is_async=is_async_op(func), capture_errors=capture_errors,
+                        continue_on_error=continues_on_error(func))
 
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -80,6 +143,7 @@ def _col_val(df: pd.DataFrame, row: pd.Series, v: Any) -> Any:
     category="Orchestration",
     operation_type="orchestrator",
 )
+@streamable
 def ss_map(df: pd.DataFrame, fn: str = "", **kwargs) -> pd.DataFrame:
     """
     Apply a registered operation row-by-row over the input DataFrame.
@@ -94,29 +158,24 @@ def ss_map(df: pd.DataFrame, fn: str = "", **kwargs) -> pd.DataFrame:
     Python:   step2 = ss_map(df=step1, fn="yt_extract_metadata", url="url")
     """
     func = _resolve_fn(fn)
-    sig = inspect.signature(func)
     # Only pass kwargs that the target function actually accepts
-    valid_params = set(sig.parameters.keys())
-
-    results = []
-    for _, row in df.iterrows():
-        row_kwargs = {
-            k: _col_val(df, row, v)
-            for k, v in kwargs.items()
-            if k in valid_params
-        }
-        result = func(**row_kwargs)
-        results.append(result)
+    valid_params = call_plan(func).param_set
+
+    results, errors = _run_bound_rows(func, df, kwargs, valid_params, fn)
 
     result_df = df.copy().reset_index(drop=True)
 
     if results:
-        first = results[0]
+        first = next((r for r, e in zip(results, errors) if e is None), None)
         if isinstance(first, dict):
-            expanded = pd.DataFrame(results).reset_index(drop=True)
+            with running_op(fn):
+                flatten = resolve_flatten(func)
+            expanded = records_frame(results, flatten)
             result_df = pd.concat([result_df, expanded], axis=1)
         else:
             result_df[f"{fn}_output"] = results
+        if any(errors):
+            result_df[ERROR_COLUMN] = errors
 
     return result_df
 
@@ -131,6 +190,7 @@ def ss_map(df: pd.DataFrame, fn: str = "", **kwargs) -> pd.DataFrame:
     category="Orchestration",
     operation_type="orchestrator",
 )
+@streamable
 def ss_filter(df: pd.DataFrame, fn: str = "", **kwargs) -> pd.DataFrame:
     """
     Keep only the rows of df for which fn(**row_values) returns True.
@@ -139,19 +199,11 @@ def ss_filter(df: pd.DataFrame, fn: str = "", **kwargs) -> pd.DataFrame:
     Python:   step3 = ss_filter(df=step2, fn="is_video_popular", views="views", min_views=1000)
     """
     func = _resolve_fn(fn)
-    sig = inspect.signature(func)
-    valid_params = set(sig.parameters.keys())
+    valid_params = call_plan(func).param_set
 
-    mask = []
-    for _, row in df.iterrows():
-        row_kwargs = {
-            k: _col_val(df, row, v)
-            for k, v in kwargs.items()
-            if k in valid_params
-        }
-        mask.append(bool(func(**row_kwargs)))
+    results, errors = _run_bound_rows(func, df, kwargs, valid_params, fn, capture_errors=False)
 
-    return df[mask].reset_index(drop=True)
+    return filter_rows(df, results, errors)
 
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -164,6 +216,7 @@ def ss_filter(df: pd.DataFrame, fn: str = "", **kwargs) -> pd.DataFrame:
     category="Orchestration",
     operation_type="orchestrator",
 )
+@streamable
 def ss_expand(df: pd.DataFrame, fn: str = "", **kwargs) -> pd.DataFrame:
     """
     Apply fn to each row; the function should return a list.
@@ -173,27 +226,13 @@ def ss_expand(df: pd.DataFrame, fn: str = "", **kwargs) -> pd.DataFrame:
     Python:   step4 = ss_expand(df=step3, fn="segment_conversations", transcript="transcript")
     """
     func = _resolve_fn(fn)
-    sig = inspect.signature(func)
-    valid_params = set(sig.parameters.keys())
-
-    rows_out = []
-    for _, row in df.iterrows():
-        row_kwargs = {
-            k: _col_val(df, row, v)
-            for k, v in kwargs.items()
-            if k in valid_params
-        }
-        result = func(**row_kwargs)
-        items = result if isinstance(result, list) else [result]
-        for item in items:
-            base = row.to_dict()
-            if isinstance(item, dict):
-                base.update(item)
-            else:
-                base[f"{fn}_output"] = item
-            rows_out.append(base)
+    valid_params = call_plan(func).param_set
+
+    results, errors = _run_bound_rows(func, df, kwargs, valid_params, fn, capture_errors=False)
 
-    return pd.DataFrame(rows_out).reset_index(drop=True) if rows_out else pd.DataFrame()
+    with running_op(fn):
+        flatten = resolve_flatten(func)
+    return fan_out(df, results, f"{fn}_output", flatten, keep_empty=False, errors=errors)
 
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -215,14 +254,14 @@ def ss_reduce(df: pd.DataFrame, fn: str = "", **kwargs) -> pd.DataFrame:
     Python:   step5 = ss_reduce(df=step4, fn="generate_report")
     """
     func = _resolve_fn(fn)
-    sig = inspect.signature(func)
-    valid_params = set(sig.parameters.keys())
+    plan = call_plan(func)
+    valid_params = plan.param_set
 
     # Inject df into the first parameter that is annotated as pd.DataFrame,
     # or fall back to passing it positionally.
     call_kwargs: Dict[str, Any] = {}
     df_injected = False
-    for param_name, param in sig.parameters.items():
+    for param_name, param in (plan.signature.parameters.items() if plan.signature else ()):
         ann = param.annotation
         if not df_injected and (ann is pd.DataFrame or ann is inspect.Parameter.empty):
             call_kwargs[param_name] = df
@@ -241,6 +280,7 @@ def ss_reduce(df: pd.DataFrame, fn: str = "", **kwargs) -> pd.DataFrame:
         result = func(df, **call_kwargs)
     else:
         result = func(**call_kwargs)
+    result = resolve_awaitable(result)
 
     if isinstance(result, pd.DataFrame):
         return result
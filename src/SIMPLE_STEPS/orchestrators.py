@@ -1,6 +1,15 @@
 import pandas as pd
-from typing import Callable, Any, List, Dict, Optional
-import inspect
+import numpy as np
+from typing import Callable, Any, List, Dict, Optional, Tuple
+from .call_plan import call_plan
+from .exec_options import exec_options
+from .streaming import streamable
+from .row_cache import cached_rows, resolve_cache
+from .row_executor import (
+    ERROR_COLUMN, PROCESS, continues_on_error, is_async_op, resolve_awaitable, resolve_concurrency,
+    resolve_executor, resolve_flatten, run_row_kwargs, run_rows,
+)
+from .row_policy import apply_policy
 
 # --- Helper Functions ---
 
@@ -24,8 +33,7 @@ def _determine_target_col(df: pd.DataFrame, kwargs: Dict[str, Any], func: Callab
     
     # 1. Check if any kwarg key matches a function argument AND value matches a column
     if func:
-        sig = inspect.signature(func)
-        for param_name in sig.parameters:
+        for param_name in call_plan(func).params:
             if param_name in kwargs:
                 val = kwargs[param_name]
                 if isinstance(val, str) and val in df.columns:
@@ -38,6 +46,187 @@ def _determine_target_col(df: pd.DataFrame, kwargs: Dict[str, Any], func: Callab
     # 3. Default to first column
     return df.columns[0]
 
+# (op id or func, column dtype) → whether the "auto" probe found the op vectorizable.
+_VECTOR_PROBES: Dict[Tuple[Any, str], bool] = {}
+
+
+def _try_vectorized(
+    func: Callable,
+    column: pd.Series,
+    main_arg_name: str,
+    func_kwargs: Dict[str, Any],
+) -> Optional[pd.Series]:
+    """
+    Whole-column fast path for the map orchestrator.
+
+    Uses the op's ``vectorized`` declaration (see ``exec_options``).
+    Returns a Series aligned with *column*, or None when the caller should
+    fall back to per-row calls.
+    """
+    options = exec_options(func)
+    declared = options.vectorized
+    if not declared:
+        return None
+
+    probe_key = (options.op_id or func, str(column.dtype))
+    if declared == "auto" and _VECTOR_PROBES.get(probe_key) is False:
+        return None
+
+    impl = declared if callable(declared) else func
+    call_kwargs = dict(func_kwargs)
+    call_kwargs[main_arg_name] = column
+    try:
+        result = impl(**call_kwargs)
+    except Exception:
+        if callable(declared):
+            raise  # a dedicated implementation failing is a real error
+        if declared == "auto":
+            _VECTOR_PROBES[probe_key] = False
+        return None
+
+    if isinstance(result, np.ndarray) and result.ndim == 1:
+        result = pd.Series(result, index=column.index)
+    if isinstance(result, pd.Series) and len(result) == len(column):
+        if declared == "auto":
+            _VECTOR_PROBES[probe_key] = True
+        return result
+
+    if declared == "auto":
+        _VECTOR_PROBES[probe_key] = False
+    else:
+        print(f"[Orchestrator:Map] ⚠ Vectorized {func.__name__} returned "
+              f"{type(result).__name__}, not a {len(column)}-row Series — mapping per row")
+    return None
+
+
+def records_frame(values: List[Any], flatten: int = 0) -> pd.DataFrame:
+    """
+    Build the columns of per-row dict results in one pass.
+
+    Rows may return different keys (missing ones become NaN) and rows that
+    didn't return a dict (failed rows) come out empty. With ``flatten=N``
+    nested dicts are flattened N levels deep into ``parent_child`` columns;
+    otherwise they stay as dict values.
+    """
+    records = [v if isinstance(v, dict) else {} for v in values]
+    if flatten:
+        return pd.json_normalize(records, max_level=flatten, sep="_")
+    return pd.DataFrame.from_records(records, index=pd.RangeIndex(len(records)))
+
+
+def fan_out(input_df: pd.DataFrame, results: List[Any], output_col: str,
+            flatten: int = 0, keep_empty: bool = True,
+            errors: Optional[List[Optional[str]]] = None) -> pd.DataFrame:
+    """
+    Build the output of an expand: input row i repeated once per item of
+    ``results[i]`` (a list, or a single item), with the items laid over it.
+
+    The input columns are gathered once with an ``np.repeat`` index — the
+    input frame is never modified. Dict items become columns (see
+    ``records_frame``) and override input columns only where they set the
+    key; other items go to *output_col*. A row whose result is an empty
+    list keeps one row with an empty output when *keep_empty* (explode
+    semantics), else disappears. Rows with an entry in *errors* keep one
+    empty row carrying the message in ``_error``.
+    """
+    counts = np.empty(len(results), dtype=np.intp)
+    flat: List[Any] = []
+    failed = errors is not None and any(errors)
+    for i, result in enumerate(results):
+        if failed and errors[i] is not None:
+            items = [np.nan]
+        else:
+            items = result if isinstance(result, list) else [result]
+        if not items and keep_empty:
+            items = [np.nan]
+        counts[i] = len(items)
+        flat.extend(items)
+    if not flat:
+        # Keep the schema so downstream column references still resolve.
+        empty_df = input_df.iloc[0:0].reset_index(drop=True)
+        empty_df[output_col] = pd.Series(dtype=object)
+        return empty_df
+
+    result_df = input_df.iloc[np.repeat(np.arange(len(input_df)), counts)].reset_index(drop=True)
+    if failed:
+        result_df = _with_items(result_df, flat, output_col, flatten)
+        result_df[ERROR_COLUMN] = np.repeat(np.array(errors, dtype=object), counts)
+        return result_df
+    return _with_items(result_df, flat, output_col, flatten)
+
+
+def _with_items(result_df: pd.DataFrame, flat: List[Any], output_col: str, flatten: int) -> pd.DataFrame:
+    """Lay the flattened expand items over the repeated input rows."""
+    # infer_dtype scans in C; only a "mixed" column can hold dicts.
+    if (pd.api.types.infer_dtype(flat, skipna=True) != "mixed"
+            or not any(isinstance(item, dict) for item in flat)):
+        result_df[output_col] = pd.Series(flat)
+        return result_df
+
+    records = [item if isinstance(item, dict) else {output_col: item} for item in flat]
+    items_df = records_frame(records, flatten)
+    for col in items_df.columns:
+        if col in result_df.columns:
+            present = np.fromiter((col in r for r in records), dtype=bool, count=len(records))
+            if not present.all():
+                result_df[col] = result_df[col].where(~present, items_df[col])
+                continue
+        result_df[col] = items_df[col].values
+    return result_df
+
+
+def filter_rows(input_df: pd.DataFrame, results: List[Any],
+                errors: Optional[List[Optional[str]]] = None) -> pd.DataFrame:
+    """
+    The rows of *input_df* whose predicate result is truthy. Rows whose
+    call failed (``on_error="continue"``) are kept and carry the message in
+    ``_error``, so failures stay visible instead of silently filtering out.
+    """
+    mask = np.fromiter((bool(r) for r in results), dtype=bool, count=len(results))
+    if errors is None or not any(errors):
+        return input_df[mask].reset_index(drop=True)
+    failed = np.fromiter((e is not None for e in errors), dtype=bool, count=len(errors))
+    result_df = input_df[mask | failed].reset_index(drop=True)
+    result_df[ERROR_COLUMN] = [e for e, keep in zip(errors, mask | failed) if keep]
+    return result_df
+
+
+def _row_caller(func: Callable, values: List[Any], main_arg_name: Optional[str],
+                func_kwargs: Dict[str, Any]) -> Callable[[int], Any]:
+    """``call(i)`` for ``run_rows`` — one private kwargs dict per call."""
+    def call_row(i):
+        row_kwargs = dict(func_kwargs)
+        if main_arg_name:
+            row_kwargs[main_arg_name] = values[i]
+        return func(**row_kwargs)
+    return call_row
+
+
+def _row_kwargs(values: List[Any], main_arg_name: Optional[str],
+                func_kwargs: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Per-row kwargs dicts, for shipping rows to worker processes."""
+    if not main_arg_name:
+        return [dict(func_kwargs) for _ in values]
+    return [{**func_kwargs, main_arg_name: v} for v in values]
+
+
+def _run_in_processes(func: Callable, values: List[Any], main_arg_name: Optional[str],
+                      func_kwargs: Dict[str, Any], capture_errors: bool = True):
+    from .process_executor import run_rows_in_processes
+    return run_rows_in_processes(func, _row_kwargs(values, main_arg_name, func_kwargs),
+                                 label=func.__name__, capture_errors=capture_errors)
+
+
+def _run_cached(func: Callable, values: List[Any], main_arg_name: Optional[str],
+                func_kwargs: Dict[str, Any], capture_errors: bool = True):
+    """Rows of a ``cache="disk"`` op: stored ones from the row cache, the rest on its executor."""
+    return cached_rows(
+        func, _row_kwargs(values, main_arg_name, func_kwargs),
+        lambda rows: run_row_kwargs(func, rows, label=func.__name__, capture_errors=capture_errors),
+        label=func.__name__,
+    )
+
+
 # --- Orchestrator Wrappers ---
 
 def source_wrapper(func: Callable) -> Callable:
@@ -49,7 +238,7 @@ def source_wrapper(func: Callable) -> Callable:
         print(f"[Orchestrator:Source] Executing {func.__name__}...")
         # Source operations don't use the input DataFrame — strip it
         kwargs.pop('_input_df', None)
-        result = func(*args, **kwargs)
+        result = resolve_awaitable(func(*args, **kwargs))
         
         if result is None:
             return pd.DataFrame()
@@ -87,7 +276,7 @@ def rowmap_wrapper(func: Callable) -> Callable:
         if input_df is None:
             # Fallback: Treat as a single scalar call
             print(f"[Orchestrator:Map] No DataFrame input, executing {func.__name__} once.")
-            single_res = func(*args, **kwargs)
+            single_res = resolve_awaitable(func(*args, **kwargs))
             if isinstance(single_res, pd.DataFrame): return single_res
             if isinstance(single_res, dict): return pd.DataFrame([single_res])
             return pd.DataFrame({'output': [single_res]})
@@ -96,12 +285,15 @@ def rowmap_wrapper(func: Callable) -> Callable:
         print(f"[Orchestrator:Map] Mapping {func.__name__} over column '{target_col}'")
         
         # Determine the argument name to pass the value to
-        sig = inspect.signature(func)
+        plan = call_plan(func)
         # Default to first argument
-        main_arg_name = list(sig.parameters.keys())[0] if sig.parameters else None
+        main_arg_name = plan.main_arg
 
         # Prepare valid kwargs for the function (exclude the dataframe itself if not expected)
-        func_kwargs = {k: v for k, v in kwargs.items() if k in sig.parameters and not isinstance(v, pd.DataFrame)}
+        func_kwargs = {k: v for k, v in kwargs.items() if k in plan.param_set and not isinstance(v, pd.DataFrame)}
+
+        # Rate limit / retries declared on the op wrap every row call.
+        guarded = apply_policy(func)
 
         # Apply logic
         try:
@@ -110,9 +302,39 @@ def rowmap_wrapper(func: Callable) -> Callable:
                 # Inject the row value into the main argument
                 if main_arg_name:
                     func_kwargs[main_arg_name] = val
-                return func(**func_kwargs)
+                return guarded(**func_kwargs)
 
-            applied = input_df[target_col].apply(apply_func)
+            applied = None
+            errors = None
+            is_async = is_async_op(func)
+            if main_arg_name and not is_async:
+                applied = _try_vectorized(func, input_df[target_col], main_arg_name, func_kwargs)
+                if applied is not None:
+                    print(f"[Orchestrator:Map] Vectorized call over {len(applied)} rows")
+            concurrency = resolve_concurrency(func)
+            continues = continues_on_error(func)
+            if applied is None and resolve_cache(func):
+                results, errors = _run_cached(func, input_df[target_col].tolist(),
+                                              main_arg_name, func_kwargs)
+                applied = pd.Series(results, dtype=object)
+            if applied is None and resolve_executor(func) == PROCESS:
+                # CPU-bound op: chunks of rows on the worker processes.
+                results, errors = _run_in_processes(func, input_df[target_col].tolist(),
+                                                    main_arg_name, func_kwargs)
+                applied = pd.Series(results, dtype=object)
+            if applied is None and (concurrency > 1 or is_async or continues):
+                # I/O-bound op: bounded thread pool (or event loop for
+                # async def), order preserved, failures per row.
+                values = input_df[target_col].tolist()
+                call_row = _row_caller(guarded, values, main_arg_name, func_kwargs)
+                mode = "coroutines" if is_async else "rows"
+                print(f"[Orchestrator:Map] Running {len(values)} {mode} with concurrency {concurrency}")
+                results, errors = run_rows(call_row, len(values), concurrency,
+                                           label=func.__name__, is_async=is_async,
+                                           continue_on_error=continues)
+                applied = pd.Series(results, dtype=object)
+            if applied is None:
+                applied = input_df[target_col].apply(apply_func)
             
             # Construct Result
             result_df = input_df.copy().reset_index(drop=True)
@@ -120,13 +342,19 @@ def rowmap_wrapper(func: Callable) -> Callable:
             # If every returned value is a dict, expand keys into separate columns so
             # that the new fields align 1-to-1 with the original rows.
             # This prevents metadata misalignment when a map function returns a dict.
-            first_val = applied.iloc[0] if len(applied) > 0 else None
+            if errors is not None:
+                first_val = next((v for v, e in zip(applied, errors) if e is None), None)
+            else:
+                first_val = applied.iloc[0] if len(applied) > 0 else None
             if isinstance(first_val, dict):
-                expanded = applied.apply(pd.Series).reset_index(drop=True)
+                expanded = records_frame(applied.tolist(), resolve_flatten(func))
                 result_df = pd.concat([result_df, expanded], axis=1)
             else:
                 new_col_name = f"{func.__name__}_output"
                 result_df[new_col_name] = applied.reset_index(drop=True)
+
+            if errors is not None and any(errors):
+                result_df[ERROR_COLUMN] = errors
                 
             return result_df
             
@@ -134,7 +362,7 @@ def rowmap_wrapper(func: Callable) -> Callable:
             print(f"[Orchestrator:Map] Error: {e}")
             raise e
 
-    return wrapper
+    return streamable(wrapper)
 
 def filter_wrapper(func: Callable) -> Callable:
     """
@@ -149,30 +377,50 @@ def filter_wrapper(func: Callable) -> Callable:
         print(f"[Orchestrator:Filter] Filtering on '{target_col}' using {func.__name__}")
 
         # Prepare kwargs
-        sig = inspect.signature(func)
-        func_kwargs = {k: v for k, v in kwargs.items() if k in sig.parameters and not isinstance(v, pd.DataFrame)}
-        main_arg_name = list(sig.parameters.keys())[0] if sig.parameters else None
+        plan = call_plan(func)
+        func_kwargs = {k: v for k, v in kwargs.items() if k in plan.param_set and not isinstance(v, pd.DataFrame)}
+        main_arg_name = plan.main_arg
+
+        guarded = apply_policy(func)
+        continues = continues_on_error(func)
 
         def check_func(val):
             if main_arg_name:
                 func_kwargs[main_arg_name] = val
-            return bool(func(**func_kwargs))
+            return bool(guarded(**func_kwargs))
 
-        mask = input_df[target_col].apply(check_func)
-        return input_df[mask].reset_index(drop=True)
-    return wrapper
+        results = errors = None
+        if resolve_cache(func):
+            results, errors = _run_cached(func, input_df[target_col].tolist(), main_arg_name,
+                                          func_kwargs, capture_errors=False)
+        elif resolve_executor(func) == PROCESS:
+            results, errors = _run_in_processes(func, input_df[target_col].tolist(), main_arg_name,
+                                                func_kwargs, capture_errors=continues)
+        elif is_async_op(func) or continues:
+            values = input_df[target_col].tolist()
+            results, errors = run_rows(_row_caller(guarded, values, main_arg_name, func_kwargs),
+                                       len(values), resolve_concurrency(func), label=func.__name__,
+                                       is_async=is_async_op(func), capture_errors=False,
+                                       continue_on_error=continues)
+        else:
+            mask = input_df[target_col].apply(check_func)
+            return input_df[mask].reset_index(drop=True)
+        return filter_rows(input_df, results, errors)
+    return streamable(wrapper)
 
 def expand_wrapper(func: Callable) -> Callable:
     """
     Expects a function that returns a List.
-    Explodes the dataframe so one row becomes N rows.
+    Explodes the dataframe so one row becomes N rows; dict items become
+    columns. The input frame (an upstream step's stored result) is never
+    modified.
     """
     def wrapper(*args, **kwargs) -> pd.DataFrame:
         input_df = _extract_df(kwargs, args)
         if input_df is None:
             # Fallback for scalar input -> just run generic source/expand logic
             # Creates a single-row DF then explodes it
-            seed = func(*args, **kwargs)
+            seed = resolve_awaitable(func(*args, **kwargs))
             if isinstance(seed, list):
                 return pd.DataFrame({'expanded': seed})
             return pd.DataFrame({'expanded': [seed]})
@@ -181,32 +429,28 @@ def expand_wrapper(func: Callable) -> Callable:
         print(f"[Orchestrator:Expand] Exploding '{target_col}' using {func.__name__}")
 
         # Prepare kwargs
-        sig = inspect.signature(func)
-        func_kwargs = {k: v for k, v in kwargs.items() if k in sig.parameters and not isinstance(v, pd.DataFrame)}
-        main_arg_name = list(sig.parameters.keys())[0] if sig.parameters else None
+        plan = call_plan(func)
+        func_kwargs = {k: v for k, v in kwargs.items() if k in plan.param_set and not isinstance(v, pd.DataFrame)}
+        main_arg_name = plan.main_arg
 
-        def get_list(val):
-            if main_arg_name:
-                func_kwargs[main_arg_name] = val
-            res = func(**func_kwargs)
-            return res if isinstance(res, list) else [res]
+        # 1. Call the function once per row to get its list
+        values = input_df[target_col].tolist()
+        continues = continues_on_error(func)
+        if resolve_cache(func):
+            results, errors = _run_cached(func, values, main_arg_name, func_kwargs, capture_errors=False)
+        elif resolve_executor(func) == PROCESS:
+            results, errors = _run_in_processes(func, values, main_arg_name, func_kwargs,
+                                                capture_errors=continues)
+        else:
+            results, errors = run_rows(_row_caller(apply_policy(func), values, main_arg_name, func_kwargs),
+                                       len(values), resolve_concurrency(func), label=func.__name__,
+                                       is_async=is_async_op(func), capture_errors=False,
+                                       continue_on_error=continues)
 
-        # 1. Apply function to generate lists
-        temp_col = f"__{func.__name__}_list"
-        input_df[temp_col] = input_df[target_col].apply(get_list)
-        
-        # 2. Explode
-        expanded = input_df.explode(temp_col)
-        
-        # 3. Handle complex objects in list?
-        # For now, just rename the temp column to output
-        expanded = expanded.rename(columns={temp_col: f"{func.__name__}_output"})
-        
-        # If the output is dicts, normalize?
-        # (This can be expensive, maybe optional?)
-        
-        return expanded.reset_index(drop=True)
-    return wrapper
+        # 2. Repeat the input rows and lay the items over them
+        return fan_out(input_df, results, f"{func.__name__}_output", resolve_flatten(func),
+                       errors=errors)
+    return streamable(wrapper)
 
 def dataframe_op_wrapper(func: Callable) -> Callable:
     """
@@ -221,26 +465,15 @@ def dataframe_op_wrapper(func: Callable) -> Callable:
         # expected parameter name (typically 'df' or 'data').
         input_df = kwargs.pop('_input_df', None)
         if input_df is not None:
-            sig = inspect.signature(func)
-            # Find the parameter that expects a DataFrame
-            df_param = None
-            for pname, p in sig.parameters.items():
-                hints = {}
-                try:
-                    from typing import get_type_hints
-                    hints = get_type_hints(func)
-                except Exception:
-                    pass
-                if pname in ('df', 'data') or hints.get(pname) is pd.DataFrame:
-                    df_param = pname
-                    break
+            # The parameter that expects a DataFrame (df / data / annotated)
+            df_param = call_plan(func).df_param
             if df_param and df_param not in kwargs:
                 kwargs[df_param] = input_df
             elif df_param is None:
                 # No recognized DataFrame param — pass as first positional arg
                 args = (input_df,) + tuple(args)
         
-        res = func(*args, **kwargs)
+        res = resolve_awaitable(func(*args, **kwargs))
         if not isinstance(res, pd.DataFrame):
             return pd.DataFrame({'result': [res]})
         return res
@@ -263,6 +496,7 @@ def raw_output_wrapper(func: Callable) -> Callable:
         clean_kwargs = {k: v for k, v in kwargs.items() if not k.startswith('_')}
         print(f"[Orchestrator:RawOutput] Executing {func.__name__} with no orchestration...")
         result = func(*clean_kwargs) if not clean_kwargs else func(**clean_kwargs)
+        result = resolve_awaitable(result)
 
         if isinstance(result, pd.DataFrame):
             return result
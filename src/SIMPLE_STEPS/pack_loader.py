@@ -66,14 +66,14 @@ import sys
 import traceback
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Dict, List, Optional, Set
+from typing import Dict, List, Optional, Set, Tuple
 
 if sys.version_info >= (3, 10):
     from importlib.metadata import entry_points
 else:
     from importlib_metadata import entry_points  # type: ignore[no-redef]
 
-from .decorators import OPERATION_REGISTRY
+from .decorators import OPERATION_REGISTRY, bump_registry_version
 
 # Entry point group name — pip-installed packs advertise themselves here
 ENTRY_POINT_GROUP = "simple_steps.packs"
@@ -194,6 +194,23 @@ class PackLoader:
         self._load_directory(pack_dir, OpTier.DEVELOPER_PACK)
         return self._results[before:]
 
+    def loaded_files(self) -> List[Tuple[str, OpTier]]:
+        """Pack / project files imported so far, in load order."""
+        return [
+            (r.file_path, r.tier) for r in self._results
+            if r.success and r.tier != OpTier.SYSTEM and not r.file_path.startswith("<")
+        ]
+
+    def load_files(self, files: List[Tuple[str, OpTier]]) -> List[LoadResult]:
+        """
+        Import the given files as another loader did — used by worker
+        processes to mirror the server's ``loaded_files()``.
+        """
+        before = len(self._results)
+        for file_path, tier in files:
+            self._import_file(file_path, OpTier(tier))
+        return self._results[before:]
+
     def get_results(self, tier: Optional[OpTier] = None) -> List[LoadResult]:
         """Return load results, optionally filtered by tier."""
         if tier is None:
@@ -279,6 +296,7 @@ class PackLoader:
             before_ids = set(OPERATION_REGISTRY.keys())
             try:
                 ep.load()  # imports the module → triggers decorators
+                bump_registry_version()  # packs may also edit the registry directly
                 after_ids = set(OPERATION_REGISTRY.keys())
                 new_ops = sorted(after_ids - before_ids)
 
@@ -421,6 +439,7 @@ class PackLoader:
             module = importlib.util.module_from_spec(spec)
             sys.modules[unique_module_name] = module
             spec.loader.exec_module(module)
+            bump_registry_version()  # packs may also edit the registry directly
 
             # Check what new operations appeared
             after_ids = set(OPERATION_REGISTRY.keys())
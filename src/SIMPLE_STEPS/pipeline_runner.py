@@ -0,0 +1,450 @@
+"""
+Server-side whole-pipeline execution.
+
+The frontend (and the ``mock_projects/*/run_pipeline.py`` scripts) run a
+``PipelineFile`` one step at a time through ``engine.run_operation``. This
+module runs the whole file on the backend instead, and runs independent
+steps side by side:
+
+  1. ``plan_pipeline`` parses every ``StepConfig.expression`` with
+     ``safe_formula.parse`` and collects the step names it mentions
+     (``step1``, ``step_fetch``, a label, or a quoted ``"step1.url"`` /
+     ``"=Step 1!col"`` token). Those become the step's dependencies.
+  2. A step that mentions no other step but still consumes an input frame
+     (any non-``source`` op, or an empty pass-through) chains off the
+     previous step — the same implicit input the sequential runner uses.
+     A step whose expression can't be parsed depends on every earlier step.
+  3. ``PipelineRun.execute`` submits every step whose dependencies have
+     completed to a thread pool, so ``step2 = a(step1)`` and
+     ``step3 = b(step1)`` run concurrently.
+
+Input wiring: a step that references earlier steps receives the *latest*
+referenced step's output as ``input_ref_id``; otherwise its chained
+predecessor's output. ``step_map`` holds every alias of every completed
+step, exactly like the sequential runner.
+
+Steps run on threads (not processes) because results live in the
+in-process ``DATA_STORE``. Status is reported through
+``PipelineRunResponse`` / ``PipelineStatusResponse``.
+
+Incremental re-runs: every node carries a ``fingerprint`` — a hash of its
+expression, the source of the ops it calls (so editing an op or reloading
+its pack dirties the step) and its upstream nodes' fingerprints — and
+every completed step is recorded per (pipeline id, session) as
+``fingerprint → ref_id``. With ``incremental=True`` a step whose
+fingerprint is unchanged and whose ref still loads is reused as-is; only
+the dirty subgraph is recomputed.
+``from_step`` additionally forces that step and everything downstream.
+"""
+import ast
+import hashlib
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+
+from .engine import _session_token, get_dataframe, run_operation
+from .models import PipelineFile, PipelineStatusResponse, StepConfig
+
+DEFAULT_MAX_WORKERS = 4
+MAX_FINISHED_RUNS = 50
+
+
+@dataclass
+class StepNode:
+    """One step of a planned pipeline."""
+    index: int
+    name: str                  # canonical step id (legacy id or v2 name)
+    label: str
+    aliases: List[str]         # every key the step is reachable by in step_map
+    deps: Set[int]             # indices of steps that must finish first
+    input_index: Optional[int]  # whose output becomes input_ref_id
+    step: StepConfig
+    fingerprint: str = ""      # expression + op sources + upstream fingerprints
+
+
+# ── Planning ────────────────────────────────────────────────────────────────
+
+def _step_aliases(index: int, step: StepConfig) -> List[str]:
+    aliases: List[str] = []
+    for key in (step.step_id, step.name, step.label, f"step{index + 1}"):
+        if key and key not in aliases:
+            aliases.append(key)
+    return aliases
+
+
+_CONST_REF_RE = re.compile(r"^=?(?P<key>[^!.\[]+?)\s*(?:!\w+|\.\w+|\[.*\])?$")
+
+
+def _names_in_expression(expression: str) -> Optional[Set[str]]:
+    """
+    Every bare name and every string constant that could be a step
+    reference, or None if the expression does not parse.
+    """
+    from .safe_formula import FormulaError, parse
+
+    try:
+        tree = parse(expression)
+    except FormulaError:
+        return None
+
+    names: Set[str] = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name):
+            names.add(node.id)
+        elif isinstance(node, ast.Constant) and isinstance(node.value, str):
+            # Legacy config values carry refs as strings: "step1",
+            # "step1.url", "step1[row=0, col=a]", "=Step 1!col".
+            m = _CONST_REF_RE.match(node.value.strip())
+            if m:
+                names.add(m.group("key").strip())
+    return names
+
+
+def _consumes_input(step: StepConfig) -> bool:
+    """True if the step reads the previous step's frame when it has no refs."""
+    from .decorators import OPERATION_REGISTRY
+    from .safe_formula import FormulaError, parse
+
+    if not step.expression.strip():
+        return True   # empty pass-through returns df_in
+    try:
+        body = parse(step.expression).body
+    except FormulaError:
+        return True
+    if isinstance(body, ast.Call) and isinstance(body.func, ast.Name):
+        entry = OPERATION_REGISTRY.get(body.func.id)
+        return not (entry and entry.get("type") == "source")
+    return False      # bare literal
+
+
+def _op_versions(step: StepConfig, names: Optional[Set[str]]) -> List[str]:
+    """``op_id:source_hash`` of every registered op the step may call."""
+    from .decorators import OPERATION_REGISTRY
+    from .step_cache import source_hash
+
+    op_ids = set(names or ()) | {step.operation_id}
+    return [f"{op_id}:{source_hash(OPERATION_REGISTRY[op_id]['func'])}"
+            for op_id in sorted(op_ids, key=str) if op_id in OPERATION_REGISTRY]
+
+
+def plan_pipeline(pipeline: PipelineFile) -> List[StepNode]:
+    """Build the step dependency DAG for *pipeline* (edges always point backwards)."""
+    alias_index: Dict[str, int] = {}
+    nodes: List[StepNode] = []
+
+    for i, step in enumerate(pipeline.steps):
+        names = _names_in_expression(step.expression) if step.expression.strip() else set()
+        if names is None:
+            deps = set(range(i))
+            input_index = i - 1 if i > 0 else None
+        else:
+            deps = {alias_index[n] for n in names if n in alias_index}
+            if deps:
+                input_index = max(deps)
+            elif i > 0 and _consumes_input(step):
+                deps = {i - 1}
+                input_index = i - 1
+            else:
+                input_index = None
+
+        h = hashlib.sha1(step.expression.strip().encode("utf-8"))
+        for version in _op_versions(step, names):
+            h.update(f"|op:{version}".encode())
+        h.update(f"|in:{nodes[input_index].fingerprint if input_index is not None else ''}".encode())
+        for d in sorted(deps):
+            h.update(f"|{nodes[d].fingerprint}".encode())
+
+        aliases = _step_aliases(i, step)
+        nodes.append(StepNode(
+            index=i,
+            name=step.step_id or f"step{i + 1}",
+            label=step.label or f"Step {i}",
+            aliases=aliases,
+            deps=deps,
+            input_index=input_index,
+            step=step,
+            fingerprint=h.hexdigest(),
+        ))
+        # Later steps win on duplicate aliases, matching the sequential runner.
+        for alias in aliases:
+            alias_index[alias] = i
+
+    return nodes
+
+
+def descendants(nodes: List[StepNode], index: int) -> Set[int]:
+    """*index* plus every node that transitively depends on it."""
+    out = {index}
+    for node in nodes[index + 1:]:
+        if node.deps & out:
+            out.add(node.index)
+    return out
+
+
+# ── Incremental state ───────────────────────────────────────────────────────
+# (pipeline_id, session_token) → step name → (fingerprint, ref_id) of the
+# step's last successful run.
+_LAST_OUTPUTS: Dict[Tuple[str, str], Dict[str, Tuple[str, str]]] = {}
+_LAST_OUTPUTS_LOCK = threading.Lock()
+
+
+def _state_key(pipeline_id: str, session_id: Optional[str]) -> Tuple[str, str]:
+    return (pipeline_id, _session_token(session_id))
+
+
+# ── Execution ───────────────────────────────────────────────────────────────
+
+class PipelineRun:
+    """
+    One execution of a pipeline. Thread-safe status snapshots are available
+    through ``status()`` while ``execute()`` runs on another thread.
+
+    on_error:
+      'stop'     — after the first failure no new steps start (default).
+      'continue' — keep running every step whose upstream succeeded.
+
+    incremental / from_step: see the module docstring. ``from_step`` may be
+    any alias of a step (name, legacy id, label, ``stepN``).
+    """
+
+    def __init__(
+        self,
+        pipeline: PipelineFile,
+        session_id: Optional[str] = None,
+        result_store: Optional[str] = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        on_error: str = "stop",
+        incremental: bool = False,
+        from_step: Optional[str] = None,
+        pipeline_id: Optional[str] = None,
+    ):
+        self.run_id = uuid.uuid4().hex
+        self.pipeline = pipeline
+        self.pipeline_id = pipeline_id or pipeline.id
+        self.session_id = session_id
+        self.result_store = result_store
+        self.max_workers = max(1, int(max_workers))
+        self.on_error = on_error
+        self.nodes = plan_pipeline(pipeline)
+        self._reuse = self._reusable_refs(from_step) if incremental or from_step else {}
+
+        self.state = "running"
+        self.step_statuses: Dict[str, str] = {n.name: "pending" for n in self.nodes}
+        self.step_refs: Dict[str, str] = {}
+        self.errors: Dict[str, str] = {}
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+
+        self._refs: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def _reusable_refs(self, from_step: Optional[str]) -> Dict[int, str]:
+        """Clean steps whose previous output can be served without re-running."""
+        forced: Set[int] = set()
+        if from_step:
+            matches = [n.index for n in self.nodes if from_step in n.aliases]
+            if not matches:
+                raise ValueError(f"Step '{from_step}' not found in pipeline")
+            forced = descendants(self.nodes, matches[-1])
+
+        with _LAST_OUTPUTS_LOCK:
+            last = dict(_LAST_OUTPUTS.get(_state_key(self.pipeline_id, self.session_id), {}))
+
+        reuse: Dict[int, str] = {}
+        for node in self.nodes:
+            if node.index in forced or not node.deps <= set(reuse):
+                continue
+            record = last.get(node.name)
+            if record is None or record[0] != node.fingerprint:
+                continue
+            if get_dataframe(record[1], session_id=self.session_id) is None:
+                continue
+            reuse[node.index] = record[1]
+        return reuse
+
+    def _record(self, node: StepNode, ref_id: str) -> None:
+        key = _state_key(self.pipeline_id, self.session_id)
+        with _LAST_OUTPUTS_LOCK:
+            _LAST_OUTPUTS.setdefault(key, {})[node.name] = (node.fingerprint, ref_id)
+
+    # ── Control ──────────────────────────────────────────────────────────
+
+    def stop(self) -> None:
+        """Don't start any more steps; running steps finish normally."""
+        self._stop.set()
+
+    def status(self) -> PipelineStatusResponse:
+        with self._lock:
+            frontier = [
+                n.index for n in self.nodes
+                if self.step_statuses[n.name] in ("pending", "running")
+            ]
+            return PipelineStatusResponse(
+                run_id=self.run_id,
+                status=self.state,
+                current_step_index=min(frontier) if frontier and self.state == "running" else len(self.nodes),
+                step_statuses=dict(self.step_statuses),
+                step_refs=dict(self.step_refs),
+                errors=dict(self.errors),
+            )
+
+    # ── Execution ────────────────────────────────────────────────────────
+
+    def _step_map(self) -> Dict[str, str]:
+        step_map: Dict[str, str] = {}
+        for node in self.nodes:
+            ref = self._refs.get(node.index)
+            if ref is not None:
+                for alias in node.aliases:
+                    step_map[alias] = ref
+        return step_map
+
+    def _run_step(self, node: StepNode, step_map: Dict[str, str]) -> str:
+        step = node.step
+        input_ref_id = self._refs.get(node.input_index) if node.input_index is not None else None
+        ref_id, _ = run_operation(
+            op_id=step.operation_id,
+            config=dict(step.config),
+            input_ref_id=input_ref_id,
+            step_label_map=step_map,
+            formula=step.formula or None,
+            step_id=node.name,
+            session_id=self.session_id,
+            result_store=self.result_store,
+        )
+        return ref_id
+
+    def _set(self, node: StepNode, status: str, error: Optional[str] = None) -> None:
+        with self._lock:
+            self.step_statuses[node.name] = status
+            if error is not None:
+                self.errors[node.name] = error
+
+    def execute(self) -> "PipelineRun":
+        """Run the pipeline to completion on the calling thread."""
+        print(f"▶ Pipeline run {self.run_id[:8]}: {len(self.nodes)} step(s), "
+              f"up to {self.max_workers} in parallel")
+        pending: Set[int] = {n.index for n in self.nodes}
+        done: Set[int] = set()
+        failed: Set[int] = set()
+        running: Dict[Future, StepNode] = {}
+
+        for idx, ref_id in self._reuse.items():
+            node = self.nodes[idx]
+            with self._lock:
+                self._refs[idx] = ref_id
+                self.step_refs[node.name] = ref_id
+                self.step_statuses[node.name] = "completed"
+            done.add(idx)
+            pending.discard(idx)
+        if self._reuse:
+            print(f"  ↺ reused {len(self._reuse)} unchanged step(s); "
+                  f"{len(pending)} to recompute")
+
+        with ThreadPoolExecutor(max_workers=self.max_workers,
+                                thread_name_prefix="ss-pipeline") as pool:
+            while pending or running:
+                halted = self._stop.is_set() or (failed and self.on_error != "continue")
+                if not halted:
+                    for idx in sorted(pending):
+                        node = self.nodes[idx]
+                        blocked_by = node.deps & failed
+                        if blocked_by:
+                            upstream = self.nodes[min(blocked_by)].label
+                            self._set(node, "failed", f"Skipped — upstream step '{upstream}' failed")
+                            failed.add(idx)
+                            pending.discard(idx)
+                        elif node.deps <= done:
+                            with self._lock:
+                                step_map = self._step_map()
+                            self._set(node, "running")
+                            running[pool.submit(self._run_step, node, step_map)] = node
+                            pending.discard(idx)
+                if not running:
+                    break
+
+                finished, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    node = running.pop(fut)
+                    try:
+                        ref_id = fut.result()
+                    except Exception as exc:
+                        print(f"  ✗ {node.label} failed: {exc}")
+                        self._set(node, "failed", str(exc))
+                        failed.add(node.index)
+                        continue
+                    with self._lock:
+                        self._refs[node.index] = ref_id
+                        self.step_refs[node.name] = ref_id
+                        self.step_statuses[node.name] = "completed"
+                    self._record(node, ref_id)
+                    done.add(node.index)
+                    print(f"  ✓ {node.label} → {ref_id}")
+
+        with self._lock:
+            if self._stop.is_set() and pending:
+                self.state = "stopped"
+            elif failed or pending:
+                self.state = "failed"
+            else:
+                self.state = "completed"
+            self.finished_at = time.time()
+        print(f"■ Pipeline run {self.run_id[:8]} {self.state} "
+              f"in {self.finished_at - self.started_at:.2f}s")
+        return self
+
+
+# ── Run registry ────────────────────────────────────────────────────────────
+
+_RUNS: Dict[str, PipelineRun] = {}
+_RUNS_LOCK = threading.Lock()
+
+
+def _prune_runs() -> None:
+    finished = [r for r in _RUNS.values() if r.finished_at is not None]
+    finished.sort(key=lambda r: r.finished_at)
+    excess = len(finished) - MAX_FINISHED_RUNS
+    for run in finished[:max(0, excess)]:
+        _RUNS.pop(run.run_id, None)
+
+
+def run_pipeline(pipeline: PipelineFile, **kwargs) -> PipelineRun:
+    """Plan and execute *pipeline*, blocking until it finishes."""
+    run = PipelineRun(pipeline, **kwargs)
+    with _RUNS_LOCK:
+        _prune_runs()
+        _RUNS[run.run_id] = run
+    return run.execute()
+
+
+def start_pipeline_run(pipeline: PipelineFile, **kwargs) -> PipelineRun:
+    """Plan *pipeline* and execute it on a background thread."""
+    run = PipelineRun(pipeline, **kwargs)
+    with _RUNS_LOCK:
+        _prune_runs()
+        _RUNS[run.run_id] = run
+    threading.Thread(target=run.execute, name=f"ss-run-{run.run_id[:8]}", daemon=True).start()
+    return run
+
+
+def get_run(run_id: str) -> Optional[PipelineRun]:
+    with _RUNS_LOCK:
+        return _RUNS.get(run_id)
+
+
+def active_session_tokens() -> Set[str]:
+    """Session tokens with a pipeline run still in progress."""
+    with _RUNS_LOCK:
+        return {_session_token(r.session_id) for r in _RUNS.values() if r.finished_at is None}
+
+
+def forget_session(session_token: str) -> None:
+    """Drop incremental re-run state recorded for a session."""
+    with _LAST_OUTPUTS_LOCK:
+        for key in [k for k in _LAST_OUTPUTS if k[1] == session_token]:
+            del _LAST_OUTPUTS[key]
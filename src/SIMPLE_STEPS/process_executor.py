@@ -0,0 +1,217 @@
+"""
+Process-pool execution for CPU-bound mapped ops.
+
+Thread pools don't help ops that spend their time in Python bytecode (text
+parsing, regex feature extraction): the GIL keeps them on one core. With
+``executor="process"`` the map / filter / expand orchestrators hand the row
+calls to a ``ProcessPoolExecutor`` instead:
+
+  - the rows are split into contiguous chunks (about four per worker) so
+    each task amortises the pickling round trip,
+  - every worker imports the system ops and the same pack / project files
+    the server loaded through ``PackLoader``, and looks the op up by id in
+    its own registry,
+  - chunk results are reassembled in row order.
+
+Ops that aren't loaded by ``PackLoader`` (defined in an imported module,
+registered by a script) are shipped to the workers by reference, which
+requires a module-level function.
+
+The pool is created on first use with ``settings.process_workers`` workers
+(one per core by default) and is restarted when more pack files have been
+loaded since, so workers never run stale code.
+"""
+import atexit
+import contextlib
+import io
+import math
+import multiprocessing
+import os
+import pickle
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .decorators import OPERATION_REGISTRY
+from .exec_options import exec_options, running_op
+from .progress import current_progress
+from .row_executor import _report, format_error, resolve_awaitable
+from .row_policy import apply_policy
+
+CHUNKS_PER_WORKER = 4
+
+_POOL: Optional[ProcessPoolExecutor] = None
+_POOL_KEY: Optional[Tuple] = None
+_POOL_LOCK = threading.Lock()
+
+# Worker-side: the raw function of each op id, resolved once per process.
+_WORKER_FUNCS: Dict[str, Callable] = {}
+
+
+def _settings():
+    from .settings import get_settings
+    return get_settings()
+
+
+def _worker_count() -> int:
+    return max(1, int(_settings().process_workers or os.cpu_count() or 1))
+
+
+def _loaded_pack_files() -> Tuple:
+    from .pack_loader import get_loader
+    loader = get_loader()
+    if loader is None:
+        return ()
+    return tuple((path, tier.value) for path, tier in loader.loaded_files())
+
+
+def _init_worker(pack_files: Tuple) -> None:
+    """Worker initializer — register the ops the server process has."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        from . import operations, orchestration_ops  # noqa: F401 — system ops
+        from .pack_loader import PackLoader
+        loader = PackLoader()
+        loader.load_all()
+        loader.load_files(list(pack_files))
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _POOL, _POOL_KEY
+    key = (_worker_count(), _loaded_pack_files())
+    with _POOL_LOCK:
+        if _POOL is not None and _POOL_KEY != key:
+            _POOL.shutdown(wait=False, cancel_futures=True)
+            _POOL = None
+        if _POOL is None:
+            # spawn, not fork: the server is multi-threaded and forking it
+            # mid-request can deadlock the child.
+            _POOL = ProcessPoolExecutor(
+                max_workers=key[0],
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(key[1],),
+            )
+            _POOL_KEY = key
+            print(f"  ⚙ Started process pool with {key[0]} worker(s)")
+        return _POOL
+
+
+def shutdown_process_pool() -> None:
+    """Stop the worker processes (called on server shutdown and at exit)."""
+    global _POOL, _POOL_KEY
+    with _POOL_LOCK:
+        if _POOL is not None:
+            _POOL.shutdown(wait=True, cancel_futures=True)
+        _POOL = None
+        _POOL_KEY = None
+
+
+atexit.register(shutdown_process_pool)
+
+
+def _op_id_for(func: Callable) -> Tuple[Optional[str], Optional[dict]]:
+    op_id = exec_options(func).op_id
+    entry = OPERATION_REGISTRY.get(op_id) if op_id else None
+    if entry is None or entry.get("func") is not func:
+        return None, None
+    return op_id, entry
+
+
+def _shippable(func: Callable) -> bool:
+    try:
+        pickle.dumps(func)
+        return True
+    except Exception:
+        return False
+
+
+def _run_chunk(
+    op_id: Optional[str],
+    func: Optional[Callable],
+    rows: List[Dict[str, Any]],
+    capture_errors: bool,
+) -> Tuple[List[Any], List[Optional[str]]]:
+    """Worker task: call the op once per kwargs dict in *rows*."""
+    target = _WORKER_FUNCS.get(op_id) if op_id else None
+    if target is None:
+        entry = OPERATION_REGISTRY.get(op_id) if op_id else None
+        target = entry["func"] if entry else func
+        if target is None:
+            raise ValueError(f"Operation '{op_id}' is not registered in the worker process")
+        with running_op(op_id):
+            target = apply_policy(target)   # rate limit / retries, per worker process
+        if op_id:
+            _WORKER_FUNCS[op_id] = target
+
+    results: List[Any] = []
+    errors: List[Optional[str]] = []
+    for kwargs in rows:
+        try:
+            results.append(resolve_awaitable(target(**kwargs)))
+            errors.append(None)
+        except Exception as e:
+            if not capture_errors:
+                raise
+            results.append(None)
+            errors.append(format_error(e))
+    return results, errors
+
+
+def run_rows_in_processes(
+    func: Callable,
+    row_kwargs: List[Dict[str, Any]],
+    label: str = "",
+    capture_errors: bool = True,
+) -> Tuple[List[Any], List[Optional[str]]]:
+    """
+    Call ``func(**row_kwargs[i])`` for every row on the process pool.
+
+    Returns ``(results, errors)`` in row order, like ``run_rows``. Row
+    arguments and results must be picklable. With ``capture_errors`` a
+    failing row is reported in ``errors``; otherwise the first failure is
+    raised once the pool has been told to drop the remaining chunks.
+    """
+    n = len(row_kwargs)
+    results: List[Any] = [None] * n
+    errors: List[Optional[str]] = [None] * n
+    if n == 0:
+        return results, errors
+
+    op_id, entry = _op_id_for(func)
+    # Pack-loaded ops are resolved by id in the workers; pickling them by
+    # reference would fail there (their module names are per-process).
+    ship = None
+    if entry is None or not entry.get("source_file"):
+        if _shippable(func):
+            ship = func
+        elif op_id is None:
+            raise ValueError(
+                f"executor='process' needs a registered op or a module-level function; "
+                f"{getattr(func, '__name__', func)!r} can't be sent to worker processes"
+            )
+
+    pool = _get_pool()
+    chunk_size = max(1, math.ceil(n / (_worker_count() * CHUNKS_PER_WORKER)))
+    prog = current_progress()
+    print(f"[Orchestrator] Running {n} rows in {math.ceil(n / chunk_size)} chunk(s) "
+          f"on {_worker_count()} worker process(es)")
+
+    pending = {
+        pool.submit(_run_chunk, op_id, ship, row_kwargs[start:start + chunk_size], capture_errors): start
+        for start in range(0, n, chunk_size)
+    }
+    done_rows = 0
+    try:
+        while pending:
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                start = pending.pop(fut)
+                chunk_results, chunk_errors = fut.result()
+                results[start:start + len(chunk_results)] = chunk_results
+                errors[start:start + len(chunk_errors)] = chunk_errors
+                done_rows += len(chunk_results)
+                _report(prog, done_rows, n, label)
+    finally:
+        for fut in pending:
+            fut.cancel()
+    return results, errors
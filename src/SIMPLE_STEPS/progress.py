@@ -6,7 +6,8 @@ progress and an SSE endpoint can stream it to the frontend.
 """
 import threading
 import time
-from typing import Optional, Dict, Any
+from contextlib import contextmanager
+from typing import Iterator, Optional, Dict, Any
 from dataclasses import dataclass, field
 from queue import Queue, Empty
 
@@ -21,7 +22,7 @@ class StepProgress:
     started_at: float = field(default_factory=time.time)
     queue: Queue = field(default_factory=Queue)  # SSE listeners pull from here
 
-    def update(self, current: int, total: int, message: str = ""):
+    def update(self, current: int, total: int, message: str = "", **extra: Any):
         self.current = current
         self.total = total
         self.message = message
@@ -31,6 +32,7 @@ class StepProgress:
             "total": total,
             "message": message,
             "elapsed": round(time.time() - self.started_at, 1),
+            **extra,
         })
 
     def finish(self):
@@ -60,3 +62,39 @@ def end_progress(step_id: str):
         prog = _active.pop(step_id, None)
         if prog:
             prog.finish()
+
+
+# The step being executed on this thread, so orchestrators can report
+# without threading a progress object through every call.
+_local = threading.local()
+
+
+def current_progress() -> Optional[StepProgress]:
+    return getattr(_local, "progress", None)
+
+
+@contextmanager
+def detached_progress() -> Iterator[None]:
+    """Hide the current progress from nested code that would report its own totals."""
+    previous = current_progress()
+    _local.progress = None
+    try:
+        yield
+    finally:
+        _local.progress = previous
+
+
+@contextmanager
+def track_progress(step_id: Optional[str]) -> Iterator[Optional[StepProgress]]:
+    """Register progress for *step_id* and make it current on this thread."""
+    if not step_id:
+        yield None
+        return
+    prog = start_progress(step_id)
+    previous = current_progress()
+    _local.progress = prog
+    try:
+        yield prog
+    finally:
+        _local.progress = previous
+        end_progress(step_id)
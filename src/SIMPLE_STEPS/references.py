@@ -0,0 +1,75 @@
+"""
+Parsing of step-data reference tokens.
+
+The frontend wiring UI binds params to previous steps with string tokens:
+
+  =Step Name!columnName      → EXCEL   (column, Excel-style)
+  stepId.columnName          → COLUMN  (whole column)
+  stepId[row=R, col=C]       → CELL    (scalar cell value)
+  stepId                     → STEP    (whole output, if stepId is in step_map)
+
+``parse_reference`` turns a token into a frozen ``StepReference`` once and
+memoizes it, so the same token seen in every run of every pipeline is only
+matched against the patterns the first time. Resolution against a
+step_map lives in ``engine.resolve_reference``.
+"""
+import logging
+import os
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+# Resolutions are logged at DEBUG and failures at WARNING. Set
+# SIMPLE_STEPS_REFERENCE_LOG_LEVEL=DEBUG to trace every resolved param.
+logger = logging.getLogger(__name__)
+_LEVEL = os.environ.get("SIMPLE_STEPS_REFERENCE_LOG_LEVEL", "").strip().upper()
+if _LEVEL:
+    logger.setLevel(_LEVEL)
+    if not logger.handlers:
+        _handler = logging.StreamHandler()
+        _handler.setFormatter(logging.Formatter("  %(message)s"))
+        logger.addHandler(_handler)
+
+EXCEL = "excel"
+COLUMN = "column"
+CELL = "cell"
+STEP = "step"
+
+_EXCEL_RE = re.compile(r'^=(.+?)!(\w+)$')
+_COLUMN_RE = re.compile(r'^([\w-]+)\.(\w+)$')
+_CELL_RE = re.compile(r'^([\w-]+)\[row=(\d+),\s*col=(\w+)\]$')
+
+PARSE_CACHE_SIZE = 8192
+
+
+@dataclass(frozen=True)
+class StepReference:
+    """A parsed reference token. ``raw`` is the original string."""
+
+    kind: str
+    step_key: str
+    raw: str
+    column: Optional[str] = None
+    row: Optional[int] = None
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_reference(token: str) -> StepReference:
+    """
+    Parse *token* into a ``StepReference``.
+
+    Anything that isn't an Excel / column / cell reference parses as a
+    STEP reference; whether it actually names a step is only known once
+    it is looked up in a step_map.
+    """
+    m = _EXCEL_RE.match(token)
+    if m:
+        return StepReference(EXCEL, m.group(1).strip(), token, column=m.group(2))
+    m = _COLUMN_RE.match(token)
+    if m:
+        return StepReference(COLUMN, m.group(1), token, column=m.group(2))
+    m = _CELL_RE.match(token)
+    if m:
+        return StepReference(CELL, m.group(1), token, column=m.group(3), row=int(m.group(2)))
+    return StepReference(STEP, token, token)
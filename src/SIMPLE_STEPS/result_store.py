@@ -0,0 +1,560 @@
+"""
+Pluggable storage backends for step outputs.
+
+Every backend implements the same small interface keyed by
+``(session_token, ref_id)``:
+
+  put / get / delete / exists / list_session / stats
+
+plus session-level ``list_sessions`` / ``delete_session`` used by the
+session lifecycle API.
+
+``MemoryResultStore`` is the hot tier that ``engine`` always writes to. The
+durable backends (``parquet``, ``arrow``, ``sqlite``) are selected through
+``settings.result_store``; they hold a second copy that survives LRU
+eviction and can be read by other worker processes.
+"""
+import io
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+
+
+class ResultStore:
+    """Base interface for a step-output store."""
+
+    name = "base"
+
+    def put(self, token: str, ref_id: str, df: pd.DataFrame) -> None:
+        raise NotImplementedError
+
+    def get(self, token: str, ref_id: str) -> Optional[pd.DataFrame]:
+        raise NotImplementedError
+
+    def delete(self, token: str, ref_id: str) -> bool:
+        raise NotImplementedError
+
+    def exists(self, token: str, ref_id: str) -> bool:
+        raise NotImplementedError
+
+    def list_session(self, token: str) -> List[str]:
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def list_sessions(self) -> Dict[str, Dict[str, int]]:
+        """Return ``token → {"refs": n, "bytes": b}`` for every stored session."""
+        raise NotImplementedError
+
+    def delete_session(self, token: str) -> int:
+        """Drop every ref of a session; returns how many were removed."""
+        removed = 0
+        for ref_id in self.list_session(token):
+            removed += int(self.delete(token, ref_id))
+        return removed
+
+
+# ── In-memory ───────────────────────────────────────────────────────────────
+
+class MemoryResultStore(ResultStore):
+    """
+    Session-bucketed dict of DataFrames.
+
+    Keeps a ``ref_id → token`` index so refs without an embedded session
+    token are found without scanning every bucket.
+    """
+
+    name = "memory"
+
+    def __init__(self, buckets: Optional[Dict[str, Dict[str, pd.DataFrame]]] = None):
+        self.buckets: Dict[str, Dict[str, pd.DataFrame]] = buckets if buckets is not None else {}
+        self._owner: Dict[str, str] = {}
+        self._lock = threading.RLock()
+
+    def put(self, token: str, ref_id: str, df: pd.DataFrame) -> None:
+        with self._lock:
+            self.buckets.setdefault(token, {})[ref_id] = df
+            self._owner[ref_id] = token
+
+    def get(self, token: str, ref_id: str) -> Optional[pd.DataFrame]:
+        bucket = self.buckets.get(token)
+        return bucket.get(ref_id) if bucket else None
+
+    def locate(self, ref_id: str) -> Optional[str]:
+        """Return the session token holding *ref_id*, if any."""
+        token = self._owner.get(ref_id)
+        if token is not None and ref_id in self.buckets.get(token, ()):
+            return token
+        return None
+
+    def delete(self, token: str, ref_id: str) -> bool:
+        with self._lock:
+            bucket = self.buckets.get(token)
+            if not bucket or ref_id not in bucket:
+                return False
+            del bucket[ref_id]
+            if not bucket:
+                self.buckets.pop(token, None)
+            if self._owner.get(ref_id) == token:
+                del self._owner[ref_id]
+            return True
+
+    def exists(self, token: str, ref_id: str) -> bool:
+        return ref_id in self.buckets.get(token, ())
+
+    def list_session(self, token: str) -> List[str]:
+        return list(self.buckets.get(token, {}).keys())
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "backend": self.name,
+                "sessions": len(self.buckets),
+                "refs": sum(len(b) for b in self.buckets.values()),
+            }
+
+    def list_sessions(self) -> Dict[str, Dict[str, int]]:
+        # RAM sizes are tracked by engine's LRU; only counts are known here.
+        with self._lock:
+            return {token: {"refs": len(b), "bytes": 0} for token, b in self.buckets.items()}
+
+
+# ── File-per-ref backends ───────────────────────────────────────────────────
+
+class _DirectoryResultStore(ResultStore):
+    """One file per ref under ``<root>/<session_token>/<ref_id><suffix>``."""
+
+    suffix = ""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, token: str, ref_id: str) -> str:
+        return os.path.join(self.root, token, f"{ref_id}{self.suffix}")
+
+    def _write(self, df: pd.DataFrame, path: str) -> None:
+        raise NotImplementedError
+
+    def _read(self, path: str) -> pd.DataFrame:
+        raise NotImplementedError
+
+    def put(self, token: str, ref_id: str, df: pd.DataFrame) -> None:
+        path = self._path(token, ref_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write under a temporary name so readers never see a partial file.
+        tmp = f"{path}.tmp"
+        self._write(df, tmp)
+        os.replace(tmp, path)
+
+    def get(self, token: str, ref_id: str) -> Optional[pd.DataFrame]:
+        path = self._path(token, ref_id)
+        if not os.path.exists(path):
+            return None
+        try:
+            return self._read(path)
+        except Exception as e:
+            print(f"  ⚠ Failed to read {self.name} cache for '{ref_id}': {e}")
+            return None
+
+    def delete(self, token: str, ref_id: str) -> bool:
+        try:
+            os.remove(self._path(token, ref_id))
+            return True
+        except OSError:
+            return False
+
+    def exists(self, token: str, ref_id: str) -> bool:
+        return os.path.exists(self._path(token, ref_id))
+
+    def list_session(self, token: str) -> List[str]:
+        folder = os.path.join(self.root, token)
+        if not os.path.isdir(folder):
+            return []
+        return [
+            name[: -len(self.suffix)]
+            for name in os.listdir(folder)
+            if name.endswith(self.suffix)
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        refs = 0
+        total = 0
+        sessions = 0
+        if os.path.isdir(self.root):
+            for token in os.listdir(self.root):
+                folder = os.path.join(self.root, token)
+                if not os.path.isdir(folder) or token.startswith("_"):
+                    continue
+                names = [n for n in os.listdir(folder) if n.endswith(self.suffix)]
+                if names:
+                    sessions += 1
+                refs += len(names)
+                total += sum(os.path.getsize(os.path.join(folder, n)) for n in names)
+        return {"backend": self.name, "root": self.root, "sessions": sessions, "refs": refs, "bytes": total}
+
+    def list_sessions(self) -> Dict[str, Dict[str, int]]:
+        out: Dict[str, Dict[str, int]] = {}
+        if not os.path.isdir(self.root):
+            return out
+        for token in os.listdir(self.root):
+            folder = os.path.join(self.root, token)
+            # "_step_cache" and friends are not sessions.
+            if not os.path.isdir(folder) or token.startswith("_"):
+                continue
+            names = [n for n in os.listdir(folder) if n.endswith(self.suffix)]
+            if names:
+                out[token] = {
+                    "refs": len(names),
+                    "bytes": sum(os.path.getsize(os.path.join(folder, n)) for n in names),
+                }
+        return out
+
+    def session_mtime(self, token: str) -> Optional[float]:
+        """Most recent write time of any file in the session's folder."""
+        folder = os.path.join(self.root, token)
+        if not os.path.isdir(folder):
+            return None
+        times = [os.path.getmtime(os.path.join(folder, n)) for n in os.listdir(folder)]
+        return max(times) if times else os.path.getmtime(folder)
+
+    def delete_session(self, token: str) -> int:
+        removed = super().delete_session(token)
+        folder = os.path.join(self.root, token)
+        try:
+            if os.path.isdir(folder) and not os.listdir(folder):
+                os.rmdir(folder)
+        except OSError:
+            pass
+        return removed
+
+
+class ParquetResultStore(_DirectoryResultStore):
+    name = "parquet"
+    suffix = ".parquet"
+
+    def _write(self, df: pd.DataFrame, path: str) -> None:
+        df.to_parquet(path, index=False)
+
+    def _read(self, path: str) -> pd.DataFrame:
+        return pd.read_parquet(path)
+
+
+class ArrowResultStore(_DirectoryResultStore):
+    """
+    Arrow IPC (Feather v2) files, memory-mapped on read.
+
+    Frames come back with ``pd.ArrowDtype`` columns that point into the
+    mapping, so the bytes live in the OS page cache shared by every worker
+    process reading the same ref. Writing to a column replaces its array
+    with a private copy; the file itself is never modified.
+    """
+
+    name = "arrow"
+    suffix = ".arrow"
+
+    def _write(self, df: pd.DataFrame, path: str) -> None:
+        import pyarrow as pa
+
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        with pa.OSFile(path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+
+    def _read(self, path: str) -> pd.DataFrame:
+        import pyarrow as pa
+
+        source = pa.memory_map(path, "r")
+        table = pa.ipc.open_file(source).read_all()
+        # ArrowDtype keeps every column on the mapped buffers (numpy dtypes
+        # would copy strings and nullable columns onto the heap).
+        return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+
+# ── SQLite ──────────────────────────────────────────────────────────────────
+
+class SQLiteResultStore(ResultStore):
+    """
+    All refs in a single local SQLite file, stored as parquet blobs.
+
+    Handy where many small outputs would otherwise mean many small files.
+    A connection is opened per call so the store is safe across threads.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        if not self._ready:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " ref_id TEXT PRIMARY KEY,"
+                " token TEXT NOT NULL,"
+                " data BLOB NOT NULL,"
+                " nbytes INTEGER NOT NULL,"
+                " created REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS results_token ON results(token)")
+            conn.commit()
+            self._ready = True
+        return conn
+
+    def put(self, token: str, ref_id: str, df: pd.DataFrame) -> None:
+        buf = io.BytesIO()
+        df.to_parquet(buf, index=False)
+        blob = buf.getvalue()
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = self._connect()
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO results (ref_id, token, data, nbytes, created) VALUES (?, ?, ?, ?, ?)",
+                    (ref_id, token, blob, len(blob), time.time()),
+                )
+                conn.commit()
+            finally:
+                conn.close()
+
+    def get(self, token: str, ref_id: str) -> Optional[pd.DataFrame]:
+        if not os.path.exists(self.path):
+            return None
+        with self._lock:
+            conn = self._connect()
+            try:
+                row = conn.execute(
+                    "SELECT data FROM results WHERE ref_id = ? AND token = ?", (ref_id, token)
+                ).fetchone()
+            finally:
+                conn.close()
+        if row is None:
+            return None
+        try:
+            return pd.read_parquet(io.BytesIO(row[0]))
+        except Exception as e:
+            print(f"  ⚠ Failed to read sqlite cache for '{ref_id}': {e}")
+            return None
+
+    def delete(self, token: str, ref_id: str) -> bool:
+        if not os.path.exists(self.path):
+            return False
+        with self._lock:
+            conn = self._connect()
+            try:
+                cur = conn.execute("DELETE FROM results WHERE ref_id = ? AND token = ?", (ref_id, token))
+                conn.commit()
+                return cur.rowcount > 0
+            finally:
+                conn.close()
+
+    def exists(self, token: str, ref_id: str) -> bool:
+        if not os.path.exists(self.path):
+            return False
+        with self._lock:
+            conn = self._connect()
+            try:
+                row = conn.execute(
+                    "SELECT 1 FROM results WHERE ref_id = ? AND token = ?", (ref_id, token)
+                ).fetchone()
+            finally:
+                conn.close()
+        return row is not None
+
+    def list_session(self, token: str) -> List[str]:
+        if not os.path.exists(self.path):
+            return []
+        with self._lock:
+            conn = self._connect()
+            try:
+                rows = conn.execute("SELECT ref_id FROM results WHERE token = ?", (token,)).fetchall()
+            finally:
+                conn.close()
+        return [r[0] for r in rows]
+
+    def stats(self) -> Dict[str, Any]:
+        base = {"backend": self.name, "path": self.path, "sessions": 0, "refs": 0, "bytes": 0}
+        if not os.path.exists(self.path):
+            return base
+        with self._lock:
+            conn = self._connect()
+            try:
+                sessions, refs, total = conn.execute(
+                    "SELECT COUNT(DISTINCT token), COUNT(*), COALESCE(SUM(nbytes), 0) FROM results"
+                ).fetchone()
+            finally:
+                conn.close()
+        base.update({"sessions": sessions, "refs": refs, "bytes": total})
+        return base
+
+    def list_sessions(self) -> Dict[str, Dict[str, int]]:
+        if not os.path.exists(self.path):
+            return {}
+        with self._lock:
+            conn = self._connect()
+            try:
+                rows = conn.execute(
+                    "SELECT token, COUNT(*), COALESCE(SUM(nbytes), 0) FROM results GROUP BY token"
+                ).fetchall()
+            finally:
+                conn.close()
+        return {token: {"refs": refs, "bytes": total} for token, refs, total in rows}
+
+    def session_mtime(self, token: str) -> Optional[float]:
+        if not os.path.exists(self.path):
+            return None
+        with self._lock:
+            conn = self._connect()
+            try:
+                row = conn.execute("SELECT MAX(created) FROM results WHERE token = ?", (token,)).fetchone()
+            finally:
+                conn.close()
+        return row[0] if row else None
+
+    def delete_session(self, token: str) -> int:
+        if not os.path.exists(self.path):
+            return 0
+        with self._lock:
+            conn = self._connect()
+            try:
+                cur = conn.execute("DELETE FROM results WHERE token = ?", (token,))
+                conn.commit()
+                return cur.rowcount
+            finally:
+                conn.close()
+
+
+# ── Write-behind ────────────────────────────────────────────────────────────
+
+class WriteBehindQueue:
+    """
+    Persist DataFrames on a background thread.
+
+    ``submit`` returns as soon as the write is queued. The queue is bounded:
+    once ``maxsize`` writes are outstanding, ``submit`` blocks until the
+    writer catches up (backpressure), so a burst of large outputs can't
+    grow RAM without limit. Frames stay reachable through ``pending`` until
+    their write has finished.
+    """
+
+    def __init__(self, maxsize: int = 64):
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(1, maxsize))
+        self._pending: Dict[str, pd.DataFrame] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._written = 0
+        self._failed = 0
+
+    def _ensure_thread(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="simple-steps-write-behind", daemon=True,
+                )
+                self._thread.start()
+
+    def submit(
+        self,
+        store: ResultStore,
+        token: str,
+        ref_id: str,
+        df: pd.DataFrame,
+        on_done: Optional[Callable[[str, str, pd.DataFrame, Optional[Exception]], None]] = None,
+    ) -> None:
+        with self._lock:
+            self._pending[ref_id] = df
+        self._ensure_thread()
+        self._queue.put((store, token, ref_id, df, on_done))
+
+    def pending(self, ref_id: str) -> Optional[pd.DataFrame]:
+        """Return the frame for *ref_id* if its write hasn't finished yet."""
+        return self._pending.get(ref_id)
+
+    def is_pending(self, ref_id: str) -> bool:
+        return ref_id in self._pending
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                return
+            store, token, ref_id, df, on_done = item
+            error: Optional[Exception] = None
+            try:
+                store.put(token, ref_id, df)
+            except Exception as e:
+                error = e
+            with self._lock:
+                if error is None:
+                    self._written += 1
+                else:
+                    self._failed += 1
+            try:
+                if on_done is not None:
+                    on_done(token, ref_id, df, error)
+            finally:
+                with self._lock:
+                    self._pending.pop(ref_id, None)
+                self._queue.task_done()
+
+    def flush(self) -> None:
+        """Block until every queued write has been attempted."""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.join()
+
+    def shutdown(self) -> None:
+        """Flush outstanding writes and stop the writer thread."""
+        self.flush()
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            self._queue.put(None)
+            thread.join()
+        self._thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "queued": self._queue.qsize(),
+                "pending": len(self._pending),
+                "maxsize": self._queue.maxsize,
+                "written": self._written,
+                "failed": self._failed,
+            }
+
+
+# ── Factory ─────────────────────────────────────────────────────────────────
+
+DURABLE_BACKENDS = {
+    "parquet": ParquetResultStore,
+    "arrow": ArrowResultStore,
+    "sqlite": SQLiteResultStore,
+}
+
+_INSTANCES: Dict[tuple, ResultStore] = {}
+_INSTANCES_LOCK = threading.Lock()
+
+
+def durable_store(mode: str, root: str) -> ResultStore:
+    """Return the (cached) durable backend for *mode* rooted at *root*."""
+    if mode not in DURABLE_BACKENDS:
+        raise ValueError(f"Unknown result store '{mode}'. Expected one of: {sorted(DURABLE_BACKENDS)}")
+    key = (mode, root)
+    with _INSTANCES_LOCK:
+        store = _INSTANCES.get(key)
+        if store is None:
+            if mode == "sqlite":
+                store = SQLiteResultStore(os.path.join(root, "results.sqlite"))
+            else:
+                store = DURABLE_BACKENDS[mode](root)
+            _INSTANCES[key] = store
+        return store
@@ -0,0 +1,274 @@
+"""
+Persistent memoization of individual row calls.
+
+Ops registered with ``cache="disk"`` have every mapped call (map / filter
+/ expand orchestrators, ``ss_map`` / ``ss_filter`` / ``ss_expand``)
+keyed on
+
+  - the operation id,
+  - the operation's version — a hash of its source code, so editing the
+    op invalidates its rows,
+  - the row's argument values,
+
+and looked up in one local SQLite file before the op runs. Only the rows
+that miss are called (on the op's usual executor) and their results are
+stored, so re-running a 10k-row step after appending 50 rows makes 50
+calls.
+
+Rows that fail, and results that can't be pickled, are not stored.
+Entries older than ``settings.row_cache_ttl_seconds`` are ignored and
+purged; past ``settings.row_cache_max_bytes`` the least recently read
+rows are evicted.
+"""
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .exec_options import exec_options
+from .step_cache import feed_value, source_hash
+
+DISK = "disk"
+CACHE_MODES = (DISK,)
+
+ROW_CACHE_PATH = os.environ.get(
+    "SIMPLE_STEPS_ROW_CACHE_PATH",
+    os.path.join(".simple_steps_cache", "_row_cache", "rows.sqlite"),
+)
+
+# SQLite's default limit on host parameters per statement is 999.
+_BATCH = 500
+
+_COUNTERS = {"hits": 0, "misses": 0}
+_LOCK = threading.Lock()
+_ready_path: Optional[str] = None   # file whose table has been created
+
+
+def _settings():
+    from .settings import get_settings
+    return get_settings()
+
+
+def resolve_cache(func: Callable) -> Optional[str]:
+    """The cache mode declared for *func* (``DISK``), or None."""
+    return exec_options(func).cache
+
+
+# ── Keying ──────────────────────────────────────────────────────────────────
+
+def row_key(op_id: str, version: str, kwargs: Dict[str, Any]) -> Optional[str]:
+    """Key of one row call, or None if its arguments can't be fingerprinted."""
+    h = hashlib.sha256()
+    h.update(f"{op_id}|{version}".encode())
+    try:
+        feed_value(h, kwargs)
+    except Exception:
+        return None
+    return h.hexdigest()
+
+
+# ── Storage ─────────────────────────────────────────────────────────────────
+
+def _connect() -> sqlite3.Connection:
+    global _ready_path
+    ready = _ready_path == ROW_CACHE_PATH
+    if not ready:
+        os.makedirs(os.path.dirname(ROW_CACHE_PATH) or ".", exist_ok=True)
+    conn = sqlite3.connect(ROW_CACHE_PATH, timeout=30)
+    if not ready:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS rows ("
+            " key TEXT PRIMARY KEY,"
+            " op_id TEXT NOT NULL,"
+            " value BLOB NOT NULL,"
+            " nbytes INTEGER NOT NULL,"
+            " created REAL NOT NULL,"
+            " accessed REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS rows_accessed ON rows(accessed)")
+        conn.commit()
+        _ready_path = ROW_CACHE_PATH
+    return conn
+
+
+def _oldest_valid() -> float:
+    ttl = _settings().row_cache_ttl_seconds
+    return time.time() - ttl if ttl else 0.0
+
+
+def get_many(keys: Sequence[str]) -> Dict[str, Any]:
+    """The unexpired stored results among *keys*."""
+    if not keys or not os.path.exists(ROW_CACHE_PATH):
+        return {}
+    oldest = _oldest_valid()
+    found: Dict[str, Any] = {}
+    unique = list(dict.fromkeys(keys))
+    with _LOCK:
+        conn = _connect()
+        try:
+            for start in range(0, len(unique), _BATCH):
+                batch = unique[start:start + _BATCH]
+                marks = ",".join("?" * len(batch))
+                rows = conn.execute(
+                    f"SELECT key, value FROM rows WHERE created >= ? AND key IN ({marks})",
+                    (oldest, *batch),
+                ).fetchall()
+                for key, blob in rows:
+                    try:
+                        found[key] = pickle.loads(blob)
+                    except Exception as e:
+                        print(f"  ⚠ Failed to read row cache entry '{key[:12]}': {e}")
+            if found:
+                now = time.time()
+                conn.executemany("UPDATE rows SET accessed = ? WHERE key = ?",
+                                 [(now, key) for key in found])
+                conn.commit()
+        finally:
+            conn.close()
+    return found
+
+
+def put_many(op_id: str, items: Sequence[Tuple[str, Any]]) -> None:
+    """Store ``(key, result)`` pairs, then enforce the TTL and size budget."""
+    now = time.time()
+    records = []
+    for key, value in items:
+        try:
+            blob = pickle.dumps(value)
+        except Exception:
+            continue  # unpicklable results are just recomputed next time
+        records.append((key, op_id, blob, len(blob), now, now))
+    if not records:
+        return
+    with _LOCK:
+        conn = _connect()
+        try:
+            conn.executemany(
+                "INSERT OR REPLACE INTO rows (key, op_id, value, nbytes, created, accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                records,
+            )
+            _enforce_limits(conn)
+            conn.commit()
+        finally:
+            conn.close()
+
+
+def _enforce_limits(conn: sqlite3.Connection) -> None:
+    """Purge expired rows, then evict least-recently-read rows past the budget."""
+    oldest = _oldest_valid()
+    if oldest:
+        conn.execute("DELETE FROM rows WHERE created < ?", (oldest,))
+    budget = int(_settings().row_cache_max_bytes)
+    total = conn.execute("SELECT COALESCE(SUM(nbytes), 0) FROM rows").fetchone()[0]
+    if total <= budget:
+        return
+    # Walk the LRU order and cut where the remainder fits.
+    excess = total - budget
+    cutoff = None
+    for accessed, nbytes in conn.execute("SELECT accessed, nbytes FROM rows ORDER BY accessed"):
+        excess -= nbytes
+        cutoff = accessed
+        if excess <= 0:
+            break
+    if cutoff is not None:
+        conn.execute("DELETE FROM rows WHERE accessed <= ?", (cutoff,))
+
+
+# ── Orchestrator entry point ────────────────────────────────────────────────
+
+def cached_rows(
+    func: Callable,
+    row_kwargs: List[Dict[str, Any]],
+    run: Callable[[List[Dict[str, Any]]], Tuple[List[Any], List[Optional[str]]]],
+    label: str = "",
+) -> Tuple[List[Any], List[Optional[str]]]:
+    """
+    ``run(row_kwargs)`` with stored rows served from the cache.
+
+    *run* is called with only the rows that missed (in order) and must
+    return ``(results, errors)`` for them, like ``run_rows``. Returns
+    ``(results, errors)`` for all rows. Identical rows in one call are run
+    once.
+    """
+    n = len(row_kwargs)
+    op_id = exec_options(func).op_id or getattr(func, "__qualname__", repr(func))
+    version = source_hash(func)
+    keys = [row_key(op_id, version, kwargs) for kwargs in row_kwargs]
+    try:
+        stored = get_many([k for k in keys if k is not None])
+    except sqlite3.Error as e:
+        print(f"  ⚠ Row cache unavailable ({e}); calling every row")
+        stored = {}
+
+    results: List[Any] = [None] * n
+    errors: List[Optional[str]] = [None] * n
+    pending: Dict[Any, List[int]] = {}   # key (or row index if unkeyable) → rows
+    for i, key in enumerate(keys):
+        if key is not None and key in stored:
+            results[i] = stored[key]
+        else:
+            pending.setdefault(key if key is not None else i, []).append(i)
+
+    hits = n - sum(len(rows) for rows in pending.values())
+    with _LOCK:
+        _COUNTERS["hits"] += hits
+        _COUNTERS["misses"] += len(pending)
+    print(f"[Orchestrator] Row cache for {label or op_id}: {hits} hit(s), {len(pending)} call(s)")
+    if not pending:
+        return results, errors
+
+    groups = list(pending.items())
+    miss_results, miss_errors = run([row_kwargs[rows[0]] for _, rows in groups])
+    fresh = []
+    for (key, rows), result, error in zip(groups, miss_results, miss_errors):
+        for i in rows:
+            results[i] = result
+            errors[i] = error
+        if error is None and isinstance(key, str):
+            fresh.append((key, result))
+    try:
+        put_many(op_id, fresh)
+    except sqlite3.Error as e:
+        print(f"  ⚠ Row cache entries not persisted ({e})")
+    return results, errors
+
+
+def stats() -> Dict[str, Any]:
+    """Hit / miss counters plus the stored rows and their size."""
+    entries, nbytes = 0, 0
+    if os.path.exists(ROW_CACHE_PATH):
+        with _LOCK:
+            conn = _connect()
+            try:
+                entries, nbytes = conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(nbytes), 0) FROM rows"
+                ).fetchone()
+            finally:
+                conn.close()
+    with _LOCK:
+        return {
+            "hits": _COUNTERS["hits"],
+            "misses": _COUNTERS["misses"],
+            "entries": entries,
+            "bytes": nbytes,
+            "max_bytes": int(_settings().row_cache_max_bytes),
+            "ttl_seconds": _settings().row_cache_ttl_seconds,
+        }
+
+
+def clear() -> None:
+    """Delete every stored row and reset the counters."""
+    with _LOCK:
+        _COUNTERS["hits"] = 0
+        _COUNTERS["misses"] = 0
+        if os.path.exists(ROW_CACHE_PATH):
+            conn = _connect()
+            try:
+                conn.execute("DELETE FROM rows")
+                conn.commit()
+            finally:
+                conn.close()
@@ -0,0 +1,285 @@
+"""
+Per-row call execution shared by the map orchestrators.
+
+``run_rows(call, n)`` calls ``call(i)`` for every row index and returns the
+results in row order. With ``concurrency > 1`` the calls run on a bounded
+thread pool — I/O-bound ops (HTTP APIs) get roughly N× throughput — and a
+failing row no longer aborts the step: its exception is returned in
+``errors`` and the orchestrator writes it to the ``_error`` column.
+
+Concurrency is resolved, in order, from:
+  1. the step's ``_concurrency`` config override (set via ``step_options``),
+  2. ``@simple_step(concurrency=N)`` / ``register_operation(concurrency=N)``,
+  3. 1 — serial, exceptions propagate as before.
+
+``executor`` ("thread" or "process", see ``process_executor``),
+``flatten`` (how many levels of nested dict results become columns) and
+``on_error`` ("raise", or "continue" to record failures in the ``_error``
+column even when serial) are resolved the same way from the
+``_executor`` / ``_flatten`` / ``_on_error`` overrides and the op's
+declaration. Rate limits and retries live in ``row_policy``.
+
+``async def`` ops are gathered on an event loop instead, with at most
+``concurrency`` coroutines in flight (default ``DEFAULT_ASYNC_CONCURRENCY``)
+— one thread can keep thousands of API requests going for a single step.
+
+Progress is reported to the current ``progress.StepProgress``, if any.
+"""
+import asyncio
+import inspect
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Iterator, List, Optional, Tuple
+
+from .exec_options import exec_options
+from .progress import current_progress
+
+ERROR_COLUMN = "_error"
+DEFAULT_ASYNC_CONCURRENCY = 32
+
+THREAD = "thread"
+PROCESS = "process"
+EXECUTORS = (THREAD, PROCESS)
+
+RAISE = "raise"
+CONTINUE = "continue"
+ON_ERROR_MODES = (RAISE, CONTINUE)
+
+_STEP_CONCURRENCY: ContextVar[Optional[int]] = ContextVar("simple_steps_step_concurrency", default=None)
+_STEP_EXECUTOR: ContextVar[Optional[str]] = ContextVar("simple_steps_step_executor", default=None)
+_STEP_FLATTEN: ContextVar[Optional[int]] = ContextVar("simple_steps_step_flatten", default=None)
+_STEP_ON_ERROR: ContextVar[Optional[str]] = ContextVar("simple_steps_step_on_error", default=None)
+
+
+@contextmanager
+def step_options(concurrency: Any = None, executor: Any = None, flatten: Any = None,
+                 on_error: Any = None) -> Iterator[None]:
+    """Apply per-step overrides (``_concurrency``, ``_executor``, ``_flatten``, ``_on_error``) for the duration of a run."""
+    value: Optional[int] = None
+    if concurrency not in (None, ""):
+        try:
+            value = int(concurrency)
+        except (TypeError, ValueError):
+            raise ValueError(f"_concurrency must be an integer, got {concurrency!r}")
+    if executor == "":
+        executor = None
+    if executor is not None and executor not in EXECUTORS:
+        raise ValueError(f"_executor must be one of {', '.join(EXECUTORS)}, got {executor!r}")
+    depth: Optional[int] = None
+    if flatten not in (None, ""):
+        try:
+            depth = int(flatten)
+        except (TypeError, ValueError):
+            raise ValueError(f"_flatten must be an integer, got {flatten!r}")
+    if on_error == "":
+        on_error = None
+    if on_error is not None and on_error not in ON_ERROR_MODES:
+        raise ValueError(f"_on_error must be one of {', '.join(ON_ERROR_MODES)}, got {on_error!r}")
+    token = _STEP_CONCURRENCY.set(value)
+    executor_token = _STEP_EXECUTOR.set(executor)
+    flatten_token = _STEP_FLATTEN.set(depth)
+    on_error_token = _STEP_ON_ERROR.set(on_error)
+    try:
+        yield
+    finally:
+        _STEP_ON_ERROR.reset(on_error_token)
+        _STEP_FLATTEN.reset(flatten_token)
+        _STEP_EXECUTOR.reset(executor_token)
+        _STEP_CONCURRENCY.reset(token)
+
+
+def is_async_op(func: Callable) -> bool:
+    plan = getattr(func, "_call_plan", None)
+    if plan is not None and plan.func is func:
+        return plan.is_async
+    return inspect.iscoroutinefunction(func) or inspect.iscoroutinefunction(inspect.unwrap(func))
+
+
+def resolve_concurrency(func: Callable) -> int:
+    """Effective row concurrency for *func* in the current step."""
+    value = _STEP_CONCURRENCY.get()
+    if value is None:
+        value = exec_options(func).concurrency
+    if value is None and is_async_op(func):
+        value = DEFAULT_ASYNC_CONCURRENCY
+    try:
+        return max(1, int(value or 1))
+    except (TypeError, ValueError):
+        return 1
+
+
+def resolve_executor(func: Callable) -> str:
+    """Effective executor (``THREAD`` or ``PROCESS``) for *func* in the current step."""
+    return _STEP_EXECUTOR.get() or exec_options(func).executor or THREAD
+
+
+def resolve_flatten(func: Callable) -> int:
+    """Levels of nested dict results to flatten into columns for *func* (0 = none)."""
+    value = _STEP_FLATTEN.get()
+    if value is None:
+        value = exec_options(func).flatten
+    return max(0, int(value or 0))
+
+
+def continues_on_error(func: Callable) -> bool:
+    """Whether failing rows of *func* go to the ``_error`` column instead of aborting the step."""
+    return (_STEP_ON_ERROR.get() or exec_options(func).on_error or RAISE) == CONTINUE
+
+
+def run_sync(awaitable: Awaitable) -> Any:
+    """
+    Run *awaitable* to completion from synchronous code.
+
+    Uses ``asyncio.run`` on this thread, or — if this thread already runs a
+    loop (notebooks, async callers) — a private loop on a helper thread.
+    """
+    async def _await():
+        return await awaitable
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(_await())
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="ss-async") as pool:
+        return pool.submit(asyncio.run, _await()).result()
+
+
+def resolve_awaitable(value: Any) -> Any:
+    """Await *value* if an ``async def`` op returned a coroutine."""
+    if inspect.isawaitable(value):
+        return run_sync(value)
+    return value
+
+
+def format_error(exc: BaseException) -> str:
+    return f"{type(exc).__name__}: {exc}"
+
+
+def _report(prog, done: int, total: int, label: str) -> None:
+    if prog is None:
+        return
+    # ~100 events per step at most, plus the final one.
+    if done == total or done % max(1, total // 100) == 0:
+        prog.update(done, total, label)
+
+
+def run_rows(
+    call: Callable[[int], Any],
+    n: int,
+    concurrency: int = 1,
+    label: str = "",
+    is_async: bool = False,
+    capture_errors: bool = True,
+    continue_on_error: bool = False,
+) -> Tuple[List[Any], List[Optional[str]]]:
+    """
+    Run ``call(i)`` for ``i in range(n)``. Returns ``(results, errors)``,
+    both in row order; ``errors[i]`` is None for rows that succeeded.
+
+    Serial runs (concurrency 1) let exceptions propagate unless
+    ``continue_on_error``. Concurrent runs capture them per row (unless
+    ``capture_errors`` is False; ``continue_on_error`` wins), keep at most
+    ``concurrency * 4`` calls queued, and never hold more than that many
+    futures at once. With ``is_async`` each ``call(i)`` returns an
+    awaitable and the rows are gathered on an event loop.
+    """
+    results: List[Any] = [None] * n
+    errors: List[Optional[str]] = [None] * n
+    prog = current_progress()
+    capture_errors = capture_errors or continue_on_error
+
+    if is_async:
+        run_sync(_gather_rows(call, n, concurrency, label, results, errors, capture_errors,
+                              continue_on_error, prog))
+        return results, errors
+
+    if concurrency <= 1 or n <= 1:
+        for i in range(n):
+            if continue_on_error:
+                try:
+                    results[i] = call(i)
+                except Exception as e:
+                    errors[i] = format_error(e)
+            else:
+                results[i] = call(i)
+            if prog is not None:
+                _report(prog, i + 1, n, label)
+        return results, errors
+
+    window = concurrency * 4
+    done = 0
+    with ThreadPoolExecutor(max_workers=min(concurrency, n), thread_name_prefix="ss-row") as pool:
+        in_flight = {}
+        next_row = 0
+        while next_row < n or in_flight:
+            while next_row < n and len(in_flight) < window:
+                in_flight[pool.submit(call, next_row)] = next_row
+                next_row += 1
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                i = in_flight.pop(fut)
+                try:
+                    results[i] = fut.result()
+                except Exception as e:
+                    if not capture_errors:
+                        raise
+                    errors[i] = format_error(e)
+                done += 1
+                _report(prog, done, n, label)
+    return results, errors
+
+
+async def _gather_rows(
+    call: Callable[[int], Awaitable],
+    n: int,
+    concurrency: int,
+    label: str,
+    results: List[Any],
+    errors: List[Optional[str]],
+    capture_errors: bool,
+    continue_on_error: bool,
+    prog,
+) -> None:
+    """Fill *results* with ``concurrency`` workers pulling row indices."""
+    rows = iter(range(n))
+    capture = continue_on_error or (capture_errors and concurrency > 1)
+    done = 0
+
+    async def worker():
+        nonlocal done
+        for i in rows:  # shared iterator — each index is taken once
+            try:
+                results[i] = await call(i)
+            except Exception as e:
+                if not capture:
+                    raise
+                errors[i] = format_error(e)
+            done += 1
+            _report(prog, done, n, label)
+
+    await asyncio.gather(*(worker() for _ in range(max(1, min(concurrency, n)))))
+
+
+def run_row_kwargs(
+    func: Callable,
+    row_kwargs: List[dict],
+    label: str = "",
+    capture_errors: bool = True,
+) -> Tuple[List[Any], List[Optional[str]]]:
+    """
+    Call ``func(**row_kwargs[i])`` for every row on the op's executor —
+    worker processes, the event loop or the thread pool — with its rate
+    limit, retries and ``on_error`` mode, and return ``run_rows``'s
+    ``(results, errors)``.
+    """
+    continues = continues_on_error(func)
+    if resolve_executor(func) == PROCESS:
+        from .process_executor import run_rows_in_processes
+        return run_rows_in_processes(func, row_kwargs, label=label,
+                                     capture_errors=capture_errors or continues)
+    from .row_policy import apply_policy
+    guarded = apply_policy(func)
+    return run_rows(lambda i: guarded(**row_kwargs[i]), len(row_kwargs), resolve_concurrency(func),
+                    label=label, is_async=is_async_op(func), capture_errors=capture_errors,
+                    continue_on_error=continues)
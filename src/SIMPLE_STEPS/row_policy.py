@@ -0,0 +1,139 @@
+"""
+Rate limiting and retries for row-level op calls.
+
+An op can declare, on ``@simple_step`` / ``register_operation`` /
+``pack.step``:
+
+  rate_limit  at most this many calls per second across every row of
+              every step running the op — a number, or ``"N/s"``,
+              ``"N/min"``, ``"N/h"``. Calls beyond it wait their turn
+              (token bucket, bursts of up to one second's worth).
+  retries     re-run a failing call up to this many times,
+  retry_on    ... but only for these exception types (default: any
+              ``Exception``),
+  backoff     waiting ``backoff * 2**attempt`` seconds (with jitter,
+              capped at ``MAX_BACKOFF``) before each retry.
+
+``apply_policy(func)`` returns *func* wrapped accordingly (sync or
+async), or *func* itself when it declares none of these. Every
+orchestrator path applies it to the per-row calls; worker processes apply
+it on their side, so there the rate limit holds per process.
+
+``on_error="continue"`` (resolved in ``row_executor``) is the third part
+of the policy: failures that survive the retries are written to the
+``_error`` column instead of aborting the step.
+"""
+import asyncio
+import functools
+import random
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple, Type, Union
+
+DEFAULT_BACKOFF = 0.5
+MAX_BACKOFF = 60.0
+
+_RATE_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*/\s*(s|sec|second|m|min|minute|h|hour)\s*$")
+_PER = {"s": 1, "sec": 1, "second": 1, "m": 60, "min": 60, "minute": 60,
+        "h": 3600, "hour": 3600}
+
+
+def parse_rate_limit(value: Union[int, float, str, None]) -> Optional[float]:
+    """Calls per second for a ``rate_limit`` declaration (None = unlimited)."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        m = _RATE_RE.match(value)
+        if not m:
+            raise ValueError(f"rate_limit must be a number or like '10/s', '600/min', got {value!r}")
+        rate = float(m.group(1)) / _PER[m.group(2)]
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        rate = float(value)
+    else:
+        raise ValueError(f"rate_limit must be a number or like '10/s', '600/min', got {value!r}")
+    if rate <= 0:
+        raise ValueError("rate_limit must be positive")
+    return rate
+
+
+class TokenBucket:
+    """Thread-safe token bucket that hands out waits instead of blocking."""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.burst = max(1.0, burst if burst is not None else rate)
+        self._tokens = self.burst
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take a token; return how many seconds to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+            self._stamp = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+
+_BUCKETS: Dict[Any, TokenBucket] = {}   # op id (or the function) → bucket
+_BUCKETS_LOCK = threading.Lock()
+
+
+def _bucket_for(key: Any, rate: float) -> TokenBucket:
+    with _BUCKETS_LOCK:
+        bucket = _BUCKETS.get(key)
+        if bucket is None or bucket.rate != rate:
+            bucket = _BUCKETS[key] = TokenBucket(rate)
+        return bucket
+
+
+def _delay(backoff: float, attempt: int) -> float:
+    return min(MAX_BACKOFF, backoff * (2 ** attempt)) * random.uniform(0.5, 1.0)
+
+
+def apply_policy(func: Callable) -> Callable:
+    """*func* with its declared rate limit and retries applied to every call."""
+    from .exec_options import exec_options
+    from .row_executor import is_async_op
+
+    options = exec_options(func)
+    rate: Optional[float] = options.rate_limit
+    retries: int = options.retries or 0
+    if not rate and not retries:
+        return func
+    retry_on: Tuple[Type[BaseException], ...] = options.retry_on or (Exception,)
+    backoff: float = options.backoff or DEFAULT_BACKOFF
+    bucket = _bucket_for(options.op_id or func, rate) if rate else None
+
+    if is_async_op(func):
+        @functools.wraps(func)
+        async def guarded_async(*args: Any, **kwargs: Any) -> Any:
+            for attempt in range(retries + 1):
+                if bucket is not None:
+                    wait = bucket.reserve()
+                    if wait:
+                        await asyncio.sleep(wait)
+                try:
+                    return await func(*args, **kwargs)
+                except retry_on:
+                    if attempt == retries:
+                        raise
+                    await asyncio.sleep(_delay(backoff, attempt))
+        return guarded_async
+
+    @functools.wraps(func)
+    def guarded(*args: Any, **kwargs: Any) -> Any:
+        for attempt in range(retries + 1):
+            if bucket is not None:
+                wait = bucket.reserve()
+                if wait:
+                    time.sleep(wait)
+            try:
+                return func(*args, **kwargs)
+            except retry_on:
+                if attempt == retries:
+                    raise
+                time.sleep(_delay(backoff, attempt))
+    return guarded
@@ -4,8 +4,8 @@ safe_formula.py
 Safe AST-based formula interpreter for Simple Steps.
 
 The formula bar uses Python *syntax* but is NOT executed with ``eval``.
-Every formula is parsed into an ``ast`` tree and walked by a small
-interpreter that only knows how to do a closed set of things:
+Every formula is parsed into an ``ast`` tree, validated, and compiled
+into nested closures that only know how to do a closed set of things:
 
     • Look up step references (``step1``)
     • Read columns from steps via attribute or subscript (``step1.url``,
@@ -29,17 +29,24 @@ Three entry points:
     run_formula(formula, steps)         -> result (Step­Proxy / DF / scalar)
 
 ``run_formula`` always re-validates before executing, so misuse from the
-API surface cannot bypass the allowlist.
+API surface cannot bypass the allowlist. Parsed trees and validation
+results are kept in LRU caches keyed on the formula text (plus the step
+names and registry version for validation), so re-submitting the same
+formula skips both.
 """
 
 from __future__ import annotations
 
 import ast
 import inspect
+import operator
 import re
 import pandas as pd
 from dataclasses import dataclass, asdict
-from typing import Any, Dict, List, Optional, Tuple, Union, TYPE_CHECKING
+from functools import lru_cache
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple, Union, TYPE_CHECKING
+
+from .call_plan import call_plan
 
 if TYPE_CHECKING:
     from .step_proxy import StepProxy
@@ -47,6 +54,8 @@ if TYPE_CHECKING:
 # Public type alias — what callers may pass as the "step environment".
 StepEnv = Dict[str, Any]
 
+PARSE_CACHE_SIZE = 1024
+
 
 class FormulaError(Exception):
     """Raised for malformed or disallowed formulas (parse/validate/interp)."""
@@ -222,6 +231,12 @@ def _strip_legacy_modifiers(text: str) -> str:
     return _LEGACY_MODIFIER_RE.sub(r"\g<op>(", text)
 
 
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_cached(formula: str) -> ast.Expression:
+    """``parse`` memoized on the formula text. The tree is shared — read it, never mutate it."""
+    return parse(formula)
+
+
 # --------------------------------------------------------------------------- #
 # Validation — pure, no side effects, no execution.                           #
 # --------------------------------------------------------------------------- #
@@ -241,13 +256,12 @@ def _signature_diagnostics(
     function's signature. Returns a list of Diagnostics (empty if clean).
     """
     diags: List[Diagnostic] = []
-    try:
-        sig = inspect.signature(func)
-    except (TypeError, ValueError):
+    plan = call_plan(func)
+    if plan.signature is None:
         return diags  # builtins / C funcs without signatures — skip silently
 
-    params = sig.parameters
-    has_var_kw = any(p.kind is inspect.Parameter.VAR_KEYWORD for p in params.values())
+    params = plan.signature.parameters
+    has_var_kw = plan.accepts_var_kwargs
     has_var_pos = any(p.kind is inspect.Parameter.VAR_POSITIONAL for p in params.values())
 
     # ── Unknown kwargs ──
@@ -339,19 +353,50 @@ def validate(
     registry          Operation registry to check call targets against.
                       Defaults to ``decorators.OPERATION_REGISTRY``.
     """
+    from .decorators import OPERATION_REGISTRY, registry_version
+    if isinstance(formula, str) and (registry is None or registry is OPERATION_REGISTRY):
+        _, diags = _checked(formula, frozenset(available_steps or ()), registry_version())
+        return list(diags)
+
     if registry is None:
-        from .decorators import OPERATION_REGISTRY
         registry = OPERATION_REGISTRY
 
     if isinstance(formula, str):
         try:
-            tree = parse(formula)
+            tree = _parse_cached(formula)
         except FormulaError as e:
             return [Diagnostic(message=str(e), code="syntax_error")]
     else:
         tree = formula
+    return _validate_tree(tree, available_steps or set(), registry)
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _checked(
+    formula: str,
+    steps: FrozenSet[str],
+    version: Tuple[int, int],
+) -> Tuple[Optional[ast.Expression], Tuple[Diagnostic, ...]]:
+    """
+    Parse and validate *formula* against the global registry, memoized.
+
+    *version* is ``decorators.registry_version()`` — it only takes part in
+    the key, so registering ops invalidates earlier results. The tree is
+    None when the formula doesn't parse.
+    """
+    from .decorators import OPERATION_REGISTRY
+    try:
+        tree = _parse_cached(formula)
+    except FormulaError as e:
+        return None, (Diagnostic(message=str(e), code="syntax_error"),)
+    return tree, tuple(_validate_tree(tree, steps, OPERATION_REGISTRY))
+
 
-    steps = available_steps or set()
+def _validate_tree(
+    tree: ast.AST,
+    steps: Union[set, FrozenSet[str]],
+    registry: Dict[str, Any],
+) -> List[Diagnostic]:
     diags: List[Diagnostic] = []
 
     def add(msg: str, code: str, node: Optional[ast.AST] = None) -> None:
@@ -421,11 +466,13 @@ def validate(
 
 
 # --------------------------------------------------------------------------- #
-# Interpretation                                                              #
+# Compilation & evaluation                                                    #
 # --------------------------------------------------------------------------- #
 def _coerce_step_env(steps: StepEnv) -> Dict[str, "StepProxy"]:  # noqa: F821
     """Wrap raw DataFrames as StepProxy objects so column access works."""
-    from .step_proxy import StepProxy
+    from .step_proxy import LazyStepEnv, StepProxy
+    if isinstance(steps, LazyStepEnv):
+        return steps  # already yields StepProxy objects, loaded on lookup
     out: Dict[str, "StepProxy"] = {}
     for k, v in steps.items():
         if isinstance(v, StepProxy):
@@ -440,122 +487,220 @@ def _coerce_step_env(steps: StepEnv) -> Dict[str, "StepProxy"]:  # noqa: F821
 
 
 _BINOP_TABLE = {
-    ast.Add:      lambda a, b: a + b,
-    ast.Sub:      lambda a, b: a - b,
-    ast.Mult:     lambda a, b: a * b,
-    ast.Div:      lambda a, b: a / b,
-    ast.FloorDiv: lambda a, b: a // b,
-    ast.Mod:      lambda a, b: a % b,
-    ast.Pow:      lambda a, b: a ** b,
+    ast.Add:      operator.add,
+    ast.Sub:      operator.sub,
+    ast.Mult:     operator.mul,
+    ast.Div:      operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod:      operator.mod,
+    ast.Pow:      operator.pow,
 }
 
 _CMPOP_TABLE = {
-    ast.Eq:    lambda a, b: a == b,
-    ast.NotEq: lambda a, b: a != b,
-    ast.Lt:    lambda a, b: a < b,
-    ast.Gt:    lambda a, b: a > b,
-    ast.LtE:   lambda a, b: a <= b,
-    ast.GtE:   lambda a, b: a >= b,
+    ast.Eq:    operator.eq,
+    ast.NotEq: operator.ne,
+    ast.Lt:    operator.lt,
+    ast.Gt:    operator.gt,
+    ast.LtE:   operator.le,
+    ast.GtE:   operator.ge,
 }
 
+# A compiled formula: called with the step environment, returns the value.
+Program = Callable[[Dict[str, Any]], Any]
+
+# Folding must stay cheap: only numbers (and string concatenation /
+# comparison) are folded, and integers that would grow past this many
+# bits are left to run time, like CPython's own constant folder.
+_MAX_FOLDED_BITS = 4096
+_NUMBER = (int, float, complex)
+_STR_FOLDABLE = {operator.add, operator.eq, operator.ne, operator.lt,
+                 operator.gt, operator.le, operator.ge}
+
+
+def _constant(value: Any) -> Program:
+    def const(steps: Dict[str, Any]) -> Any:
+        return value
+    const.folded = (value,)  # type: ignore[attr-defined]
+    return const
+
+
+def _folded(program: Program) -> Optional[Tuple[Any]]:
+    """``(value,)`` if *program* is a compile-time constant, else None."""
+    return getattr(program, "folded", None)
+
+
+def _constant_args(operands: Tuple[Program, ...]) -> Optional[List[Any]]:
+    values = [_folded(o) for o in operands]
+    if any(v is None for v in values):
+        return None
+    return [v[0] for v in values]
+
+
+def _gather(build: Callable, *operands: Program) -> Optional[Program]:
+    """A tuple / slice of constants, built at compile time (no evaluation involved)."""
+    args = _constant_args(operands)
+    return None if args is None else _constant(build(*args))
 
-def _interpret(node: ast.AST, env: Dict[str, Any]) -> Any:
-    steps: Dict[str, Any] = env["steps"]
-    registry: Dict[str, Any] = env["registry"]
 
+def _fold(op: Callable, *operands: Program) -> Optional[Program]:
+    """
+    Arithmetic / comparison *op* applied at compile time, if every operand
+    is a constant and the result is known to be small. Anything that could
+    be expensive (sequence repetition, big integer powers) or fails is left
+    for the formula's run.
+    """
+    args = _constant_args(operands)
+    if args is None:
+        return None
+    if all(isinstance(a, _NUMBER) for a in args):
+        if op is operator.pow and isinstance(args[0], int) and isinstance(args[1], int):
+            if args[1] > 0 and abs(args[0]).bit_length() * args[1] > _MAX_FOLDED_BITS:
+                return None
+    elif not (op in _STR_FOLDABLE and all(isinstance(a, str) for a in args)):
+        return None
+    try:
+        value = op(*args)
+    except Exception:
+        return None  # let it raise when the formula runs
+    if isinstance(value, int) and value.bit_length() > _MAX_FOLDED_BITS:
+        return None
+    return _constant(value)
+
+
+def _compile(node: ast.AST, registry: Dict[str, Any]) -> Program:
+    """
+    Turn a validated tree into nested closures, once per formula.
+
+    Constant sub-expressions are folded, operator lookups resolved and
+    registry functions bound here, so running the result is just calls —
+    no isinstance dispatch or registry lookups per evaluation.
+    """
     if isinstance(node, ast.Expression):
-        return _interpret(node.body, env)
+        return _compile(node.body, registry)
 
     if isinstance(node, ast.Constant):
-        return node.value
+        return _constant(node.value)
 
     if isinstance(node, ast.Name):
-        if node.id in steps:
-            return steps[node.id]
-        if node.id in registry:
-            return registry[node.id]["func"]
-        raise FormulaError(f"Unknown name: '{node.id}'")
+        name = node.id
+        if name in registry:
+            func = registry[name]["func"]
+
+            def name_or_op(steps: Dict[str, Any]) -> Any:
+                return steps[name] if name in steps else func
+            return name_or_op
+
+        def name_ref(steps: Dict[str, Any]) -> Any:
+            if name in steps:
+                return steps[name]
+            raise FormulaError(f"Unknown name: '{name}'")
+        return name_ref
 
     if isinstance(node, ast.Attribute):
-        step = steps[node.value.id]  # type: ignore[union-attr]
-        return getattr(step, node.attr)
+        step_name, attr = node.value.id, node.attr  # type: ignore[union-attr]
+
+        def attribute(steps: Dict[str, Any]) -> Any:
+            return getattr(steps[step_name], attr)
+        return attribute
 
     if isinstance(node, ast.Subscript):
-        # Resolve target recursively — supports chained subscripts:
+        # Chained subscripts compile recursively:
         #   step1["col"][0]   → ColumnProxy then scalar
         #   step1[["a","b"]]  → narrower StepProxy
-        target = _interpret(node.value, env)
+        target = _compile(node.value, registry)
         slice_node = node.slice
         if hasattr(ast, "Index") and isinstance(slice_node, ast.Index):
             slice_node = slice_node.value  # type: ignore[attr-defined]
         if isinstance(slice_node, ast.Slice):
-            lower = _interpret(slice_node.lower, env) if slice_node.lower else None
-            upper = _interpret(slice_node.upper, env) if slice_node.upper else None
-            step  = _interpret(slice_node.step,  env) if slice_node.step  else None
-            return target[slice(lower, upper, step)]
-        key = _interpret(slice_node, env)
-        return target[key]
+            none = _constant(None)
+            parts = [_compile(p, registry) if p else none
+                     for p in (slice_node.lower, slice_node.upper, slice_node.step)]
+            key = _gather(slice, *parts) or (
+                lambda steps: slice(*[p(steps) for p in parts]))
+        else:
+            key = _compile(slice_node, registry)
+
+        def subscript(steps: Dict[str, Any]) -> Any:
+            return target(steps)[key(steps)]
+        return subscript
 
     if isinstance(node, ast.List):
-        return [_interpret(e, env) for e in node.elts]
+        elts = [_compile(e, registry) for e in node.elts]
+        # Always a fresh list — ops may mutate their arguments.
+        return lambda steps: [e(steps) for e in elts]
 
     if isinstance(node, ast.Tuple):
-        return tuple(_interpret(e, env) for e in node.elts)
+        elts = [_compile(e, registry) for e in node.elts]
+        return _gather(lambda *v: v, *elts) or (lambda steps: tuple(e(steps) for e in elts))
 
     if isinstance(node, ast.Dict):
-        return {
-            _interpret(k, env): _interpret(v, env)
-            for k, v in zip(node.keys, node.values)
-        }
+        items = [(_compile(k, registry), _compile(v, registry))
+                 for k, v in zip(node.keys, node.values)]
+        return lambda steps: {k(steps): v(steps) for k, v in items}
 
     if isinstance(node, ast.UnaryOp):
-        operand = _interpret(node.operand, env)
         if isinstance(node.op, ast.USub):
-            return -operand
-        if isinstance(node.op, ast.UAdd):
-            return +operand
-        raise FormulaError(f"Unsupported unary operator: {type(node.op).__name__}")
+            op = operator.neg
+        elif isinstance(node.op, ast.UAdd):
+            op = operator.pos
+        else:
+            raise FormulaError(f"Unsupported unary operator: {type(node.op).__name__}")
+        operand = _compile(node.operand, registry)
+        return _fold(op, operand) or (lambda steps: op(operand(steps)))
 
     if isinstance(node, ast.BinOp):
         op = _BINOP_TABLE.get(type(node.op))
         if op is None:
             raise FormulaError(f"Unsupported binary operator: {type(node.op).__name__}")
-        return op(_interpret(node.left, env), _interpret(node.right, env))
+        left, right = _compile(node.left, registry), _compile(node.right, registry)
+        return _fold(op, left, right) or (lambda steps: op(left(steps), right(steps)))
 
     if isinstance(node, ast.Compare):
-        # Python chains comparisons (a < b < c). We honour that.
-        left = _interpret(node.left, env)
-        for op_node, comparator in zip(node.ops, node.comparators):
-            op = _CMPOP_TABLE.get(type(op_node))
-            if op is None:
-                raise FormulaError(f"Unsupported comparison: {type(op_node).__name__}")
-            right = _interpret(comparator, env)
-            result = op(left, right)
-            # For chained comparisons we'd need short-circuit on the
-            # Python truthiness of `result`; with pandas Series this is
-            # ambiguous. Restrict to single comparisons for now.
-            if len(node.ops) > 1:
+        # With pandas Series the truthiness needed to short-circuit a
+        # chain (a < b < c) is ambiguous. Restrict to single comparisons.
+        if len(node.ops) > 1:
+            def chained(steps: Dict[str, Any]) -> Any:
                 raise FormulaError(
                     "Chained comparisons (e.g. 1 < x < 10) are not supported; "
                     "use two comparisons combined externally."
                 )
-            return result
+            return chained
+        op = _CMPOP_TABLE.get(type(node.ops[0]))
+        if op is None:
+            raise FormulaError(f"Unsupported comparison: {type(node.ops[0]).__name__}")
+        left, right = _compile(node.left, registry), _compile(node.comparators[0], registry)
+        return _fold(op, left, right) or (lambda steps: op(left(steps), right(steps)))
 
     if isinstance(node, ast.Call):
         op_id = node.func.id  # type: ignore[union-attr]
         entry = registry[op_id]
-        from .decorators import _auto_broadcast
+        from .decorators import _auto_broadcast, broadcast_callables
         raw_func = entry["func"]
         op_type = entry.get("type", "map")
-        callable_fn = _auto_broadcast(raw_func, operation_type=op_type)
+        # The shared wrapper cache covers the global registry; a custom
+        # registry (or a replaced entry) gets a fresh wrapper.
+        callable_fn = broadcast_callables().get(op_id)
+        if callable_fn is None or callable_fn._raw_func is not raw_func:
+            callable_fn = _auto_broadcast(raw_func, operation_type=op_type, op_id=op_id)
+
+        args = [_compile(a, registry) for a in node.args]
+        kwargs = [(kw.arg, _compile(kw.value, registry)) for kw in node.keywords]
 
-        args = [_interpret(a, env) for a in node.args]
-        kwargs = {kw.arg: _interpret(kw.value, env) for kw in node.keywords}
-        return callable_fn(*args, **kwargs)
+        def call(steps: Dict[str, Any]) -> Any:
+            return callable_fn(*[a(steps) for a in args],
+                               **{name: v(steps) for name, v in kwargs})
+        return call
 
     raise FormulaError(f"Unsupported AST node: {type(node).__name__}")
 
 
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _compiled(formula: str, version: Tuple[int, int]) -> Program:
+    """``_compile`` of a formula already validated against the global registry, memoized."""
+    from .decorators import OPERATION_REGISTRY
+    return _compile(_parse_cached(formula), OPERATION_REGISTRY)
+
+
 # --------------------------------------------------------------------------- #
 # Public API                                                                  #
 # --------------------------------------------------------------------------- #
@@ -565,25 +710,32 @@ def run_formula(
     registry: Optional[Dict[str, Any]] = None,
 ) -> Any:
     """
-    Parse, validate, and interpret a formula. Returns whatever the
+    Parse, validate, and evaluate a formula. Returns whatever the
     top-level expression evaluates to (typically a DataFrame, StepProxy,
     or scalar).
 
-    Raises ``FormulaError`` if validation fails.
+    Against the global registry the compiled program is cached, so
+    re-running a formula on refreshed step data only pays for the calls
+    themselves. Raises ``FormulaError`` if validation fails.
     """
-    if registry is None:
-        from .decorators import OPERATION_REGISTRY
-        registry = OPERATION_REGISTRY
+    from .decorators import OPERATION_REGISTRY, registry_version
 
     step_env = _coerce_step_env(steps or {})
-    tree = parse(formula)
-
-    diags = validate(tree, available_steps=set(step_env.keys()), registry=registry)
+    if registry is None or registry is OPERATION_REGISTRY:
+        version = registry_version()
+        tree, diags = _checked(formula, frozenset(step_env.keys()), version)
+        if tree is None:
+            parse(formula)  # re-raise the syntax error as FormulaError
+        program = None if diags else _compiled(formula, version)
+    else:
+        tree = _parse_cached(formula)
+        diags = validate(tree, available_steps=set(step_env.keys()), registry=registry)
+        program = None if diags else _compile(tree, registry)
     if diags:
         msg = "Invalid formula:\n  - " + "\n  - ".join(d.message for d in diags)
         raise FormulaError(msg)
 
-    return _interpret(tree, {"steps": step_env, "registry": registry})
+    return program(step_env)
 
 
 def describe(formula: str) -> Dict[str, Any]:
@@ -594,7 +746,7 @@ def describe(formula: str) -> Dict[str, Any]:
     The returned dict is JSON-serialisable.
     """
     try:
-        tree = parse(formula)
+        tree = _parse_cached(formula)
     except FormulaError as e:
         return {
             "valid": False,
@@ -693,7 +845,7 @@ def parse_call(formula: str) -> Dict[str, Any]:
     """
     raw = formula or ""
     try:
-        tree = parse(raw)
+        tree = _parse_cached(raw)
     except FormulaError:
         return {"op": None, "args": {}, "is_call": False, "is_valid": False, "raw": raw}
 
@@ -0,0 +1,94 @@
+"""
+Session lifecycle — list, delete and expire sessions.
+
+A session's results live in three places: the in-process hot tier
+(``engine.DATA_STORE``), the durable backend under
+``SIMPLE_STEPS_RESULT_CACHE_DIR/<token>/`` and the bookkeeping kept by the
+step cache and the pipeline runner. ``delete_session`` clears all of them.
+
+When ``settings.session_ttl_seconds`` is set, a background reaper started
+by ``start_reaper`` deletes sessions idle for longer than the TTL. Sessions
+with a pipeline run in progress are never reaped.
+"""
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from . import engine, pipeline_runner, step_cache
+
+_REAPER: Optional[threading.Thread] = None
+_REAPER_STOP = threading.Event()
+
+
+def _settings():
+    from .settings import get_settings
+    return get_settings()
+
+
+def list_sessions() -> List[Dict[str, Any]]:
+    """Every known session with its ref counts and byte sizes, newest first."""
+    sessions = [
+        {"session_id": token, **usage}
+        for token, usage in engine.session_usage().items()
+    ]
+    sessions.sort(key=lambda s: s["last_seen"] or 0, reverse=True)
+    return sessions
+
+
+def delete_session(session_id: str) -> Optional[Dict[str, int]]:
+    """
+    Drop every result of *session_id*. Returns what was removed, or None
+    if the session is unknown.
+    """
+    token = engine._session_token(session_id)
+    if token not in engine.session_usage():
+        return None
+    removed = engine.drop_session(token)
+    step_cache.forget_session(token)
+    pipeline_runner.forget_session(token)
+    print(f"  🗑 Session '{token}' deleted "
+          f"({removed['ram_refs']} in RAM, {removed['disk_refs']} on disk)")
+    return removed
+
+
+def reap_idle_sessions(ttl_seconds: Optional[float] = None, now: Optional[float] = None) -> List[str]:
+    """Delete sessions idle for longer than *ttl_seconds*; returns their ids."""
+    ttl = ttl_seconds if ttl_seconds is not None else _settings().session_ttl_seconds
+    if not ttl or ttl <= 0:
+        return []
+    now = now if now is not None else time.time()
+    busy = pipeline_runner.active_session_tokens()
+    reaped = []
+    for token, usage in engine.session_usage().items():
+        last_seen = usage["last_seen"]
+        if token in busy or last_seen is None or now - last_seen <= ttl:
+            continue
+        if delete_session(token) is not None:
+            reaped.append(token)
+    return reaped
+
+
+def _reaper_loop() -> None:
+    while not _REAPER_STOP.wait(max(1, int(_settings().session_reaper_interval_seconds))):
+        try:
+            reap_idle_sessions()
+        except Exception as e:
+            print(f"  ⚠ Session reaper failed: {e}")
+
+
+def start_reaper() -> None:
+    """Start the background TTL reaper (idempotent)."""
+    global _REAPER
+    if _REAPER is not None and _REAPER.is_alive():
+        return
+    _REAPER_STOP.clear()
+    _REAPER = threading.Thread(target=_reaper_loop, name="simple-steps-session-reaper", daemon=True)
+    _REAPER.start()
+
+
+def stop_reaper() -> None:
+    global _REAPER
+    _REAPER_STOP.set()
+    if _REAPER is not None:
+        _REAPER.join(timeout=5)
+    _REAPER = None
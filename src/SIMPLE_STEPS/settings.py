@@ -9,7 +9,7 @@ toggled via the API at runtime.
 """
 
 from pydantic import BaseModel
-from typing import Dict, Any, Literal
+from typing import Dict, Any, Literal, Optional
 
 
 class SimpleStepsSettings(BaseModel):
@@ -29,7 +29,52 @@ class SimpleStepsSettings(BaseModel):
     # Controls where step outputs are persisted by default:
     # - memory: in-process RAM only
     # - parquet: RAM + parquet files under SIMPLE_STEPS_RESULT_CACHE_DIR
-    result_store: Literal['memory', 'parquet'] = 'memory'
+    # - arrow:   RAM + Arrow IPC files under SIMPLE_STEPS_RESULT_CACHE_DIR,
+    #            memory-mapped on read so any worker process can resolve refs;
+    #            reloaded frames use pd.ArrowDtype columns backed by the
+    #            shared page cache
+    # - sqlite:  RAM + a single results.sqlite file under the same directory
+    result_store: Literal['memory', 'parquet', 'arrow', 'sqlite'] = 'memory'
+    # Upper bound on the RAM held by step outputs, measured with
+    # DataFrame.memory_usage(deep=True). When exceeded, least-recently-used
+    # results are spilled to parquet and reloaded on demand. Refs read by
+    # a running operation are never evicted. None = unbounded (falls back
+    # to SIMPLE_STEPS_RESULT_STORE_MAX_BYTES if set).
+    result_store_max_bytes: Optional[int] = None
+    # Persist durable copies (parquet / sqlite) on a background thread
+    # instead of inside the /api/run request. Arrow copies are always
+    # written before the ref is returned so other workers can read it.
+    # At most result_store_write_queue writes may be outstanding; beyond
+    # that new results wait for the writer (backpressure).
+    result_store_write_behind: bool = True
+    result_store_write_queue: int = 64
+    # Memoize whole-step results keyed on (op id, op source, resolved
+    # config, input data fingerprint). Ops registered with
+    # deterministic=False are never cached. The on-disk copy lives under
+    # SIMPLE_STEPS_STEP_CACHE_DIR and is capped at step_cache_max_bytes.
+    step_cache: bool = False
+    step_cache_max_bytes: int = 512 * 1024 * 1024
+    # Per-row memo for ops registered with cache="disk": one SQLite file
+    # under SIMPLE_STEPS_ROW_CACHE_PATH. Rows stored longer ago than
+    # row_cache_ttl_seconds are recomputed (None = never expire); past
+    # row_cache_max_bytes the least recently read rows are evicted.
+    row_cache_ttl_seconds: Optional[int] = None
+    row_cache_max_bytes: int = 256 * 1024 * 1024
+    # Sessions idle (no result saved or read) for longer than this many
+    # seconds are deleted — RAM, pins and on-disk results. None = never.
+    # The reaper wakes every session_reaper_interval_seconds.
+    session_ttl_seconds: Optional[int] = None
+    session_reaper_interval_seconds: int = 300
+    # Worker processes for ops mapped with executor="process". None = one
+    # per CPU core. The pool starts on first use and is restarted when new
+    # pack files are loaded.
+    process_workers: Optional[int] = None
+    # Run map / filter / expand steps (and ss_map / ss_filter / ss_expand)
+    # this many input rows at a time. Finished chunks are readable through
+    # /api/data under the step's output ref while the rest still runs.
+    # None = run the whole input at once. Override per step with the
+    # _chunk_rows config key.
+    stream_chunk_rows: Optional[int] = None
 
     class Config:
         # Allow mutation so we can toggle at runtime
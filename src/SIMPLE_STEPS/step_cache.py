@@ -0,0 +1,318 @@
+"""
+Content-addressed memoization of whole-step results.
+
+When ``settings.step_cache`` is on, ``engine.run_operation`` hashes
+
+  - the operation id and the orchestrator it runs under,
+  - the operation's source code (editing an op invalidates its entries),
+  - the resolved config, including the input DataFrame / bound Series,
+  - the step options that change the output (``STEP_OPTIONS``),
+
+and on a hit returns the previous output instead of re-running the op.
+
+Two layers back the cache:
+
+  - an in-process index ``(session_token, key) → ref_id`` so a hit inside
+    the same session returns the *existing* output ref, and
+  - a size-bounded directory of ``<key>.parquet`` files shared across
+    sessions and restarts, evicted oldest-first past
+    ``settings.step_cache_max_bytes``. Files are written by the engine's
+    write-behind queue, so a miss doesn't wait on the parquet encode.
+
+Ops registered with ``deterministic=False`` are never cached.
+"""
+import hashlib
+import inspect
+import os
+import pickle
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import pandas as pd
+
+from .result_store import ResultStore
+
+STEP_CACHE_DIR = os.environ.get(
+    "SIMPLE_STEPS_STEP_CACHE_DIR",
+    os.path.join(".simple_steps_cache", "_step_cache"),
+)
+
+# ``_``-prefixed config keys that change a step's output. They never reach
+# the op, so they aren't part of the resolved config and are keyed here.
+STEP_OPTIONS = ("_flatten", "_on_error", "_executor", "_concurrency")
+
+_INDEX: Dict[Tuple[str, str], str] = {}
+_COUNTERS = {"hits": 0, "misses": 0}
+_SOURCE_HASHES: Dict[Callable, str] = {}
+_LOCK = threading.Lock()
+# Running size of each cache directory, so a write only rescans the
+# directory once the budget is exceeded (or it was never measured).
+_DISK_BYTES: Dict[str, int] = {}
+# Eviction frees space down to this fraction of the budget.
+_LOW_WATER = 0.9
+
+
+def is_enabled() -> bool:
+    try:
+        from .settings import get_settings
+        return bool(get_settings().step_cache)
+    except Exception:
+        return False
+
+
+def _max_bytes() -> int:
+    try:
+        from .settings import get_settings
+        return int(get_settings().step_cache_max_bytes)
+    except Exception:
+        return 512 * 1024 * 1024
+
+
+# ── Keying ──────────────────────────────────────────────────────────────────
+
+def source_hash(func: Callable) -> str:
+    """Hash of the op's source code; falls back to its qualified name."""
+    cached = _SOURCE_HASHES.get(func)
+    if cached is not None:
+        return cached
+    target = inspect.unwrap(func)
+    try:
+        text = inspect.getsource(target)
+    except (OSError, TypeError):
+        text = f"{getattr(target, '__module__', '')}.{getattr(target, '__qualname__', repr(target))}"
+    digest = hashlib.sha1(text.encode("utf-8")).hexdigest()
+    _SOURCE_HASHES[func] = digest
+    return digest
+
+
+def feed_value(h: "hashlib._Hash", value: Any) -> None:
+    """Feed a stable fingerprint of *value* into the hash *h*."""
+    if isinstance(value, pd.DataFrame):
+        h.update(b"D")
+        h.update(repr([str(c) for c in value.columns]).encode())
+        h.update(repr([str(t) for t in value.dtypes]).encode())
+        try:
+            h.update(pd.util.hash_pandas_object(value, index=False).values.tobytes())
+        except TypeError:
+            # Unhashable cells (lists / dicts) — fall back to the pickle bytes.
+            h.update(pickle.dumps(value))
+    elif isinstance(value, pd.Series):
+        h.update(b"S")
+        h.update(repr((value.name, str(value.dtype))).encode())
+        try:
+            h.update(pd.util.hash_pandas_object(value, index=False).values.tobytes())
+        except TypeError:
+            h.update(pickle.dumps(value))
+    elif isinstance(value, dict):
+        h.update(b"{")
+        for k in sorted(value, key=repr):
+            h.update(repr(k).encode())
+            feed_value(h, value[k])
+        h.update(b"}")
+    elif isinstance(value, (list, tuple)):
+        h.update(b"[" if isinstance(value, list) else b"(")
+        for item in value:
+            feed_value(h, item)
+        h.update(b"]")
+    elif value is None or isinstance(value, (str, int, float, bool, bytes)):
+        h.update(repr(value).encode())
+    else:
+        # Arbitrary objects: pickle if possible, otherwise refuse to cache.
+        h.update(pickle.dumps(value))
+
+
+def make_key(
+    op_id: str,
+    func: Callable,
+    orchestrator_type: Optional[str],
+    resolved_config: Dict[str, Any],
+    config: Optional[Dict[str, Any]] = None,
+) -> Optional[str]:
+    """
+    Return the cache key for a step, or None if it can't be fingerprinted.
+
+    *config* is the raw step config; only its ``STEP_OPTIONS`` are keyed.
+    """
+    h = hashlib.sha256()
+    h.update(f"{op_id}|{orchestrator_type}|{source_hash(func)}".encode())
+    options = {k: (config or {}).get(k) for k in STEP_OPTIONS}
+    try:
+        feed_value(h, options)
+        feed_value(h, resolved_config)
+    except Exception:
+        return None
+    return h.hexdigest()
+
+
+# ── Lookup / record ─────────────────────────────────────────────────────────
+
+def _path_for_key(key: str) -> str:
+    return os.path.join(STEP_CACHE_DIR, f"{key}.parquet")
+
+
+def lookup(key: str, session_token: str) -> Tuple[Optional[str], Optional[pd.DataFrame]]:
+    """
+    Look a key up. Returns ``(ref_id, None)`` when the session still holds
+    the previous output, ``(None, df)`` when only the on-disk copy exists,
+    and ``(None, None)`` on a miss.
+    """
+    from .engine import has_dataframe
+
+    with _LOCK:
+        ref_id = _INDEX.get((session_token, key))
+    if ref_id is not None and has_dataframe(ref_id):
+        with _LOCK:
+            _COUNTERS["hits"] += 1
+        return ref_id, None
+
+    # Recorded by this process but not yet on disk.
+    df = _pending(key)
+    if df is not None:
+        with _LOCK:
+            _COUNTERS["hits"] += 1
+        return None, df
+
+    path = _path_for_key(key)
+    if os.path.exists(path):
+        try:
+            df = pd.read_parquet(path)
+            os.utime(path, None)   # refresh LRU position
+            with _LOCK:
+                _COUNTERS["hits"] += 1
+            return None, df
+        except Exception as e:
+            print(f"  ⚠ Failed to read step cache entry '{key[:12]}': {e}")
+
+    with _LOCK:
+        _COUNTERS["misses"] += 1
+    return None, None
+
+
+def record(key: str, session_token: str, ref_id: str, df: pd.DataFrame) -> None:
+    """Remember *ref_id* as the output for *key* and queue it for disk."""
+    from .engine import _get_writer, _write_behind_enabled
+
+    with _LOCK:
+        _INDEX[(session_token, key)] = ref_id
+
+    if os.path.exists(_path_for_key(key)) or _pending(key) is not None:
+        return
+    if _write_behind_enabled():
+        _get_writer().submit(_ENTRIES, "", key, df, on_done=_on_write_done)
+    else:
+        try:
+            _ENTRIES.put("", key, df)
+        except Exception as e:
+            _on_write_done("", key, df, e)
+
+
+class _EntryStore(ResultStore):
+    """Lets the engine's ``WriteBehindQueue`` write ``<key>.parquet`` files."""
+
+    name = "step_cache"
+
+    def put(self, token: str, ref_id: str, df: pd.DataFrame) -> None:
+        path = _path_for_key(ref_id)
+        os.makedirs(STEP_CACHE_DIR, exist_ok=True)
+        tmp = f"{path}.tmp"
+        df.to_parquet(tmp, index=False)
+        os.replace(tmp, path)
+
+
+_ENTRIES = _EntryStore()
+
+
+def _pending(key: str) -> Optional[pd.DataFrame]:
+    from . import engine
+
+    return engine._WRITER.pending(key) if engine._WRITER is not None else None
+
+
+def _on_write_done(token: str, key: str, df: pd.DataFrame, error: Optional[Exception]) -> None:
+    if error is not None:
+        print(f"  ⚠ Step cache entry not persisted ({error}); kept in-process only")
+        return
+    try:
+        size = os.path.getsize(_path_for_key(key))
+    except OSError:
+        return
+    with _LOCK:
+        if STEP_CACHE_DIR not in _DISK_BYTES:
+            total = None
+        else:
+            total = _DISK_BYTES[STEP_CACHE_DIR] = _DISK_BYTES[STEP_CACHE_DIR] + size
+    if total is None or total > _max_bytes():
+        _enforce_disk_budget()
+
+
+def _enforce_disk_budget() -> None:
+    """Measure the directory and delete least-recently-used files past the budget."""
+    budget = _max_bytes()
+    try:
+        entries = [
+            os.path.join(STEP_CACHE_DIR, name)
+            for name in os.listdir(STEP_CACHE_DIR)
+            if name.endswith(".parquet")
+        ]
+        sized = [(os.path.getmtime(p), os.path.getsize(p), p) for p in entries]
+    except OSError:
+        return
+    total = sum(size for _, size, _ in sized)
+    if total > budget:
+        for _, size, path in sorted(sized):
+            if total <= budget * _LOW_WATER:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+    with _LOCK:
+        _DISK_BYTES[STEP_CACHE_DIR] = total
+
+
+def stats() -> Dict[str, Any]:
+    """Hit / miss counters plus the current on-disk footprint."""
+    disk_bytes = 0
+    disk_entries = 0
+    if os.path.isdir(STEP_CACHE_DIR):
+        for name in os.listdir(STEP_CACHE_DIR):
+            if name.endswith(".parquet"):
+                disk_entries += 1
+                disk_bytes += os.path.getsize(os.path.join(STEP_CACHE_DIR, name))
+    with _LOCK:
+        return {
+            "enabled": is_enabled(),
+            "hits": _COUNTERS["hits"],
+            "misses": _COUNTERS["misses"],
+            "indexed_refs": len(_INDEX),
+            "disk_entries": disk_entries,
+            "disk_bytes": disk_bytes,
+            "max_bytes": _max_bytes(),
+        }
+
+
+def forget_session(session_token: str) -> None:
+    """Drop in-process index entries pointing at a session's refs."""
+    with _LOCK:
+        for key in [k for k in _INDEX if k[0] == session_token]:
+            del _INDEX[key]
+
+
+def clear() -> None:
+    """Drop the in-process index, reset counters and delete cached files."""
+    from .engine import flush_result_writes
+
+    flush_result_writes()
+    with _LOCK:
+        _DISK_BYTES.clear()
+        _INDEX.clear()
+        _SOURCE_HASHES.clear()
+        _COUNTERS["hits"] = 0
+        _COUNTERS["misses"] = 0
+    if os.path.isdir(STEP_CACHE_DIR):
+        for name in os.listdir(STEP_CACHE_DIR):
+            try:
+                os.remove(os.path.join(STEP_CACHE_DIR, name))
+            except OSError:
+                pass
@@ -33,7 +33,8 @@ from __future__ import annotations
 
 import pandas as pd
 import numpy as np
-from typing import Any, Optional, Dict, List, TYPE_CHECKING
+from collections.abc import Mapping
+from typing import Any, Callable, Optional, Dict, List, TYPE_CHECKING
 
 if TYPE_CHECKING:
     pass
@@ -331,6 +332,69 @@ class StepProxy:
         )
 
 
+class LazyStepEnv(Mapping):
+    """
+    Read-only ``name → StepProxy`` mapping that loads step data on demand.
+
+    Built from a step_map (name → ref_id) and a ``load(ref_id)`` callable.
+    Nothing is loaded until a name is actually looked up, so evaluating
+    ``step3.url`` touches step3 only. Loaded frames are cached per ref_id,
+    so ``step1`` and its label alias share a single load.
+
+    Membership (``in`` / ``keys()``) never loads; a name whose data turns
+    out to be unavailable raises ``KeyError`` on lookup.
+    """
+
+    def __init__(
+        self,
+        step_map: Dict[str, str],
+        load: Callable[[str], Optional[pd.DataFrame]],
+    ):
+        self._refs: Dict[str, str] = {k: v for k, v in step_map.items() if v}
+        self._labels: Dict[str, str] = {k: k for k in self._refs}
+        self._load = load
+        self._frames: Dict[str, Optional[pd.DataFrame]] = {}
+        self._proxies: Dict[str, StepProxy] = {}
+
+    def add_alias(self, alias: str, name: str) -> None:
+        """Expose step *name* under *alias* too (same proxy, same load)."""
+        if alias not in self._refs and name in self._refs:
+            self._refs[alias] = self._refs[name]
+            self._labels[alias] = self._labels[name]
+
+    def _frame(self, ref_id: str) -> Optional[pd.DataFrame]:
+        if ref_id not in self._frames:
+            self._frames[ref_id] = self._load(ref_id)
+        return self._frames[ref_id]
+
+    def __getitem__(self, name: str) -> StepProxy:
+        proxy = self._proxies.get(name)
+        if proxy is not None:
+            return proxy
+        ref_id = self._refs[name]
+        df = self._frame(ref_id)
+        if df is None:
+            raise KeyError(f"Step '{name}' has no data available")
+        label = self._labels[name]
+        proxy = self._proxies.get(label) or StepProxy(df, label=label, ref_id=ref_id)
+        self._proxies[name] = proxy
+        return proxy
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._refs
+
+    def __iter__(self):
+        return iter(self._refs)
+
+    def __len__(self) -> int:
+        return len(self._refs)
+
+    @property
+    def loaded_refs(self) -> List[str]:
+        """ref_ids loaded so far (diagnostics / tests)."""
+        return [r for r, df in self._frames.items() if df is not None]
+
+
 def step(data=None, label: str = "step", **kwargs) -> StepProxy:
     """
     Public constructor for creating a Step variable.
@@ -0,0 +1,181 @@
+"""
+Chunked streaming execution of map / filter / expand steps.
+
+Without streaming a step's output only exists once every row is done, and
+the whole input, the intermediate per-row results and the output are alive
+at the same time. When streaming is on (``settings.stream_chunk_rows`` or
+the step's ``_chunk_rows`` config key) the engine:
+
+  1. allocates the step's output ref before running it,
+  2. registers a ``PartialResult`` under that ref and makes it current,
+  3. lets the map / filter / expand orchestrators run the op one chunk of
+     input rows at a time, appending each finished chunk to it,
+  4. saves the concatenated result under the same ref when the step ends.
+
+While the step runs, ``/api/data/{ref_id}`` serves the pages that are
+already complete and ``/api/data-meta/{ref_id}`` reports ``partial: true``.
+Each appended chunk is also announced on ``/api/progress/{step_id}``
+with the partial ref and its row count, so the UI can show rows as they
+arrive.
+"""
+import functools
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+
+import pandas as pd
+
+from .progress import current_progress, detached_progress
+
+_PARTIALS: Dict[str, "PartialResult"] = {}
+_PARTIALS_LOCK = threading.Lock()
+_local = threading.local()
+
+
+class PartialResult:
+    """The finished chunks of a step that is still running."""
+
+    def __init__(self, ref_id: str, chunk_rows: int):
+        self.ref_id = ref_id
+        self.chunk_rows = chunk_rows
+        self._chunks: List[pd.DataFrame] = []
+        self._offsets: List[int] = []     # first row of each chunk
+        self._rows = 0
+        self._frame: Optional[pd.DataFrame] = None
+        self._lock = threading.Lock()
+
+    @property
+    def rows(self) -> int:
+        return self._rows
+
+    @property
+    def columns(self) -> List[str]:
+        with self._lock:
+            return [str(c) for c in self._chunks[0].columns] if self._chunks else []
+
+    def append(self, chunk: pd.DataFrame) -> None:
+        chunk = chunk.reset_index(drop=True)
+        with self._lock:
+            self._offsets.append(self._rows)
+            self._chunks.append(chunk)
+            self._rows += len(chunk)
+            self._frame = None
+
+    def frame(self) -> pd.DataFrame:
+        """Every completed row so far, as one frame."""
+        with self._lock:
+            if self._frame is None:
+                self._frame = (pd.concat(self._chunks, ignore_index=True)
+                               if self._chunks else pd.DataFrame())
+            return self._frame
+
+    def page(self, offset: int, limit: int) -> pd.DataFrame:
+        """Rows ``offset:offset+limit`` of the completed chunks, without concatenating them all."""
+        with self._lock:
+            chunks, offsets = list(self._chunks), list(self._offsets)
+        parts = []
+        end = offset + limit
+        for start, chunk in zip(offsets, chunks):
+            stop = start + len(chunk)
+            if stop <= offset or start >= end:
+                continue
+            parts.append(chunk.iloc[max(offset - start, 0):min(end, stop) - start])
+        if not parts:
+            return chunks[0].iloc[0:0] if chunks else pd.DataFrame()
+        return pd.concat(parts, ignore_index=True) if len(parts) > 1 else parts[0]
+
+
+def get_partial(ref_id: str) -> Optional[PartialResult]:
+    with _PARTIALS_LOCK:
+        return _PARTIALS.get(ref_id)
+
+
+def current_stream() -> Optional[PartialResult]:
+    """The partial result the orchestrators on this thread should stream into."""
+    return getattr(_local, "stream", None)
+
+
+@contextmanager
+def stream_results(ref_id: Optional[str], chunk_rows: Optional[int]) -> Iterator[Optional[PartialResult]]:
+    """Serve *ref_id* from its completed chunks while the step runs."""
+    if not ref_id or not chunk_rows or chunk_rows < 1:
+        yield None
+        return
+    partial = PartialResult(ref_id, int(chunk_rows))
+    with _PARTIALS_LOCK:
+        _PARTIALS[ref_id] = partial
+    previous = current_stream()
+    _local.stream = partial
+    try:
+        yield partial
+    except BaseException:
+        discard_partial(ref_id)
+        raise
+    finally:
+        _local.stream = previous
+    # On success the partial keeps serving reads until the engine has
+    # saved the final frame under ref_id and calls discard_partial.
+
+
+def discard_partial(ref_id: str) -> None:
+    with _PARTIALS_LOCK:
+        _PARTIALS.pop(ref_id, None)
+
+
+def run_chunked(run: Callable[[pd.DataFrame], pd.DataFrame], input_df: pd.DataFrame,
+                partial: PartialResult) -> pd.DataFrame:
+    """
+    Call ``run(chunk)`` for consecutive ``partial.chunk_rows``-row slices of
+    *input_df*, publish each result, and return them concatenated.
+    """
+    total = len(input_df)
+    prog = current_progress()
+    _local.stream = None   # nested orchestrators run each chunk whole
+    try:
+        for start in range(0, total, partial.chunk_rows):
+            chunk = input_df.iloc[start:start + partial.chunk_rows]
+            # Row-level progress inside a chunk would restart at 0 every
+            # chunk; report whole chunks instead.
+            with detached_progress():
+                out = run(chunk)
+            _publish(partial, out, min(start + partial.chunk_rows, total), total, prog)
+    finally:
+        _local.stream = partial
+    return partial.frame()
+
+
+def _publish(partial: PartialResult, out: pd.DataFrame, done: int, total: int, prog) -> None:
+    partial.append(out)
+    if prog is not None:
+        prog.update(done, total, f"{done}/{total} rows",
+                    partial_ref_id=partial.ref_id, rows_ready=partial.rows)
+
+
+def streamable(wrapper: Callable[..., pd.DataFrame]) -> Callable[..., pd.DataFrame]:
+    """
+    Let a row-wise orchestrator stream: when a stream is current and the
+    first DataFrame argument is longer than one chunk, call *wrapper* once
+    per chunk of it (same other arguments) via ``run_chunked``.
+    """
+    @functools.wraps(wrapper)
+    def run(*args, **kwargs):
+        partial = current_stream()
+        if partial is None:
+            return wrapper(*args, **kwargs)
+        key = next((k for k, v in kwargs.items() if isinstance(v, pd.DataFrame)), None)
+        pos = None
+        if key is None:
+            pos = next((i for i, v in enumerate(args) if isinstance(v, pd.DataFrame)), None)
+            if pos is None:
+                return wrapper(*args, **kwargs)
+        input_df = kwargs[key] if key is not None else args[pos]
+        if len(input_df) <= partial.chunk_rows:
+            return wrapper(*args, **kwargs)
+
+        def run_chunk(chunk: pd.DataFrame) -> pd.DataFrame:
+            if key is not None:
+                return wrapper(*args, **{**kwargs, key: chunk})
+            return wrapper(*args[:pos], chunk, *args[pos + 1:], **kwargs)
+
+        return run_chunked(run_chunk, input_df, partial)
+    return run
@@ -77,3 +77,312 @@ def test_reference_resolution_failure():
             step_label_map=step_map
         )
     assert "Error executing step" in str(excinfo.value)
+
+
+def test_reference_tokens_are_parsed_once():
+    from SIMPLE_STEPS.references import parse_reference, CELL, COLUMN, EXCEL, STEP
+
+    assert parse_reference("step1.price").kind == COLUMN
+    assert parse_reference("=Step 1!price").step_key == "Step 1"
+    cell = parse_reference("step1[row=2, col=price]")
+    assert (cell.kind, cell.row, cell.column) == (CELL, 2, "price")
+    assert parse_reference("step1").kind == STEP
+    assert parse_reference("=Step 1!price").kind == EXCEL
+    # Same token → same cached object.
+    assert parse_reference("step1.price") is parse_reference("step1.price")
+
+    ref_id = save_dataframe(pd.DataFrame({"price": [1.5, 2.5, 3.5]}))
+    step_map = {"step1": ref_id}
+    assert resolve_reference("step1[row=2, col=price]", step_map) == 3.5
+    assert resolve_reference("step1.price", step_map).tolist() == [1.5, 2.5, 3.5]
+    assert resolve_reference("step1.missing", step_map) == "step1.missing"
+
+
+def test_lru_eviction_spills_and_reloads(tmp_path, monkeypatch):
+    from SIMPLE_STEPS import engine
+    from SIMPLE_STEPS.settings import get_settings
+
+    monkeypatch.setattr(engine, "RESULT_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(get_settings(), "result_store_max_bytes", 1)
+
+    df_old = pd.DataFrame({"v": list(range(100))})
+    df_new = pd.DataFrame({"v": list(range(100, 200))})
+    ref_old = save_dataframe(df_old, session_id="lru-test")
+    ref_new = save_dataframe(df_new, session_id="lru-test")
+
+    # The older ref was spilled to disk and dropped from RAM...
+    assert ref_old not in DATA_STORE.get("lru-test", {})
+    assert ref_new in DATA_STORE["lru-test"]
+    # ...but is transparently reloaded on read.
+    reloaded = get_dataframe(ref_old)
+    assert reloaded["v"].tolist() == df_old["v"].tolist()
+
+
+def test_pinned_refs_are_not_evicted(tmp_path, monkeypatch):
+    from SIMPLE_STEPS import engine
+    from SIMPLE_STEPS.settings import get_settings
+
+    monkeypatch.setattr(engine, "RESULT_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(get_settings(), "result_store_max_bytes", 1)
+
+    ref_a = save_dataframe(pd.DataFrame({"v": [1, 2, 3]}), session_id="pin-test")
+    engine.pin_refs([ref_a], session_id="pin-test")
+    save_dataframe(pd.DataFrame({"v": [4, 5, 6]}), session_id="pin-test")
+    save_dataframe(pd.DataFrame({"v": [7, 8, 9]}), session_id="pin-test")
+
+    assert ref_a in DATA_STORE["pin-test"]
+    engine.unpin_refs([ref_a], session_id="pin-test")
+
+
+def test_pins_are_counted_per_operation(tmp_path, monkeypatch):
+    from SIMPLE_STEPS import engine
+
+    monkeypatch.setattr(engine, "RESULT_CACHE_DIR", str(tmp_path))
+    ref_a = save_dataframe(pd.DataFrame({"v": [1]}), session_id="pin-count")
+    ref_b = save_dataframe(pd.DataFrame({"v": [2]}), session_id="pin-count")
+
+    # Two steps of one session in flight at once.
+    engine.pin_refs([ref_a, ref_b], session_id="pin-count")
+    engine.pin_refs([ref_a], session_id="pin-count")
+    engine.unpin_refs([ref_a, ref_b], session_id="pin-count")
+    assert engine._is_pinned("pin-count", ref_a)
+    assert not engine._is_pinned("pin-count", ref_b)
+    engine.unpin_refs([ref_a], session_id="pin-count")
+    assert not engine._is_pinned("pin-count", ref_a)
+
+    # run_operation releases its pins even when the step fails.
+    with pytest.raises(ValueError):
+        run_operation("not_a_registered_op", {}, ref_a, session_id="pin-count")
+    assert "pin-count" not in engine._PINNED
+
+
+def test_arrow_store_reloads_frames_dropped_from_ram(tmp_path, monkeypatch):
+    from SIMPLE_STEPS import engine
+
+    monkeypatch.setattr(engine, "RESULT_CACHE_DIR", str(tmp_path))
+
+    df = pd.DataFrame({"n": [1, 2, 3], "s": ["a", "b", "c"]})
+    ref = save_dataframe(df, session_id="arrow-test", store_mode="arrow")
+    engine.flush_result_writes()
+    assert (tmp_path / "arrow-test" / f"{ref}.arrow").exists()
+
+    # Simulate a worker process that never held the frame in RAM.
+    DATA_STORE["arrow-test"].pop(ref)
+    engine._forget("arrow-test", ref)
+
+    loaded = get_dataframe(ref)
+    assert loaded["n"].tolist() == [1, 2, 3]
+    assert loaded["s"].tolist() == ["a", "b", "c"]
+    # The mapped frame is writable — ops may mutate what they're handed.
+    loaded.loc[0, "n"] = 99
+
+
+def test_arrow_refs_are_on_disk_when_save_returns(tmp_path, monkeypatch):
+    import subprocess
+    import sys
+    import threading
+    from SIMPLE_STEPS import engine
+    from SIMPLE_STEPS.result_store import ArrowResultStore
+
+    monkeypatch.setattr(engine, "RESULT_CACHE_DIR", str(tmp_path))
+    # Hold back the background writer so a write-behind put can't win the race.
+    release = threading.Event()
+    original_put = ArrowResultStore.put
+
+    def held_put(self, token, ref_id, df):
+        if threading.current_thread() is not threading.main_thread():
+            release.wait(timeout=5)
+        original_put(self, token, ref_id, df)
+
+    monkeypatch.setattr(ArrowResultStore, "put", held_put)
+
+    ref = save_dataframe(pd.DataFrame({"v": [4, 5]}), session_id="arrow-sync", store_mode="arrow")
+
+    # Another uvicorn worker: a fresh process with its own ArrowResultStore.
+    script = (
+        "import sys\n"
+        "from SIMPLE_STEPS.result_store import ArrowResultStore\n"
+        "df = ArrowResultStore(sys.argv[1]).get(sys.argv[2], sys.argv[3])\n"
+        "print(df['v'].tolist())\n"
+    )
+    token = ref.split("__", 1)[0]
+    out = subprocess.run(
+        [sys.executable, "-c", script, str(tmp_path), token, ref],
+        capture_output=True, text=True,
+    )
+    release.set()
+    engine.flush_result_writes()
+    assert out.stdout.strip() == "[4, 5]"
+
+
+def test_write_behind_serves_pending_frames(tmp_path, monkeypatch):
+    import threading
+    from SIMPLE_STEPS import engine
+    from SIMPLE_STEPS.result_store import ParquetResultStore
+
+    monkeypatch.setattr(engine, "RESULT_CACHE_DIR", str(tmp_path))
+    release = threading.Event()
+    original_put = ParquetResultStore.put
+
+    def slow_put(self, token, ref_id, df):
+        release.wait(timeout=5)
+        original_put(self, token, ref_id, df)
+
+    monkeypatch.setattr(ParquetResultStore, "put", slow_put)
+
+    ref = save_dataframe(pd.DataFrame({"v": [1, 2]}), session_id="wb-test", store_mode="parquet")
+    # save_dataframe returned before the file exists...
+    assert not (tmp_path / "wb-test" / f"{ref}.parquet").exists()
+    # ...and the frame is still served even once dropped from RAM.
+    engine.MEMORY_STORE.delete("wb-test", ref)
+    engine._forget("wb-test", ref)
+    assert get_dataframe(ref)["v"].tolist() == [1, 2]
+
+    release.set()
+    engine.flush_result_writes()
+    assert (tmp_path / "wb-test" / f"{ref}.parquet").exists()
+    assert ref in engine._PERSISTED
+
+
+_CACHE_CALLS = {"det": 0, "nondet": 0}
+
+
+@simple_step(id="test_cached_double", name="Cached Double", operation_type="dataframe")
+def op_cached_double(df: pd.DataFrame) -> pd.DataFrame:
+    _CACHE_CALLS["det"] += 1
+    return df.assign(doubled=df["v"] * 2)
+
+
+@simple_step(id="test_uncached_double", name="Uncached Double",
+             operation_type="dataframe", deterministic=False)
+def op_uncached_double(df: pd.DataFrame) -> pd.DataFrame:
+    _CACHE_CALLS["nondet"] += 1
+    return df.assign(doubled=df["v"] * 2)
+
+
+def test_step_cache_hits_on_identical_input(tmp_path, monkeypatch):
+    from SIMPLE_STEPS import step_cache
+    from SIMPLE_STEPS.settings import get_settings
+
+    monkeypatch.setattr(step_cache, "STEP_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(get_settings(), "step_cache", True)
+    step_cache.clear()
+
+    ref_in = save_dataframe(pd.DataFrame({"v": [1, 2, 3]}))
+    ref_a, _ = run_operation("test_cached_double", {}, ref_in)
+    ref_b, metrics = run_operation("test_cached_double", {}, ref_in)
+    assert ref_a == ref_b
+    assert metrics["cached"] is True
+    assert _CACHE_CALLS["det"] == 1
+
+    # Same data under a new ref is still a hit (content-addressed).
+    ref_in_copy = save_dataframe(pd.DataFrame({"v": [1, 2, 3]}))
+    run_operation("test_cached_double", {}, ref_in_copy)
+    assert _CACHE_CALLS["det"] == 1
+
+    # Different data misses.
+    ref_other = save_dataframe(pd.DataFrame({"v": [4, 5, 6]}))
+    run_operation("test_cached_double", {}, ref_other)
+    assert _CACHE_CALLS["det"] == 2
+
+    run_operation("test_uncached_double", {}, ref_in)
+    run_operation("test_uncached_double", {}, ref_in)
+    assert _CACHE_CALLS["nondet"] == 2
+
+    stats = step_cache.stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 2
+    step_cache.clear()
+
+
+def test_step_cache_keys_output_affecting_options(tmp_path, monkeypatch):
+    from SIMPLE_STEPS import engine, step_cache
+    from SIMPLE_STEPS.settings import get_settings
+
+    monkeypatch.setattr(step_cache, "STEP_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(get_settings(), "step_cache", True)
+    step_cache.clear()
+
+    ref_in = save_dataframe(pd.DataFrame({"v": [7, 8]}))
+    before = _CACHE_CALLS["det"]
+    ref_a, _ = run_operation("test_cached_double", {}, ref_in)
+    ref_b, _ = run_operation("test_cached_double", {"_on_error": "continue"}, ref_in)
+    ref_c, _ = run_operation("test_cached_double", {"_flatten": 1}, ref_in)
+    assert len({ref_a, ref_b, ref_c}) == 3
+    assert _CACHE_CALLS["det"] == before + 3
+
+    # A cached ref that vanished before it could be loaded just re-runs.
+    monkeypatch.setattr(step_cache, "lookup", lambda key, token: (ref_a, None))
+    peek = engine._peek_dataframe
+    monkeypatch.setattr(engine, "_peek_dataframe", lambda ref: None if ref == ref_a else peek(ref))
+    ref_d, metrics = run_operation("test_cached_double", {}, ref_in)
+    assert ref_d != ref_a and "cached" not in metrics
+    assert _CACHE_CALLS["det"] == before + 4
+    step_cache.clear()
+
+
+def test_step_cache_writes_entries_behind_the_request(tmp_path, monkeypatch):
+    import threading
+    from SIMPLE_STEPS import engine, step_cache
+    from SIMPLE_STEPS.settings import get_settings
+
+    monkeypatch.setattr(step_cache, "STEP_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(get_settings(), "step_cache", True)
+    step_cache.clear()
+    release = threading.Event()
+    original_put = step_cache._EntryStore.put
+
+    def held_put(self, token, key, df):
+        release.wait(timeout=5)
+        original_put(self, token, key, df)
+
+    monkeypatch.setattr(step_cache._EntryStore, "put", held_put)
+    scans = []
+    enforce = step_cache._enforce_disk_budget
+    monkeypatch.setattr(step_cache, "_enforce_disk_budget", lambda: scans.append(1) or enforce())
+
+    before = _CACHE_CALLS["det"]
+    ref_in = save_dataframe(pd.DataFrame({"v": [11, 12]}), session_id="wb-cache")
+    run_operation("test_cached_double", {}, ref_in, session_id="wb-cache")
+    assert list(tmp_path.glob("*.parquet")) == []
+
+    # Another session hits the entry while it is still queued.
+    other_in = save_dataframe(pd.DataFrame({"v": [11, 12]}), session_id="wb-cache-2")
+    _, metrics = run_operation("test_cached_double", {}, other_in, session_id="wb-cache-2")
+    assert metrics["cached"] is True
+    assert _CACHE_CALLS["det"] == before + 1
+
+    release.set()
+    engine.flush_result_writes()
+    assert len(list(tmp_path.glob("*.parquet"))) == 1
+
+    # Under budget, later writes use the running total instead of a rescan.
+    ref_more = save_dataframe(pd.DataFrame({"v": [13]}), session_id="wb-cache")
+    run_operation("test_cached_double", {}, ref_more, session_id="wb-cache")
+    engine.flush_result_writes()
+    assert len(list(tmp_path.glob("*.parquet"))) == 2
+    assert len(scans) == 1
+    step_cache.clear()
+
+
+def test_step_cache_hit_leaves_spilled_output_on_disk(tmp_path, monkeypatch):
+    from SIMPLE_STEPS import engine, step_cache
+    from SIMPLE_STEPS.settings import get_settings
+
+    monkeypatch.setattr(engine, "RESULT_CACHE_DIR", str(tmp_path / "results"))
+    monkeypatch.setattr(step_cache, "STEP_CACHE_DIR", str(tmp_path / "steps"))
+    monkeypatch.setattr(get_settings(), "step_cache", True)
+    step_cache.clear()
+
+    ref_in = save_dataframe(pd.DataFrame({"v": [9, 10]}), session_id="spill-hit")
+    ref_a, _ = run_operation("test_cached_double", {}, ref_in, session_id="spill-hit")
+    token = engine._session_token("spill-hit")
+    with engine._STORE_LOCK:
+        engine._evict(token, ref_a)
+
+    ref_b, metrics = run_operation("test_cached_double", {}, ref_in, session_id="spill-hit")
+    assert ref_b == ref_a and metrics["cached"] is True
+    assert metrics["rows"] == 2
+    # The hit was answered without pulling the output back into RAM.
+    assert not engine.MEMORY_STORE.exists(token, ref_a)
+    step_cache.clear()
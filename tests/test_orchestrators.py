@@ -66,3 +66,494 @@ def test_expand_wrapper():
     assert len(res) == 3
     assert "expand_group_output" in res.columns
     assert res["expand_group_output"].tolist() == [1, 2, 3]
+
+
+def test_rowmap_vectorized_declared_and_probed():
+    from SIMPLE_STEPS.decorators import register_operation
+
+    calls = {"declared": 0, "auto": 0, "scalar_only": 0}
+    df = pd.DataFrame({"val": [1, 2, 3]})
+
+    def triple(val):
+        calls["declared"] += 1
+        return val * 3
+    register_operation(triple, "test_vec_triple", "Triple", operation_type="map", vectorized=True)
+    res = rowmap_wrapper(triple)(val=df)
+    assert res["triple_output"].tolist() == [3, 6, 9]
+    assert calls["declared"] == 1          # one whole-column call
+
+    def plus_one(val):
+        calls["auto"] += 1
+        return val + 1
+    register_operation(plus_one, "test_vec_plus_one", "Plus One", operation_type="map", vectorized="auto")
+    assert rowmap_wrapper(plus_one)(val=df)["plus_one_output"].tolist() == [2, 3, 4]
+    assert calls["auto"] == 1
+
+    def label(val):
+        calls["scalar_only"] += 1
+        return f"#{val}"                   # a Series in → one string out
+    register_operation(label, "test_vec_label", "Label", operation_type="map", vectorized="auto")
+    assert rowmap_wrapper(label)(val=df)["label_output"].tolist() == ["#1", "#2", "#3"]
+    # Probe (1 call) failed → per-row (3 calls); the verdict is remembered.
+    assert calls["scalar_only"] == 4
+    rowmap_wrapper(label)(val=df)
+    assert calls["scalar_only"] == 7
+
+
+def test_rowmap_concurrency_keeps_order_and_captures_errors():
+    import threading
+    import time
+    from SIMPLE_STEPS.decorators import register_operation
+
+    active = {"now": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def slow_lookup(val):
+        with lock:
+            active["now"] += 1
+            active["peak"] = max(active["peak"], active["now"])
+        time.sleep(0.02)
+        with lock:
+            active["now"] -= 1
+        if val == 3:
+            raise RuntimeError("boom")
+        return val * 10
+
+    register_operation(slow_lookup, "test_slow_lookup", "Slow Lookup",
+                       operation_type="map", concurrency=4)
+    res = rowmap_wrapper(slow_lookup)(val=pd.DataFrame({"val": list(range(12))}))
+
+    assert res["slow_lookup_output"].tolist()[:3] == [0, 10, 20]
+    assert res["slow_lookup_output"].tolist()[4:] == [v * 10 for v in range(4, 12)]
+    assert res["_error"].tolist()[3] == "RuntimeError: boom"
+    assert res["_error"].isna().sum() == 11
+    assert 1 < active["peak"] <= 4
+
+
+def test_concurrency_override_and_progress(monkeypatch):
+    from SIMPLE_STEPS.engine import run_operation, save_dataframe, get_dataframe
+    from SIMPLE_STEPS.decorators import register_operation
+    from SIMPLE_STEPS import progress
+
+    started = []
+    original_start = progress.start_progress
+
+    def spy_start(step_id):
+        prog = original_start(step_id)
+        started.append(prog)
+        return prog
+
+    monkeypatch.setattr(progress, "start_progress", spy_start)
+
+    def shout(text):
+        return text.upper()
+
+    register_operation(shout, "test_shout", "Shout", operation_type="map")
+    ref_in = save_dataframe(pd.DataFrame({"text": ["a", "b", "c"]}))
+    ref_out, _ = run_operation("test_shout", {"text": "text", "_concurrency": 2}, ref_in, step_id="shout-step")
+
+    assert get_dataframe(ref_out)["shout_output"].tolist() == ["A", "B", "C"]
+    assert progress.get_progress("shout-step") is None   # ended with the step
+    events = []
+    while not started[0].queue.empty():
+        events.append(started[0].queue.get())
+    assert events[-1] is None
+    assert events[-2]["current"] == events[-2]["total"] == 3
+
+
+def test_async_ops_are_gathered_with_bounded_concurrency():
+    import asyncio
+    from SIMPLE_STEPS.decorators import register_operation
+
+    active = {"now": 0, "peak": 0}
+
+    async def fetch(val):
+        active["now"] += 1
+        active["peak"] = max(active["peak"], active["now"])
+        await asyncio.sleep(0.01)
+        active["now"] -= 1
+        if val == 5:
+            raise RuntimeError("timeout")
+        return val + 100
+
+    register_operation(fetch, "test_async_fetch", "Async Fetch",
+                       operation_type="map", concurrency=3)
+    df = pd.DataFrame({"val": list(range(9))})
+
+    res = rowmap_wrapper(fetch)(val=df)
+    assert res["fetch_output"].tolist()[:5] == [100, 101, 102, 103, 104]
+    assert res["_error"].tolist()[5] == "RuntimeError: timeout"
+    assert active["peak"] == 3
+
+    async def is_even(val):
+        await asyncio.sleep(0)
+        return val % 2 == 0
+
+    assert filter_wrapper(is_even)(val=df)["val"].tolist() == [0, 2, 4, 6, 8]
+
+    async def twice(val):
+        return [val, val]
+
+    assert len(expand_wrapper(twice)(val=df)) == 18
+    # Plain scalar calls still hand back the coroutine.
+    assert asyncio.run(fetch(1)) == 101
+
+
+def count_vowels(text):
+    """CPU-bound stand-in, module-level so worker processes can import it."""
+    if text == "bad":
+        raise ValueError("no vowels allowed")
+    return sum(ch in "aeiou" for ch in text)
+
+
+def is_positive(v):
+    return v > 0
+
+
+def test_process_executor_chunks_rows_in_order(monkeypatch):
+    from SIMPLE_STEPS.decorators import register_operation
+    from SIMPLE_STEPS.process_executor import shutdown_process_pool
+    from SIMPLE_STEPS.row_executor import step_options
+    from SIMPLE_STEPS.settings import get_settings
+
+    monkeypatch.setattr(get_settings(), "process_workers", 2)
+    register_operation(count_vowels, "test_count_vowels", "Count Vowels",
+                       operation_type="map", executor="process")
+    words = ["banana", "sky", "bad", "queue"] * 5
+    try:
+        res = rowmap_wrapper(count_vowels)(text=pd.DataFrame({"text": words}))
+        expected = [3, 0, None, 4] * 5
+        assert res["count_vowels_output"].tolist() == expected
+        assert res["_error"].tolist()[2] == "ValueError: no vowels allowed"
+
+        # A step can force the process pool for an op that didn't declare it.
+        with step_options(executor="process"):
+            kept = filter_wrapper(is_positive)(pd.DataFrame({"v": [0, 1, 2]}))
+        assert kept["v"].tolist() == [1, 2]
+    finally:
+        shutdown_process_pool()
+
+
+def test_ss_ops_bind_columns_and_scalars():
+    from SIMPLE_STEPS.decorators import register_operation
+    from SIMPLE_STEPS.orchestration_ops import ss_expand, ss_filter, ss_map
+
+    def label(name: str, views: int = 0, suffix: str = "") -> dict:
+        return {"label": f"{name}:{views}{suffix}"}
+
+    def popular(views: int = 0, min_views: int = 0) -> bool:
+        return views >= min_views
+
+    def parts(name: str):
+        return [{"part": ch, "views": 0} for ch in name] if name != "c" else ["whole"]
+
+    register_operation(label, "test_ss_label", "Label", operation_type="map")
+    register_operation(popular, "test_ss_popular", "Popular", operation_type="filter")
+    register_operation(parts, "test_ss_parts", "Parts", operation_type="expand")
+    df = pd.DataFrame({"name": ["ab", "c", "de"], "views": [5, 50, 500]}, index=[10, 11, 12])
+
+    mapped = ss_map(df=df, fn="test_ss_label", name="name", views="views", suffix="!").df
+    assert mapped["label"].tolist() == ["ab:5!", "c:50!", "de:500!"]
+
+    kept = ss_filter(df=df, fn="test_ss_popular", views="views", min_views=50).df
+    assert kept["name"].tolist() == ["c", "de"]
+    assert kept.index.tolist() == [0, 1]
+
+    expanded = ss_expand(df=df, fn="test_ss_parts", name="name").df
+    assert expanded["name"].tolist() == ["ab", "ab", "c", "de", "de"]
+    assert expanded["part"].tolist()[:2] == ["a", "b"]
+    # Dict items override input columns only where they set the key.
+    assert expanded["views"].tolist() == [0, 0, 50, 0, 0]
+    assert expanded["test_ss_parts_output"].tolist()[2] == "whole"
+
+
+def test_streaming_step_publishes_chunks_under_output_ref(monkeypatch):
+    from SIMPLE_STEPS import progress, streaming
+    from SIMPLE_STEPS.decorators import register_operation
+    from SIMPLE_STEPS.engine import get_dataframe, run_operation, save_dataframe
+
+    started = []
+    original_start = progress.start_progress
+    monkeypatch.setattr(progress, "start_progress",
+                        lambda step_id: started.append(original_start(step_id)) or started[-1])
+    seen = {}
+
+    def square(v):
+        if v == 25:
+            # Mid-run: the first two 10-row chunks are already readable.
+            (partial,) = streaming._PARTIALS.values()
+            seen["ref"] = partial.ref_id
+            seen["rows"] = len(get_dataframe(partial.ref_id))
+            seen["page"] = partial.page(8, 4)["v"].tolist()
+        return v * v
+
+    register_operation(square, "test_stream_square", "Square", operation_type="map")
+    ref_in = save_dataframe(pd.DataFrame({"v": list(range(35))}))
+    ref_out, metrics = run_operation("test_stream_square", {"v": "v", "_chunk_rows": 10},
+                                     ref_in, step_id="stream-step")
+
+    assert ref_out == seen["ref"]
+    assert seen["rows"] == 20
+    assert seen["page"] == [8, 9, 10, 11]
+    assert get_dataframe(ref_out)["square_output"].tolist() == [v * v for v in range(35)]
+    assert metrics["rows"] == 35
+    assert streaming.get_partial(ref_out) is None
+
+    events = []
+    while not started[0].queue.empty():
+        events.append(started[0].queue.get())
+    ready = [e["rows_ready"] for e in events if e and "rows_ready" in e]
+    assert ready == [10, 20, 30, 35]
+
+
+def test_rowmap_dict_results_heterogeneous_and_flattened():
+    from SIMPLE_STEPS.row_executor import step_options
+
+    def meta(url):
+        row = {"title": url.upper()}
+        if url != "b":
+            row["stats"] = {"likes": len(url), "ratio": {"up": 1}}
+        return row
+
+    df = pd.DataFrame({"url": ["a", "b", "cc"]})
+    res = rowmap_wrapper(meta)(url=df)
+    assert res.columns.tolist() == ["url", "title", "stats"]
+    assert res["stats"].iloc[0] == {"likes": 1, "ratio": {"up": 1}}
+    assert pd.isna(res["stats"].iloc[1])
+
+    with step_options(flatten=1):
+        flat = rowmap_wrapper(meta)(url=df)
+    assert flat.columns.tolist() == ["url", "title", "stats_likes", "stats_ratio"]
+    assert flat["stats_likes"].tolist()[::2] == [1, 2]
+
+    with step_options(flatten=2):
+        assert "stats_ratio_up" in rowmap_wrapper(meta)(url=df).columns
+
+
+def test_expand_builds_output_without_mutating_input():
+    df = pd.DataFrame({"name": ["ab", "", "c"], "views": [1, 2, 3]})
+    before = df.copy()
+
+    def split(name):
+        return [{"letter": ch, "views": 0} for ch in name] if name != "c" else ["c!"]
+
+    res = expand_wrapper(split)(name=df)
+    pd.testing.assert_frame_equal(df, before)
+    assert res["name"].tolist() == ["ab", "ab", "", "c"]
+    assert res["letter"].tolist()[:2] == ["a", "b"]
+    # dict items override input columns only where they set the key
+    assert res["views"].tolist() == [0, 0, 2, 3]
+    assert pd.isna(res["split_output"].iloc[2]) and res["split_output"].iloc[3] == "c!"
+    assert res.index.tolist() == [0, 1, 2, 3]
+
+
+def test_empty_expand_keeps_input_columns():
+    from SIMPLE_STEPS.orchestrators import fan_out
+
+    df = pd.DataFrame({"name": ["ab", "c"], "views": [1, 2]})
+    res = fan_out(df, [[], []], "items", keep_empty=False)
+    assert res.empty and res.columns.tolist() == ["name", "views", "items"]
+    res = fan_out(df.iloc[0:0], [], "items")
+    assert res.empty and res.columns.tolist() == ["name", "views", "items"]
+
+
+def test_disk_cache_only_calls_new_rows(monkeypatch, tmp_path):
+    from SIMPLE_STEPS import row_cache
+    from SIMPLE_STEPS.decorators import register_operation
+    from SIMPLE_STEPS.orchestration_ops import ss_map
+    from SIMPLE_STEPS.settings import get_settings
+
+    monkeypatch.setattr(row_cache, "ROW_CACHE_PATH", str(tmp_path / "rows.sqlite"))
+    calls = []
+
+    def meta(url: str, lang: str = "en") -> dict:
+        calls.append(url)
+        if url == "bad":
+            raise ValueError("no page")
+        return {"title": url.upper(), "lang": lang}
+
+    register_operation(meta, "test_cached_meta", "Meta", operation_type="map", cache="disk", concurrency=2)
+    urls = [f"u{i}" for i in range(10)]
+    res = rowmap_wrapper(meta)(url=pd.DataFrame({"url": urls}))
+    assert res["title"].tolist() == [u.upper() for u in urls]
+    assert len(calls) == 10
+
+    calls.clear()
+    res = rowmap_wrapper(meta)(url=pd.DataFrame({"url": urls + ["u10", "bad", "u10"]}))
+    assert calls == ["u10", "bad"]          # duplicates run once
+    assert res["title"].iloc[-3] == res["title"].iloc[-1] == "U10"
+    assert res["_error"].iloc[-2] == "ValueError: no page"
+
+    calls.clear()
+    ss_map(df=pd.DataFrame({"url": urls}), fn="test_cached_meta", url="url")
+    assert calls == []
+    ss_map(df=pd.DataFrame({"url": urls[:2]}), fn="test_cached_meta", url="url", lang="de")
+    assert calls == ["u0", "u1"]            # other arguments, other rows
+    calls.clear()
+    rowmap_wrapper(meta)(url=pd.DataFrame({"url": ["bad", "u11"]}))
+    assert calls.count("bad") == 1          # failures are not stored
+
+    monkeypatch.setattr(get_settings(), "row_cache_max_bytes", 0)
+    row_cache.put_many("test_cached_meta", [("k", 1)])
+    assert row_cache.stats()["entries"] == 0
+
+
+def test_retries_rate_limit_and_continue_on_error():
+    from SIMPLE_STEPS.decorators import register_operation
+    from SIMPLE_STEPS.engine import get_dataframe, run_operation, save_dataframe
+    from SIMPLE_STEPS.orchestration_ops import ss_expand
+    from SIMPLE_STEPS.row_policy import TokenBucket, parse_rate_limit
+
+    attempts = {}
+
+    def flaky(url: str) -> str:
+        attempts[url] = attempts.get(url, 0) + 1
+        if url == "down" or attempts[url] < 3:
+            raise ConnectionError(f"{url} unreachable")
+        return url.upper()
+
+    register_operation(flaky, "test_flaky", "Flaky", operation_type="map",
+                       retries=2, retry_on=ConnectionError, backoff=0.001, on_error="continue")
+    res = rowmap_wrapper(flaky)(url=pd.DataFrame({"url": ["a", "down", "b"]}))
+    assert res["flaky_output"].tolist()[::2] == ["A", "B"]
+    assert res["_error"].isna().tolist() == [True, False, True]
+    assert res["_error"].iloc[1] == "ConnectionError: down unreachable"
+    assert attempts == {"a": 3, "down": 3, "b": 3}
+
+    def odd_only(n: int) -> bool:
+        if n == 3:
+            raise ValueError("three")
+        return n % 2 == 1
+
+    def pieces(n: int) -> list:
+        if n == 3:
+            raise ValueError("three")
+        return list(range(n))
+
+    register_operation(odd_only, "test_odd_only", "Odd", operation_type="filter")
+    register_operation(pieces, "test_pieces", "Pieces", operation_type="expand", on_error="continue")
+    ref_in = save_dataframe(pd.DataFrame({"n": [1, 2, 3]}))
+    with pytest.raises(ValueError):
+        run_operation("test_odd_only", {"n": "n"}, ref_in)
+    ref_out, _ = run_operation("test_odd_only", {"n": "n", "_on_error": "continue"}, ref_in)
+    kept = get_dataframe(ref_out)
+    assert kept["n"].tolist() == [1, 3]     # failed rows stay visible
+    assert kept["_error"].isna().tolist() == [True, False]
+
+    expanded = ss_expand(df=pd.DataFrame({"n": [2, 3]}), fn="test_pieces", n="n").df
+    assert expanded["n"].tolist() == [2, 2, 3]
+    assert expanded["_error"].isna().tolist() == [True, True, False]
+
+    assert parse_rate_limit("120/min") == 2.0
+    bucket = TokenBucket(10)
+    assert [bucket.reserve() for _ in range(10)] == [0.0] * 10
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.02)
+
+
+def test_broadcast_map_is_columnar_and_leaves_input_alone():
+    from SIMPLE_STEPS.decorators import simple_step
+    from SIMPLE_STEPS.step_proxy import step
+
+    @simple_step(id="test_bc_join", operation_type="map")
+    def join(prefix: str, name: str, sep: str = "-") -> str:
+        return f"{prefix}{sep}{name}"
+
+    @simple_step(id="test_bc_stats", operation_type="map")
+    def stats(name: str, views: int = 0) -> dict:
+        return {"views": views * 2, "length": len(name)}
+
+    df = pd.DataFrame({"name": ["ab", "c"], "views": [1, 2]}, index=[7, 9])
+    before = df.copy()
+    s = step(df, label="s")
+
+    joined = join("x", s.name, sep="+").df      # column in the second position
+    assert joined["join_output"].tolist() == ["x+ab", "x+c"]
+    stated = stats(name=s.name, views=s.views).df
+    assert stated["views"].tolist() == [2, 4]
+    assert stated["length"].tolist() == [2, 1]
+    assert stated.index.tolist() == [0, 1]
+    pd.testing.assert_frame_equal(df, before)
+
+
+def test_call_plan_is_built_once_at_registration(monkeypatch):
+    import functools
+    import inspect
+    from SIMPLE_STEPS.call_plan import call_plan
+    from SIMPLE_STEPS.decorators import OPERATION_REGISTRY, register_operation
+    from SIMPLE_STEPS.orchestrators import dataframe_op_wrapper
+
+    def summarize(table: pd.DataFrame, top: int = 1, **extra) -> pd.DataFrame:
+        return table.head(top)
+
+    register_operation(summarize, "test_plan_summarize", "Summarize")
+    plan = OPERATION_REGISTRY["test_plan_summarize"]["plan"]
+    assert plan is call_plan(summarize)
+    assert plan.params == ("table", "top", "extra")
+    assert (plan.main_arg, plan.df_param) == ("table", "table")
+    assert plan.accepts_var_kwargs and not plan.is_async
+
+    def no_signature(*args, **kwargs):
+        raise AssertionError("signature looked up again")
+
+    monkeypatch.setattr(inspect, "signature", no_signature)
+    out = dataframe_op_wrapper(summarize)(_input_df=pd.DataFrame({"a": [1, 2]}), top=1)
+    assert out["a"].tolist() == [1]
+    monkeypatch.undo()
+
+    @functools.wraps(summarize)
+    async def wrapped(*args, **kwargs):
+        return summarize(*args, **kwargs)
+
+    assert call_plan(wrapped) is not plan and call_plan(wrapped).is_async
+
+
+def test_broadcast_wrappers_are_reused_until_the_registry_changes():
+    from SIMPLE_STEPS.decorators import broadcast_callables, simple_step
+    from SIMPLE_STEPS.eval_engine import _build_namespace
+
+    @simple_step(id="test_bc_cached", operation_type="map")
+    def shout(text: str) -> str:
+        return text.upper()
+
+    first = broadcast_callables()["test_bc_cached"]
+    assert broadcast_callables()["test_bc_cached"] is first
+    assert _build_namespace(None, {})["test_bc_cached"] is first
+
+    @simple_step(id="test_bc_cached_2", operation_type="map")
+    def whisper(text: str) -> str:
+        return text.lower()
+
+    wrappers = broadcast_callables()
+    assert "test_bc_cached_2" in wrappers
+    assert wrappers["test_bc_cached"] is first       # unchanged ops keep their wrapper
+
+    @simple_step(id="test_bc_cached", operation_type="map")
+    def shout_again(text: str) -> str:
+        return text.upper() + "!"
+
+    assert broadcast_callables()["test_bc_cached"] is not first
+
+
+def test_exec_options_live_on_the_registry_entry_per_op_id():
+    from SIMPLE_STEPS.decorators import OPERATION_REGISTRY, register_operation
+    from SIMPLE_STEPS.engine import get_dataframe, run_operation, save_dataframe
+    from SIMPLE_STEPS.exec_options import exec_options, running_op
+
+    def shaky(word: str) -> str:
+        if word == "bad":
+            raise ValueError("bad word")
+        return word.upper()
+
+    register_operation(shaky, "test_shaky_lenient", "Shaky", operation_type="map", on_error="continue")
+    register_operation(shaky, "test_shaky_strict", "Shaky", operation_type="map")
+    assert OPERATION_REGISTRY["test_shaky_lenient"]["options"].on_error == "continue"
+    assert not hasattr(shaky, "_on_error")
+    with running_op("test_shaky_lenient"):
+        assert exec_options(shaky).on_error == "continue"
+    assert exec_options(shaky).op_id == "test_shaky_strict"    # latest registration
+
+    ref_in = save_dataframe(pd.DataFrame({"word": ["ok", "bad"]}))
+    ref_out, _ = run_operation("test_shaky_lenient", {}, ref_in)
+    assert get_dataframe(ref_out)["_error"].iloc[1] == "ValueError: bad word"
+    with pytest.raises(ValueError):
+        run_operation("test_shaky_strict", {}, ref_in)
@@ -0,0 +1,139 @@
+"""Tests for the server-side DAG pipeline runner."""
+import threading
+
+import pandas as pd
+
+from SIMPLE_STEPS.decorators import simple_step
+from SIMPLE_STEPS.engine import get_dataframe
+from SIMPLE_STEPS.models import PipelineFile
+from SIMPLE_STEPS.pipeline_runner import plan_pipeline, run_pipeline
+
+_BARRIER = threading.Barrier(2, timeout=5)
+
+
+@simple_step(id="pr_source", operation_type="source")
+def pr_source() -> pd.DataFrame:
+    return pd.DataFrame({"v": [1, 2, 3]})
+
+
+@simple_step(id="pr_left", operation_type="dataframe")
+def pr_left(df: pd.DataFrame) -> pd.DataFrame:
+    _BARRIER.wait()   # only passes if pr_right runs at the same time
+    return df.assign(left=df["v"] + 1)
+
+
+@simple_step(id="pr_right", operation_type="dataframe")
+def pr_right(df: pd.DataFrame) -> pd.DataFrame:
+    _BARRIER.wait()
+    return df.assign(right=df["v"] * 10)
+
+
+@simple_step(id="pr_boom", operation_type="dataframe")
+def pr_boom(df: pd.DataFrame) -> pd.DataFrame:
+    raise RuntimeError("boom")
+
+
+def _pipeline(*expressions):
+    return PipelineFile(
+        name="dag",
+        steps=[{"name": f"s{i + 1}", "expression": e} for i, e in enumerate(expressions)],
+    )
+
+
+def test_plan_extracts_step_dependencies():
+    nodes = plan_pipeline(_pipeline(
+        "pr_source()",
+        "pr_left(df=step1)",
+        "pr_right(df=step1)",
+        "drop_na()",          # no refs → chains off the previous step
+    ))
+    assert [n.deps for n in nodes] == [set(), {0}, {0}, {2}]
+    assert nodes[2].input_index == 0
+
+
+def test_independent_steps_run_in_parallel():
+    run = run_pipeline(_pipeline(
+        "pr_source()",
+        "pr_left(df=step1)",
+        "pr_right(df=step1)",
+    ), max_workers=2)
+
+    status = run.status()
+    assert status.status == "completed"
+    assert set(status.step_statuses.values()) == {"completed"}
+    assert get_dataframe(status.step_refs["s2"])["left"].tolist() == [2, 3, 4]
+    assert get_dataframe(status.step_refs["s3"])["right"].tolist() == [10, 20, 30]
+
+
+def test_failure_blocks_downstream_steps():
+    run = run_pipeline(_pipeline(
+        "pr_source()",
+        "pr_boom(df=step1)",
+        "drop_na(df=step2)",
+    ), on_error="continue")
+
+    status = run.status()
+    assert status.status == "failed"
+    assert status.step_statuses == {"s1": "completed", "s2": "failed", "s3": "failed"}
+    assert "boom" in status.errors["s2"]
+    assert "upstream" in status.errors["s3"]
+
+
+_RUN_COUNTS = {}
+
+
+@simple_step(id="pr_count", operation_type="dataframe")
+def pr_count(df: pd.DataFrame, tag: str = "") -> pd.DataFrame:
+    _RUN_COUNTS[tag] = _RUN_COUNTS.get(tag, 0) + 1
+    return df.assign(**{tag: 1})
+
+
+def test_incremental_rerun_only_recomputes_dirty_steps():
+    first = _pipeline(
+        "pr_source()",
+        'pr_count(df=step1, tag="a")',
+        'pr_count(df=step1, tag="b")',
+        'pr_count(df=step3, tag="c")',
+    )
+    run_pipeline(first, pipeline_id="inc", incremental=True)
+    assert _RUN_COUNTS == {"a": 1, "b": 1, "c": 1}
+
+    # Nothing changed → everything is served from the previous run.
+    again = run_pipeline(first, pipeline_id="inc", incremental=True)
+    assert _RUN_COUNTS == {"a": 1, "b": 1, "c": 1}
+    assert again.status().status == "completed"
+
+    # Editing step 3 recomputes it and its dependent step 4 only.
+    edited = _pipeline(
+        "pr_source()",
+        'pr_count(df=step1, tag="a")',
+        'pr_count(df=step1, tag="b2")',
+        'pr_count(df=step3, tag="c")',
+    )
+    run_pipeline(edited, pipeline_id="inc", incremental=True)
+    assert _RUN_COUNTS == {"a": 1, "b": 1, "b2": 1, "c": 2}
+
+    # from= forces a clean step and its downstream subgraph.
+    run_pipeline(edited, pipeline_id="inc", from_step="s2")
+    assert _RUN_COUNTS == {"a": 2, "b": 1, "b2": 1, "c": 2}
+
+
+def test_incremental_rerun_recomputes_steps_whose_op_changed():
+    @simple_step(id="pr_versioned", operation_type="dataframe")
+    def pr_versioned(df: pd.DataFrame) -> pd.DataFrame:
+        _RUN_COUNTS["v1"] = _RUN_COUNTS.get("v1", 0) + 1
+        return df
+
+    pipeline = _pipeline("pr_source()", "pr_versioned(df=step1)")
+    run_pipeline(pipeline, pipeline_id="inc-op", incremental=True)
+    run_pipeline(pipeline, pipeline_id="inc-op", incremental=True)
+    assert _RUN_COUNTS["v1"] == 1
+
+    # A reloaded pack registers a new implementation under the same id.
+    @simple_step(id="pr_versioned", operation_type="dataframe")
+    def pr_versioned_v2(df: pd.DataFrame) -> pd.DataFrame:
+        _RUN_COUNTS["v2"] = _RUN_COUNTS.get("v2", 0) + 1
+        return df
+
+    run_pipeline(pipeline, pipeline_id="inc-op", incremental=True)
+    assert _RUN_COUNTS["v2"] == 1
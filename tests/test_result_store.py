@@ -0,0 +1,90 @@
+import pandas as pd
+import pytest
+
+from SIMPLE_STEPS.result_store import (
+    ArrowResultStore,
+    MemoryResultStore,
+    ParquetResultStore,
+    SQLiteResultStore,
+)
+
+
+def _backends(tmp_path):
+    return {
+        "memory": MemoryResultStore(),
+        "parquet": ParquetResultStore(str(tmp_path / "pq")),
+        "arrow": ArrowResultStore(str(tmp_path / "arrow")),
+        "sqlite": SQLiteResultStore(str(tmp_path / "results.sqlite")),
+    }
+
+
+@pytest.mark.parametrize("name", ["memory", "parquet", "arrow", "sqlite"])
+def test_backend_contract(tmp_path, name):
+    store = _backends(tmp_path)[name]
+    df = pd.DataFrame({"n": [1, 2], "s": ["x", "y"]})
+
+    assert store.get("sess", "sess__a") is None
+    assert not store.exists("sess", "sess__a")
+
+    store.put("sess", "sess__a", df)
+    store.put("sess", "sess__b", df)
+    store.put("other", "other__c", df)
+
+    assert store.exists("sess", "sess__a")
+    assert store.get("sess", "sess__a")["s"].tolist() == ["x", "y"]
+    assert sorted(store.list_session("sess")) == ["sess__a", "sess__b"]
+    assert store.stats()["refs"] == 3
+
+    assert store.delete("sess", "sess__a")
+    assert not store.delete("sess", "sess__a")
+    assert store.list_session("sess") == ["sess__b"]
+
+
+def test_memory_store_locates_refs_without_scanning():
+    store = MemoryResultStore()
+    store.put("s1", "legacy-ref", pd.DataFrame({"a": [1]}))
+    assert store.locate("legacy-ref") == "s1"
+    store.delete("s1", "legacy-ref")
+    assert store.locate("legacy-ref") is None
+
+
+def test_engine_reads_back_from_sqlite(tmp_path, monkeypatch):
+    from SIMPLE_STEPS import engine
+
+    monkeypatch.setattr(engine, "RESULT_CACHE_DIR", str(tmp_path))
+    ref = engine.save_dataframe(pd.DataFrame({"v": [7, 8]}), session_id="sq", store_mode="sqlite")
+    engine.MEMORY_STORE.delete("sq", ref)
+    engine._forget("sq", ref)
+
+    assert engine.get_dataframe(ref)["v"].tolist() == [7, 8]
+
+
+def test_arrow_store_reads_stay_on_the_mapped_file(tmp_path, monkeypatch):
+    import pyarrow as pa
+
+    store = ArrowResultStore(str(tmp_path / "arrow"))
+    store.put("sess", "sess__a", pd.DataFrame({"n": [1, 2, 3], "s": ["a", "b", "c"]}))
+
+    maps = []
+    real_memory_map = pa.memory_map
+
+    def recording_memory_map(*args, **kwargs):
+        maps.append(real_memory_map(*args, **kwargs))
+        return maps[-1]
+
+    monkeypatch.setattr(pa, "memory_map", recording_memory_map)
+    loaded = store.get("sess", "sess__a")
+
+    (mapped,) = maps
+    mapped.seek(0)
+    region = mapped.read_buffer(mapped.size())
+    for column in ("n", "s"):
+        chunk = loaded[column].array.__arrow_array__().chunk(0)
+        data = chunk.buffers()[-1]
+        assert region.address <= data.address < region.address + region.size
+
+    # Writes copy the column instead of touching the read-only mapping.
+    loaded.loc[0, "n"] = 99
+    loaded.loc[1, "s"] = "z"
+    assert loaded["n"].tolist() == [99, 2, 3]
+    assert store.get("sess", "sess__a")["s"].tolist() == ["a", "b", "c"]
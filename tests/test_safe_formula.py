@@ -239,3 +239,101 @@ def test_diagnostic_to_dict_shape():
     errs = validate("=does_not_exist(x=1)", available_steps=set())
     d = errs[0].to_dict()
     assert set(d.keys()) >= {"message", "code", "col_offset", "end_col_offset"}
+
+
+# ── Lazy step environment ────────────────────────────────────────────────
+def test_lazy_step_env_loads_only_referenced_steps():
+    from SIMPLE_STEPS.step_proxy import LazyStepEnv
+
+    frames = {
+        "r1": pd.DataFrame({"a": [1, 2]}),
+        "r3": pd.DataFrame({"url": ["x.com", "y.com"]}),
+    }
+    loads = []
+
+    def load(ref_id):
+        loads.append(ref_id)
+        return frames.get(ref_id)
+
+    env = LazyStepEnv({"step1": "r1", "step3": "r3", "Videos": "r3"}, load)
+    assert set(env.keys()) == {"step1", "step3", "Videos"}
+    assert loads == []
+
+    out = run_formula("=step3.url", steps=env)
+    assert list(out) == ["x.com", "y.com"]
+    # Alias sharing the same ref doesn't load it again.
+    run_formula("=Videos.url", steps=env)
+    assert loads == ["r3"]
+    assert env.loaded_refs == ["r3"]
+
+
+# ── Parse / validate cache ───────────────────────────────────────────────
+def test_parse_and_validation_are_cached(steps, monkeypatch):
+    from SIMPLE_STEPS import safe_formula
+    from SIMPLE_STEPS.safe_formula import parse_call
+
+    formula = "=sf_upper(text=step1.name)"
+    assert validate(formula, available_steps={"step1"}) == []
+    walks = []
+    real = safe_formula._validate_tree
+    monkeypatch.setattr(safe_formula, "_validate_tree",
+                        lambda *a: walks.append(a) or real(*a))
+    monkeypatch.setattr(safe_formula, "parse",
+                        lambda f: pytest.fail("formula parsed again"))
+
+    assert validate(formula, available_steps={"step1"}) == []
+    out = run_formula(formula, steps=steps)
+    assert list(out["sf_upper_output"]) == ["ALICE", "BOB"]
+    assert describe(formula)["top_level_op"] == "sf_upper"
+    assert parse_call(formula)["args"] == {"text": "step1.name"}
+    assert walks == []
+
+    # Different step names, or a newly registered op, re-validate.
+    assert validate(formula, available_steps=set())[0].code == "attr_non_step"
+
+    @simple_step(id="sf_cache_new", category="Test")
+    def sf_cache_new(text: str) -> str:
+        return text
+
+    assert validate(formula, available_steps={"step1"}) == []
+    assert len(walks) == 2
+
+
+# ── Compiled programs ────────────────────────────────────────────────────
+def test_formula_is_compiled_once_and_rerun_on_new_data(monkeypatch):
+    from SIMPLE_STEPS import safe_formula
+
+    formula = "=sf_add(a=step1.score, b=2 * 3 - 1)"
+    first = run_formula(formula, steps={"step1": pd.DataFrame({"score": [1, 2]})})
+    assert list(first["sf_add_output"]) == [6, 7]
+
+    monkeypatch.setattr(safe_formula, "_compile",
+                        lambda *a: pytest.fail("formula compiled again"))
+    again = run_formula(formula, steps={"step1": pd.DataFrame({"score": [10]})})
+    assert list(again["sf_add_output"]) == [15]
+
+
+def test_compile_folds_constants():
+    from SIMPLE_STEPS.safe_formula import _compile, _folded
+
+    assert _folded(_compile(parse("=-(2 ** 3) + 1"), OPERATION_REGISTRY)) == (-7,)
+    assert _folded(_compile(parse("=(1, 'a')"), OPERATION_REGISTRY)) == ((1, "a"),)
+    assert _folded(_compile(parse("=2 ** 100000"), OPERATION_REGISTRY)) is None
+    assert _folded(_compile(parse("=((9 ** 128) ** 128) ** 128"), OPERATION_REGISTRY)) is None
+    assert _folded(_compile(parse("='x' * 3"), OPERATION_REGISTRY)) is None
+    assert _folded(_compile(parse("='a' + 'b'"), OPERATION_REGISTRY)) == ("ab",)
+    assert _folded(_compile(parse("=step1.score + 1"), OPERATION_REGISTRY)) is None
+    # Errors are left for run time.
+    with pytest.raises(ZeroDivisionError):
+        run_formula("=1 / 0", steps={})
+
+
+def test_validate_does_not_evaluate(monkeypatch):
+    from SIMPLE_STEPS import safe_formula
+
+    monkeypatch.setattr(safe_formula, "_compile",
+                        lambda *a: pytest.fail("validate compiled the formula"))
+    monkeypatch.setattr(safe_formula, "_BINOP_TABLE", {})
+    assert validate('"x" * 10**8') == []
+    assert validate("((9**128)**128)**128") == []
+    assert describe("=1 + 2")["valid"] is True
@@ -0,0 +1,42 @@
+import pandas as pd
+import pytest
+
+from SIMPLE_STEPS import engine, sessions
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(engine, "RESULT_CACHE_DIR", str(tmp_path))
+    (tmp_path / "_step_cache").mkdir()
+    return tmp_path
+
+
+def test_list_and_delete_session(cache_dir):
+    ref_mem = engine.save_dataframe(pd.DataFrame({"v": [1, 2]}), session_id="life-a")
+    ref_disk = engine.save_dataframe(pd.DataFrame({"v": [3]}), session_id="life-a", store_mode="parquet")
+    engine.flush_result_writes()
+
+    listed = {s["session_id"]: s for s in sessions.list_sessions()}
+    assert "_step_cache" not in listed
+    assert listed["life-a"]["ram_refs"] == 2
+    assert listed["life-a"]["disk_refs"] == 1
+    assert listed["life-a"]["ram_bytes"] > 0
+
+    removed = sessions.delete_session("life-a")
+    assert removed == {"ram_refs": 2, "disk_refs": 1}
+    assert engine.get_dataframe(ref_mem) is None
+    assert engine.get_dataframe(ref_disk) is None
+    assert not (cache_dir / "life-a").exists()
+    assert sessions.delete_session("life-a") is None
+
+
+def test_reaper_expires_idle_sessions(cache_dir):
+    engine.save_dataframe(pd.DataFrame({"v": [1]}), session_id="life-old")
+    engine.save_dataframe(pd.DataFrame({"v": [1]}), session_id="life-new")
+    engine._LAST_SEEN["life-old"] -= 1000
+
+    reaped = sessions.reap_idle_sessions(ttl_seconds=500)
+    assert reaped == ["life-old"]
+    remaining = {s["session_id"] for s in sessions.list_sessions()}
+    assert "life-new" in remaining and "life-old" not in remaining
+    sessions.delete_session("life-new")